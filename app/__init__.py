@@ -0,0 +1,5 @@
+import time
+
+# Referência para o relatório de inicialização (app/main.py): o pacote é o primeiro módulo da
+# aplicação importado pelo uvicorn, então o tempo até o startup inclui os imports de FastAPI etc.
+INICIO_IMPORTACAO = time.perf_counter()
@@ -1,35 +1,151 @@
+import time
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy import select
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import AuthError, decode_access_token
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.domain.models import RoleEnum, User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+@dataclass(frozen=True)
+class Principal:
+    """Identidade autenticada mínima (id, e-mail e perfil), suficiente para autorização."""
+
+    id: int
+    email: str
+    role: RoleEnum
+
+
+# Cache por token: uma entrada vive até o menor entre o "exp" do token e o TTL configurado. Fora
+# dele o perfil vem do banco (não das claims), então uma troca de perfil vale em todos os processos
+# em até PRINCIPAL_CACHE_TTL_SECONDS; neste processo, na hora (invalidar_principal).
+principal_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_MAX)
+_ALTERADOS = "principais_alterados"
+
+
+def invalidar_principal(user_id: int) -> None:
+    """Descarta o que este processo guardou do usuário (ex.: após troca de perfil).
+
+    Chamado automaticamente após o commit de qualquer alteração de perfil ou e-mail (ou
+    exclusão) de um User pelo ORM; atualizações em massa (Core) precisam chamá-lo.
+    """
+    principal_cache.remover_se(lambda principal: principal.id == user_id)
+
+
+@event.listens_for(Session, "before_flush")
+def _marcar_usuarios_alterados(db: Session, _contexto, _instancias) -> None:
+    for user in (*db.dirty, *db.deleted):
+        if not isinstance(user, User):
+            continue
+        historico = inspect(user).attrs
+        if user in db.deleted or any(historico[nome].history.has_changes() for nome in ("role", "email")):
+            db.info.setdefault(_ALTERADOS, set()).add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_alterados(db: Session) -> None:
+    for user_id in db.info.pop(_ALTERADOS, ()):
+        invalidar_principal(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_alterados(db: Session, _previous_transaction) -> None:
+    db.info.pop(_ALTERADOS, None)
+
+
+def _decodificar(token: str) -> dict:
     try:
         payload = decode_access_token(token)
     except AuthError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)) from exc
 
-    email = payload.get("sub")
-    if not email:
+    if not payload.get("sub"):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token sem sujeito")
+    return payload
 
-    user = db.scalar(select(User).where(User.email == email))
+
+def _consulta_principal(payload: dict):
+    # Pela chave primária quando o token traz o id; tokens antigos (sem "uid") pelo e-mail.
+    query = select(User.id, User.email, User.role)
+    if payload.get("uid") is not None:
+        return query.where(User.id == payload["uid"])
+    return query.where(User.email == payload["sub"])
+
+
+def _checar_usuario(user: User | None) -> User:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
     return user
 
 
+def _principal_da_linha(linha) -> Principal:
+    if linha is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Usuário não encontrado")
+    return Principal(id=linha.id, email=linha.email, role=linha.role)
+
+
+def _guardar(token: str, payload: dict, principal: Principal) -> Principal:
+    expira_em = min(payload["exp"], time.time() + settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    principal_cache.set(token, principal, expira_em)
+    return principal
+
+
+def _checar_role(principal: Principal, roles: tuple[RoleEnum, ...]) -> Principal:
+    if principal.role not in roles:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário sem permissão")
+    return principal
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+    email = _decodificar(token)["sub"]
+    return _checar_usuario(db.scalar(select(User).where(User.email == email)))
+
+
+def get_current_principal(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    principal = principal_cache.get(token)
+    if principal:
+        return principal
+
+    payload = _decodificar(token)
+    principal = _principal_da_linha(db.execute(_consulta_principal(payload)).first())
+    return _guardar(token, payload, principal)
+
+
+async def get_current_principal_async(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    principal = principal_cache.get(token)
+    if principal:
+        return principal
+
+    payload = _decodificar(token)
+    principal = _principal_da_linha((await db.execute(_consulta_principal(payload))).first())
+    return _guardar(token, payload, principal)
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
+    email = _decodificar(token)["sub"]
+    return _checar_usuario(await db.scalar(select(User).where(User.email == email)))
+
+
 def require_roles(*roles: RoleEnum):
-    def _role_guard(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in roles:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Usuário sem permissão")
-        return current_user
+    def _role_guard(principal: Principal = Depends(get_current_principal)) -> Principal:
+        return _checar_role(principal, roles)
+
+    return _role_guard
+
+
+def require_roles_async(*roles: RoleEnum):
+    async def _role_guard(principal: Principal = Depends(get_current_principal_async)) -> Principal:
+        return _checar_role(principal, roles)
 
     return _role_guard
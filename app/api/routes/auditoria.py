@@ -0,0 +1,68 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import Principal, require_roles
+from app.application.auditoria_service import exportar_auditoria, filtros_auditoria, listar_auditoria
+from app.application.exportacao_service import comprimir_gzip
+from app.core.json_rapido import JSONRapidoResponse
+from app.db.session import get_db
+from app.domain.models import RoleEnum
+from app.schemas import AuditoriaPaginaOut
+
+router = APIRouter(prefix="/auditoria", tags=["Auditoria"])
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
+
+def _filtros(
+    usuarioId: int | None = None,
+    acao: str | None = None,
+    entidade: str | None = None,
+    entidadeId: str | None = None,
+    criadoDe: datetime | None = None,
+    criadoAte: datetime | None = None,
+) -> dict:
+    if criadoDe and criadoAte and criadoDe > criadoAte:
+        raise HTTPException(status_code=422, detail="Intervalo de datas inválido")
+    if entidadeId and not entidade:
+        raise HTTPException(status_code=422, detail="entidadeId exige entidade")
+    return {
+        "usuario_id": usuarioId,
+        "acao": acao,
+        "entidade": entidade,
+        "entidade_id": entidadeId,
+        "criado_de": criadoDe,
+        "criado_ate": criadoAte,
+    }
+
+
+@router.get("", response_model=AuditoriaPaginaOut)
+def listar(
+    filtros: dict = Depends(_filtros),
+    after_id: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN)),
+):
+    registros, proximo_cursor = listar_auditoria(db, limit, after_id, **filtros)
+    return JSONRapidoResponse({"registros": registros, "proximo_cursor": proximo_cursor})
+
+
+@router.get("/export", response_class=StreamingResponse)
+def exportar(
+    request: Request,
+    filtros: dict = Depends(_filtros),
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN)),
+):
+    """Todos os registros filtrados em NDJSON, em ordem cronológica (gzip se o cliente aceitar)."""
+    corpo = exportar_auditoria(db.get_bind(), filtros_auditoria(**filtros))
+    headers = {"Content-Disposition": 'attachment; filename="auditoria.ndjson"', "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        corpo = comprimir_gzip(corpo)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(corpo, media_type="application/x-ndjson", headers=headers)
@@ -1,66 +1,86 @@
+import logging
+
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.api.deps import get_current_user, require_roles
-from app.core.security import create_access_token, hash_password, verify_password
+from app.api.deps import Principal, get_current_user, require_roles
+from app.core.hash_pool import hash_password_async, verify_password_async
+from app.core.security import create_access_token, needs_rehash
 from app.db.session import get_db
 from app.domain.models import RoleEnum, User
 from app.schemas import TokenOut, UserCreate, UserInternalCreate, UserOut
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
+# As rotas são assíncronas para aguardar o PBKDF2 no pool de processos sem prender uma thread;
+# os acessos ao banco (curtos) continuam síncronos e vão para o threadpool.
 
-@router.post("/register", response_model=UserOut, status_code=201)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
-    exists = db.scalar(select(User).where(User.email == payload.email))
-    if exists:
-        raise HTTPException(status_code=409, detail="E-mail já cadastrado")
 
-    user = User(
-        nome=payload.nome,
-        email=payload.email,
-        senha_hash=hash_password(payload.senha),
-        role=RoleEnum.CLIENTE,
-        consentimento_lgpd=payload.consentimento_lgpd,
-    )
+def _buscar_por_email(db: Session, email: str) -> User | None:
+    return db.scalar(select(User).where(User.email == email))
+
+
+def _salvar(db: Session, user: User) -> User:
     db.add(user)
     db.commit()
     db.refresh(user)
     return user
 
 
-@router.post("/register-interno", response_model=UserOut, status_code=201)
-def register_internal(
-    payload: UserInternalCreate,
-    db: Session = Depends(get_db),
-    _: User = Depends(require_roles(RoleEnum.ADMIN)),
-):
-    exists = db.scalar(select(User).where(User.email == payload.email))
-    if exists:
+async def _criar_usuario(db: Session, payload: UserCreate, role: RoleEnum) -> User:
+    if await run_in_threadpool(_buscar_por_email, db, payload.email):
         raise HTTPException(status_code=409, detail="E-mail já cadastrado")
 
     user = User(
         nome=payload.nome,
         email=payload.email,
-        senha_hash=hash_password(payload.senha),
-        role=payload.role,
+        senha_hash=await hash_password_async(payload.senha),
+        role=role,
         consentimento_lgpd=payload.consentimento_lgpd,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return await run_in_threadpool(_salvar, db, user)
+
+
+@router.post("/register", response_model=UserOut, status_code=201)
+async def register(payload: UserCreate, db: Session = Depends(get_db)):
+    return await _criar_usuario(db, payload, RoleEnum.CLIENTE)
+
+
+@router.post("/register-interno", response_model=UserOut, status_code=201)
+async def register_internal(
+    payload: UserInternalCreate,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN)),
+):
+    return await _criar_usuario(db, payload, payload.role)
 
 
 @router.post("/login", response_model=TokenOut)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.scalar(select(User).where(User.email == form_data.username))
-    if not user or not verify_password(form_data.password, user.senha_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_buscar_por_email, db, form_data.username)
+    if not user or not await verify_password_async(form_data.password, user.senha_hash):
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
 
-    return TokenOut(access_token=create_access_token(user.email))
+    token = create_access_token(user.email, user.id, user.role.value)
+
+    # Regrava o hash quando PASSWORD_HASH_ITERATIONS mudou; falhar aqui não impede o login.
+    if needs_rehash(user.senha_hash):
+        try:
+            user.senha_hash = await hash_password_async(form_data.password)
+            await run_in_threadpool(db.commit)
+        except HTTPException:
+            pass
+        except SQLAlchemyError:
+            logger.exception("Falha ao regravar o hash de senha do usuário %d", user.id)
+            await run_in_threadpool(db.rollback)
+
+    return TokenOut(access_token=token)
 
 
 @router.get("/me", response_model=UserOut)
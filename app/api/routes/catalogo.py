@@ -1,60 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException
+from collections.abc import Iterator, Sequence
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import require_roles
+from app.api.deps import Principal, require_roles
+from app.application.estoque_service import consultar_saldos, movimentar_estoque_lote
 from app.db.session import get_db
-from app.domain.models import Estoque, Produto, RoleEnum, Unidade, User
-from app.schemas import EstoqueMovimentacaoIn, EstoqueSaldoOut, ProdutoCreate, ProdutoOut, UnidadeCreate, UnidadeOut
+from app.domain.models import Estoque, Produto, RoleEnum, Unidade
+from app.infrastructure.catalogo_cache import etag_confere, invalidar_catalogo, obter_snapshot
+from app.schemas import (
+    EstoqueMovimentacaoIn,
+    EstoqueMovimentacaoLoteIn,
+    EstoqueSaldoOut,
+    EstoqueSaldosConsultaIn,
+    ProdutoCreate,
+    ProdutoOut,
+    UnidadeCreate,
+    UnidadeOut,
+)
 
 router = APIRouter(tags=["Catálogo"])
 
+LIMITE_SEM_STREAM = 1000
+
+
+def _resposta_com_etag(corpo: bytes | Iterator[bytes], etag: str, if_none_match: str | None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_confere(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if not isinstance(corpo, bytes):
+        return StreamingResponse(corpo, media_type="application/json", headers=headers)
+    return Response(content=corpo, media_type="application/json", headers=headers)
+
 
 @router.post("/unidades", response_model=UnidadeOut, status_code=201)
 def criar_unidade(
     payload: UnidadeCreate,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE)),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE)),
 ):
     unidade = Unidade(nome=payload.nome, cidade=payload.cidade, ativo=True)
     db.add(unidade)
     db.commit()
     db.refresh(unidade)
+    invalidar_catalogo()
     return unidade
 
 
 @router.get("/unidades", response_model=list[UnidadeOut])
-def listar_unidades(db: Session = Depends(get_db)):
-    return list(db.scalars(select(Unidade).where(Unidade.ativo.is_(True))).all())
+def listar_unidades(db: Session = Depends(get_db), if_none_match: str | None = Header(default=None)):
+    snapshot = obter_snapshot(db)
+    return _resposta_com_etag(snapshot.lista_unidades(), f'"u-{snapshot.digest}"', if_none_match)
 
 
 @router.post("/produtos", response_model=ProdutoOut, status_code=201)
 def criar_produto(
     payload: ProdutoCreate,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE)),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE)),
 ):
     produto = Produto(nome=payload.nome, descricao=payload.descricao, preco=payload.preco, ativo=True)
     db.add(produto)
     db.commit()
     db.refresh(produto)
+    invalidar_catalogo()
     return produto
 
 
 @router.get("/produtos", response_model=list[ProdutoOut])
-def listar_produtos(page: int = 1, limit: int = 10, db: Session = Depends(get_db)):
+def listar_produtos(
+    page: int = 1,
+    limit: int = 10,
+    db: Session = Depends(get_db),
+    if_none_match: str | None = Header(default=None),
+):
     if page < 1 or limit < 1:
         raise HTTPException(status_code=422, detail="Paginação inválida")
+    snapshot = obter_snapshot(db)
     offset = (page - 1) * limit
-    query = select(Produto).where(Produto.ativo.is_(True)).offset(offset).limit(limit)
-    return list(db.scalars(query).all())
+    # Páginas grandes saem em blocos em vez de uma cópia inteira do corpo.
+    corpo = (
+        snapshot.stream_produtos(offset, limit) if limit > LIMITE_SEM_STREAM else snapshot.pagina_produtos(offset, limit)
+    )
+    return _resposta_com_etag(corpo, f'"p-{snapshot.digest}-{page}-{limit}"', if_none_match)
 
 
 @router.post("/estoque/movimentacoes", response_model=EstoqueSaldoOut)
 def movimentar_estoque(
     payload: EstoqueMovimentacaoIn,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
 ):
     unidade = db.scalar(select(Unidade).where(Unidade.id == payload.unidade_id, Unidade.ativo.is_(True)))
     if not unidade:
@@ -84,9 +121,49 @@ def movimentar_estoque(
     return EstoqueSaldoOut(unidade_id=estoque.unidade_id, produto_id=estoque.produto_id, quantidade=estoque.quantidade)
 
 
+@router.post("/estoque/movimentacoes/lote", response_model=list[EstoqueSaldoOut])
+def movimentar_estoque_em_lote(
+    payload: EstoqueMovimentacaoLoteIn,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+):
+    return movimentar_estoque_lote(db, payload.movimentacoes)
+
+
 @router.get("/estoque/saldo", response_model=EstoqueSaldoOut)
 def consultar_saldo(unidadeId: int, produtoId: int, db: Session = Depends(get_db)):
     estoque = db.scalar(select(Estoque).where(Estoque.unidade_id == unidadeId, Estoque.produto_id == produtoId))
     if not estoque:
         raise HTTPException(status_code=404, detail="Saldo não encontrado")
     return EstoqueSaldoOut(unidade_id=estoque.unidade_id, produto_id=estoque.produto_id, quantidade=estoque.quantidade)
+
+
+def _stream_saldos(unidade_id: int, blocos: Iterator[Sequence[tuple[int, int]]]) -> Iterator[bytes]:
+    yield b"["
+    separador = ""
+    for bloco in blocos:
+        yield (
+            separador
+            + ",".join(
+                f'{{"unidade_id":{unidade_id},"produto_id":{produto_id},"quantidade":{quantidade}}}'
+                for produto_id, quantidade in bloco
+            )
+        ).encode("utf-8")
+        separador = ","
+    yield b"]"
+
+
+@router.get("/estoque/saldos", response_model=list[EstoqueSaldoOut])
+def consultar_saldos_unidade(
+    unidadeId: int,
+    produtoIds: list[int] | None = Query(default=None, max_length=500),
+    db: Session = Depends(get_db),
+):
+    saldos = consultar_saldos(db.get_bind(), unidadeId, produtoIds)
+    return StreamingResponse(_stream_saldos(unidadeId, saldos), media_type="application/json")
+
+
+@router.post("/estoque/saldos", response_model=list[EstoqueSaldoOut])
+def consultar_saldos_unidade_lote(payload: EstoqueSaldosConsultaIn, db: Session = Depends(get_db)):
+    saldos = consultar_saldos(db.get_bind(), payload.unidade_id, payload.produto_ids)
+    return StreamingResponse(_stream_saldos(payload.unidade_id, saldos), media_type="application/json")
@@ -1,25 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, require_roles
+from app.api.deps import Principal, get_current_principal, require_roles
+from app.application.fidelidade_service import listar_extrato, resgatar_pontos
+from app.core.json_rapido import JSONRapidoResponse
 from app.db.session import get_db
 from app.domain.models import RoleEnum, User
-from app.schemas import FidelidadeResgateIn
+from app.schemas import ExtratoFidelidadeOut, FidelidadeResgateIn
 
 router = APIRouter(prefix="/fidelidade", tags=["Fidelidade"])
 
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
 
-@router.get("/saldo/{cliente_id}")
-def saldo(cliente_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+
+def _saldo_visivel(db: Session, cliente_id: int, current_user: Principal) -> int:
     if current_user.role == RoleEnum.CLIENTE and current_user.id != cliente_id:
         raise HTTPException(status_code=403, detail="Acesso negado")
 
-    cliente = db.scalar(select(User).where(User.id == cliente_id))
-    if not cliente:
+    pontos = db.scalar(select(User.pontos_fidelidade).where(User.id == cliente_id))
+    if pontos is None:
         raise HTTPException(status_code=404, detail="Cliente não encontrado")
+    return pontos
+
+
+@router.get("/saldo/{cliente_id}")
+def saldo(cliente_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
+    return {"clienteId": cliente_id, "pontos": _saldo_visivel(db, cliente_id, current_user)}
+
 
-    return {"clienteId": cliente.id, "pontos": cliente.pontos_fidelidade}
+@router.get("/extrato/{cliente_id}", response_model=ExtratoFidelidadeOut)
+def extrato(
+    cliente_id: int,
+    after_id: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal),
+):
+    pontos = _saldo_visivel(db, cliente_id, current_user)
+    movimentos, proximo_cursor = listar_extrato(db, cliente_id, after_id, limit)
+    return JSONRapidoResponse(
+        {"clienteId": cliente_id, "pontos": pontos, "movimentos": movimentos, "proximo_cursor": proximo_cursor}
+    )
 
 
 @router.post("/resgatar/{cliente_id}")
@@ -27,16 +50,6 @@ def resgatar(
     cliente_id: int,
     payload: FidelidadeResgateIn,
     db: Session = Depends(get_db),
-    _: User = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
 ):
-    cliente = db.scalar(select(User).where(User.id == cliente_id))
-    if not cliente:
-        raise HTTPException(status_code=404, detail="Cliente não encontrado")
-    if cliente.pontos_fidelidade < payload.pontos:
-        raise HTTPException(status_code=409, detail="Pontos insuficientes")
-
-    cliente.pontos_fidelidade -= payload.pontos
-    db.commit()
-    db.refresh(cliente)
-
-    return {"clienteId": cliente.id, "pontosRestantes": cliente.pontos_fidelidade}
+    return {"clienteId": cliente_id, "pontosRestantes": resgatar_pontos(db, cliente_id, payload.pontos)}
@@ -1,38 +1,199 @@
-from fastapi import APIRouter, Depends
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, require_roles
-from app.application.pedido_service import atualizar_status_pedido, criar_pedido, processar_pagamento_mock
+from app.api.deps import Principal, get_current_principal, get_current_user, require_roles
+from app.application.arquivamento_service import STATUS_FINALIZADOS
+from app.application.pedido_service import (
+    atualizar_status_lote,
+    atualizar_status_pedido,
+    consulta_listagem,
+    criar_pedido,
+    processar_pagamento_mock,
+    processar_pagamentos_lote,
+)
+from app.core.config import settings
+from app.core.json_rapido import JSONRapidoResponse, dumps
 from app.db.session import get_db
-from app.domain.models import CanalPedidoEnum, Pedido, PedidoStatusEnum, RoleEnum, User
-from app.schemas import PagamentoProcessarIn, PedidoCreate, PedidoOut, PedidoStatusUpdateIn
+from app.domain.models import (
+    CanalPedidoEnum,
+    Pedido,
+    PedidoArquivo,
+    PedidoItem,
+    PedidoItemArquivo,
+    PedidoStatusEnum,
+    RoleEnum,
+    User,
+)
+from app.infrastructure.idempotencia import hash_requisicao, idempotencia
+from app.infrastructure.pedido_eventos import broadcaster
+from app.schemas import (
+    PagamentoLoteIn,
+    PagamentoLoteResultadoOut,
+    PagamentoProcessarIn,
+    PedidoCreate,
+    PedidoOut,
+    PedidoPaginaOut,
+    PedidoStatusLoteIn,
+    PedidoStatusLoteOut,
+    PedidoStatusUpdateIn,
+)
 
 router = APIRouter(tags=["Pedidos"])
 
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 200
+
 
 @router.post("/pedidos", response_model=PedidoOut, status_code=201)
-def criar(payload: PedidoCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    return criar_pedido(db, current_user, payload)
+def criar(
+    payload: PedidoCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+    idempotency_key: str | None = Header(default=None, max_length=120),
+):
+    if not idempotency_key:
+        return criar_pedido(db, current_user, payload)
+    return idempotencia.executar(
+        db,
+        f"{current_user.id}:POST /pedidos:{idempotency_key}",
+        hash_requisicao("POST", "/pedidos", payload.model_dump_json()),
+        201,
+        lambda sessao: PedidoOut.model_validate(criar_pedido(sessao, current_user, payload)).model_dump_json(),
+    )
 
 
-@router.get("/pedidos", response_model=list[PedidoOut])
+@router.get("/pedidos", response_model=PedidoPaginaOut)
 def listar(
     canalPedido: CanalPedidoEnum | None = None,
     status: PedidoStatusEnum | None = None,
+    unidadeId: int | None = None,
+    criadoDe: datetime | None = None,
+    criadoAte: datetime | None = None,
+    after_id: int | None = Query(default=None, ge=1),
+    limit: int = Query(default=LIMITE_PADRAO, ge=1, le=LIMITE_MAXIMO),
+    historico: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
+):
+    if criadoDe and criadoAte and criadoDe > criadoAte:
+        raise HTTPException(status_code=422, detail="Intervalo de datas inválido")
+
+    def _consulta(pedido):
+        query = consulta_listagem(
+            pedido,
+            limit,
+            canal=canalPedido,
+            status=status,
+            unidade_id=unidadeId,
+            criado_de=criadoDe,
+            criado_ate=criadoAte,
+            cliente_id=current_user.id if current_user.role == RoleEnum.CLIENTE else None,
+            after_id=after_id,
+        )
+        return db.execute(query).mappings().all()
+
+    linhas = _consulta(Pedido)
+    arquivados: set[int] = set()
+    if historico and (status is None or status in STATUS_FINALIZADOS):
+        # Pedidos arquivados só são lidos quando o histórico é pedido (e o filtro de status admite
+        # pedidos finalizados); as duas fontes são intercaladas por id para manter o mesmo cursor.
+        antigas = _consulta(PedidoArquivo)
+        arquivados = {linha["id"] for linha in antigas}
+        linhas = sorted([*linhas, *antigas], key=lambda linha: linha["id"], reverse=True)[: limit + 1]
+
+    proximo_cursor = None
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        proximo_cursor = linhas[-1]["id"]
+
+    itens_por_pedido = defaultdict(list)
+    ids_quentes = [linha["id"] for linha in linhas if linha["id"] not in arquivados]
+    ids_arquivados = [linha["id"] for linha in linhas if linha["id"] in arquivados]
+    for item, ids in ((PedidoItem, ids_quentes), (PedidoItemArquivo, ids_arquivados)):
+        if not ids:
+            continue
+        itens = db.execute(
+            select(item.pedido_id, item.produto_id, item.quantidade, item.preco_unitario)
+            .where(item.pedido_id.in_(ids))
+            .order_by(item.id)
+        )
+        for pedido_id, produto_id, quantidade, preco_unitario in itens:
+            itens_por_pedido[pedido_id].append(
+                {"produto_id": produto_id, "quantidade": quantidade, "preco_unitario": preco_unitario}
+            )
+
+    # As linhas já têm exatamente os campos de PedidoOut: serializa direto, sem revalidar pelo response_model.
+    return JSONRapidoResponse(
+        {
+            "pedidos": [{**linha, "itens": itens_por_pedido[linha["id"]]} for linha in linhas],
+            "proximo_cursor": proximo_cursor,
+        }
+    )
+
+
+@router.get("/pedidos/eventos/{unidade_id}", response_class=StreamingResponse)
+async def eventos(
+    unidade_id: int,
+    request: Request,
+    last_event_id: str | None = Header(default=None),
+    _: Principal = Depends(
+        require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.COZINHA, RoleEnum.ATENDENTE)
+    ),
 ):
-    query = select(Pedido).options(selectinload(Pedido.itens))
+    """Server-Sent Events com pedidos criados/pagos/atualizados na unidade.
+
+    Reconecte enviando `Last-Event-ID` para receber o que foi perdido. Um evento `reset`
+    indica que não há como retomar e que a lista deve ser recarregada via GET /pedidos.
+    """
+    try:
+        ultimo_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Last-Event-ID inválido") from None
+
+    assinante, perdidos = broadcaster.assinar(unidade_id, ultimo_id)
+
+    async def _stream() -> AsyncIterator[bytes]:
+        try:
+            yield b"retry: 2000\n\n"
+            if perdidos is None:
+                yield b"event: reset\ndata: {}\n\n"
+            for evento in perdidos or []:
+                yield evento.sse()
+            while not await request.is_disconnected():
+                try:
+                    evento = await asyncio.wait_for(
+                        assinante.fila.get(), timeout=settings.PEDIDO_EVENTOS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if evento is None:
+                    break
+                yield evento.sse()
+        finally:
+            broadcaster.cancelar(unidade_id, assinante)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    if canalPedido:
-        query = query.where(Pedido.canal_pedido == canalPedido)
-    if status:
-        query = query.where(Pedido.status == status)
-    if current_user.role == RoleEnum.CLIENTE:
-        query = query.where(Pedido.cliente_id == current_user.id)
 
-    return list(db.scalars(query.order_by(Pedido.id.desc())).all())
+@router.patch("/pedidos/status/lote", response_model=PedidoStatusLoteOut)
+def atualizar_status_em_lote(
+    payload: PedidoStatusLoteIn,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.COZINHA)),
+):
+    return atualizar_status_lote(db, payload.transicoes, current_user.id)
 
 
 @router.patch("/pedidos/{pedido_id}/status", response_model=PedidoOut)
@@ -40,16 +201,52 @@ def atualizar_status(
     pedido_id: int,
     payload: PedidoStatusUpdateIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.COZINHA)),
+    current_user: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.COZINHA)),
 ):
     return atualizar_status_pedido(db, pedido_id, payload.novo_status, current_user.id)
 
 
+# Declarada antes de /pagamentos/mock/{pedido_id} para "lote" não ser lido como pedido_id.
+@router.post("/pagamentos/mock/lote", response_model=list[PagamentoLoteResultadoOut])
+def processar_pagamentos_em_lote(
+    payload: PagamentoLoteIn,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+    idempotency_key: str | None = Header(default=None, max_length=120),
+):
+    if not idempotency_key:
+        return processar_pagamentos_lote(db, payload.pagamentos, payload.modo, current_user.id)
+    return idempotencia.executar(
+        db,
+        f"{current_user.id}:POST /pagamentos/mock/lote:{idempotency_key}",
+        hash_requisicao("POST", "/pagamentos/mock/lote", payload.model_dump_json()),
+        200,
+        lambda sessao: dumps(
+            [
+                resultado.model_dump(mode="json")
+                for resultado in processar_pagamentos_lote(sessao, payload.pagamentos, payload.modo, current_user.id)
+            ]
+        ).decode(),
+    )
+
+
 @router.post("/pagamentos/mock/{pedido_id}", response_model=PedidoOut)
 def processar_pagamento(
     pedido_id: int,
     payload: PagamentoProcessarIn,
     db: Session = Depends(get_db),
-    current_user: User = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+    current_user: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+    idempotency_key: str | None = Header(default=None, max_length=120),
 ):
-    return processar_pagamento_mock(db, pedido_id, payload.aprovado, payload.observacao, current_user.id)
+    if not idempotency_key:
+        return processar_pagamento_mock(db, pedido_id, payload.aprovado, payload.observacao, current_user.id)
+    caminho = f"/pagamentos/mock/{pedido_id}"
+    return idempotencia.executar(
+        db,
+        f"{current_user.id}:POST {caminho}:{idempotency_key}",
+        hash_requisicao("POST", caminho, payload.model_dump_json()),
+        200,
+        lambda sessao: PedidoOut.model_validate(
+            processar_pagamento_mock(sessao, pedido_id, payload.aprovado, payload.observacao, current_user.id)
+        ).model_dump_json(),
+    )
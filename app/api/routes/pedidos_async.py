@@ -0,0 +1,121 @@
+from fastapi import APIRouter, Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import Principal, get_current_user_async, require_roles_async
+from app.application.pedido_service import (
+    atualizar_status_lote_async,
+    atualizar_status_pedido_async,
+    criar_pedido_async,
+    processar_pagamento_mock_async,
+    processar_pagamentos_lote_async,
+)
+from app.core.json_rapido import dumps
+from app.db.session import get_async_db
+from app.domain.models import RoleEnum, User
+from app.infrastructure.idempotencia import hash_requisicao, idempotencia
+from app.schemas import (
+    PagamentoLoteIn,
+    PagamentoLoteResultadoOut,
+    PagamentoProcessarIn,
+    PedidoCreate,
+    PedidoOut,
+    PedidoStatusLoteIn,
+    PedidoStatusLoteOut,
+    PedidoStatusUpdateIn,
+)
+
+# Mesmos contratos das rotas de escrita em pedidos.py; registrado antes delas quando DB_ASYNC=true.
+router = APIRouter(tags=["Pedidos"])
+
+
+@router.post("/pedidos", response_model=PedidoOut, status_code=201)
+async def criar(
+    payload: PedidoCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async),
+    idempotency_key: str | None = Header(default=None, max_length=120),
+):
+    if not idempotency_key:
+        return await criar_pedido_async(db, current_user, payload)
+
+    async def _operacao(sessao: AsyncSession) -> str:
+        return PedidoOut.model_validate(await criar_pedido_async(sessao, current_user, payload)).model_dump_json()
+
+    return await idempotencia.executar_async(
+        db,
+        f"{current_user.id}:POST /pedidos:{idempotency_key}",
+        hash_requisicao("POST", "/pedidos", payload.model_dump_json()),
+        201,
+        _operacao,
+    )
+
+
+@router.patch("/pedidos/status/lote", response_model=PedidoStatusLoteOut)
+async def atualizar_status_em_lote(
+    payload: PedidoStatusLoteIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_roles_async(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.COZINHA)),
+):
+    return await atualizar_status_lote_async(db, payload.transicoes, current_user.id)
+
+
+@router.patch("/pedidos/{pedido_id}/status", response_model=PedidoOut)
+async def atualizar_status(
+    pedido_id: int,
+    payload: PedidoStatusUpdateIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_roles_async(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.COZINHA)),
+):
+    return await atualizar_status_pedido_async(db, pedido_id, payload.novo_status, current_user.id)
+
+
+@router.post("/pagamentos/mock/lote", response_model=list[PagamentoLoteResultadoOut])
+async def processar_pagamentos_em_lote(
+    payload: PagamentoLoteIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_roles_async(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+    idempotency_key: str | None = Header(default=None, max_length=120),
+):
+    if not idempotency_key:
+        return await processar_pagamentos_lote_async(db, payload.pagamentos, payload.modo, current_user.id)
+
+    async def _operacao(sessao: AsyncSession) -> str:
+        resultados = await processar_pagamentos_lote_async(sessao, payload.pagamentos, payload.modo, current_user.id)
+        return dumps([resultado.model_dump(mode="json") for resultado in resultados]).decode()
+
+    return await idempotencia.executar_async(
+        db,
+        f"{current_user.id}:POST /pagamentos/mock/lote:{idempotency_key}",
+        hash_requisicao("POST", "/pagamentos/mock/lote", payload.model_dump_json()),
+        200,
+        _operacao,
+    )
+
+
+@router.post("/pagamentos/mock/{pedido_id}", response_model=PedidoOut)
+async def processar_pagamento(
+    pedido_id: int,
+    payload: PagamentoProcessarIn,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(require_roles_async(RoleEnum.ADMIN, RoleEnum.GERENTE, RoleEnum.ATENDENTE)),
+    idempotency_key: str | None = Header(default=None, max_length=120),
+):
+    if not idempotency_key:
+        return await processar_pagamento_mock_async(
+            db, pedido_id, payload.aprovado, payload.observacao, current_user.id
+        )
+
+    async def _operacao(sessao: AsyncSession) -> str:
+        pedido = await processar_pagamento_mock_async(
+            sessao, pedido_id, payload.aprovado, payload.observacao, current_user.id
+        )
+        return PedidoOut.model_validate(pedido).model_dump_json()
+
+    caminho = f"/pagamentos/mock/{pedido_id}"
+    return await idempotencia.executar_async(
+        db,
+        f"{current_user.id}:POST {caminho}:{idempotency_key}",
+        hash_requisicao("POST", caminho, payload.model_dump_json()),
+        200,
+        _operacao,
+    )
@@ -0,0 +1,83 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import Principal, require_roles
+from app.application.exportacao_service import FORMATOS, comprimir_gzip, exportar_pedidos
+from app.application.vendas_service import (
+    AGRUPAMENTOS,
+    ORDENS_PRODUTOS,
+    consultar_produtos_mais_vendidos,
+    consultar_receita,
+)
+from app.core.json_rapido import JSONRapidoResponse
+from app.db.session import get_db
+from app.domain.models import CanalPedidoEnum, RoleEnum
+from app.schemas import ProdutoVendidoOut, ReceitaLinhaOut
+
+# Receita e produtos leem apenas os consolidados diários (vendas_diarias*), nunca pedidos/pedido_itens:
+# o custo depende do número de dias/unidades/canais do período, não do histórico. A exportação
+# é a exceção: percorre os pedidos do período em streaming.
+router = APIRouter(prefix="/relatorios", tags=["Relatórios"])
+
+
+def _validar_periodo(de: date | None, ate: date | None) -> None:
+    if de and ate and de > ate:
+        raise HTTPException(status_code=422, detail="Intervalo de datas inválido")
+
+
+@router.get("/receita", response_model=list[ReceitaLinhaOut])
+def receita(
+    agruparPor: list[str] = Query(default=list(AGRUPAMENTOS)),
+    de: date | None = None,
+    ate: date | None = None,
+    unidadeId: int | None = None,
+    canalPedido: CanalPedidoEnum | None = None,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE)),
+):
+    _validar_periodo(de, ate)
+    invalidos = [nome for nome in agruparPor if nome not in AGRUPAMENTOS]
+    if invalidos:
+        raise HTTPException(status_code=422, detail=f"agruparPor inválido: {', '.join(invalidos)}")
+    linhas = consultar_receita(db, list(dict.fromkeys(agruparPor)), de, ate, unidadeId, canalPedido)
+    return JSONRapidoResponse(linhas)
+
+
+@router.get("/produtos-mais-vendidos", response_model=list[ProdutoVendidoOut])
+def produtos_mais_vendidos(
+    de: date | None = None,
+    ate: date | None = None,
+    unidadeId: int | None = None,
+    canalPedido: CanalPedidoEnum | None = None,
+    ordem: str = Query(default="quantidade", pattern=f"^({'|'.join(ORDENS_PRODUTOS)})$"),
+    limit: int = Query(default=10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE)),
+):
+    _validar_periodo(de, ate)
+    return JSONRapidoResponse(consultar_produtos_mais_vendidos(db, limit, ordem, de, ate, unidadeId, canalPedido))
+
+
+@router.get("/pedidos/export", response_class=StreamingResponse)
+def exportar(
+    request: Request,
+    formato: str = Query(default="csv", pattern=f"^({'|'.join(FORMATOS)})$"),
+    de: date | None = None,
+    ate: date | None = None,
+    db: Session = Depends(get_db),
+    _: Principal = Depends(require_roles(RoleEnum.ADMIN, RoleEnum.GERENTE)),
+):
+    """Pedidos com itens e pagamento, uma linha por item, em CSV ou NDJSON (gzip se o cliente aceitar)."""
+    _validar_periodo(de, ate)
+    corpo = exportar_pedidos(db.get_bind(), formato, de, ate)
+    headers = {
+        "Content-Disposition": f'attachment; filename="pedidos_{de or "inicio"}_{ate or "hoje"}.{formato}"',
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        corpo = comprimir_gzip(corpo)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(corpo, media_type=FORMATOS[formato], headers=headers)
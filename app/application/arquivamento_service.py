@@ -0,0 +1,93 @@
+from collections.abc import Callable
+from datetime import datetime, timedelta
+
+from sqlalchemy import Engine, delete, func, insert, select
+
+from app.domain.models import (
+    PagamentoMock,
+    PagamentoMockArquivo,
+    Pedido,
+    PedidoArquivo,
+    PedidoItem,
+    PedidoItemArquivo,
+    PedidoStatusEnum,
+)
+
+STATUS_FINALIZADOS = (
+    PedidoStatusEnum.ENTREGUE,
+    PedidoStatusEnum.CANCELADO,
+    PedidoStatusEnum.PAGAMENTO_RECUSADO,
+)
+
+# Pares (origem, arquivo) na ordem de cópia; a exclusão segue a ordem inversa por causa das FKs.
+TABELAS = (
+    (Pedido, PedidoArquivo),
+    (PedidoItem, PedidoItemArquivo),
+    (PagamentoMock, PagamentoMockArquivo),
+)
+
+
+def _colunas(modelo) -> list[str]:
+    return [coluna.name for coluna in modelo.__table__.columns]
+
+
+def arquivar_pedidos(
+    bind: Engine,
+    idade_dias: int,
+    lote: int,
+    max_lotes: int | None = None,
+    progresso: Callable[[dict], None] | None = None,
+) -> dict[str, int]:
+    """Move pedidos finalizados há mais de `idade_dias` (com itens e pagamento) para as tabelas de arquivo.
+
+    Cada lote de até `lote` pedidos é copiado e apagado em uma transação própria: uma interrupção
+    perde no máximo o lote em andamento, e rodar de novo continua de onde parou.
+    """
+    corte = datetime.utcnow() - timedelta(days=idade_dias)
+    # SQLite (sem AUTOINCREMENT) reaproveita o maior id apagado: o pedido mais recente e o do
+    # pagamento mais recente ficam na tabela quente para que ids novos nunca colidam com o arquivo.
+    with bind.connect() as conn:
+        preservados = {
+            conn.scalar(select(func.max(Pedido.id))),
+            conn.scalar(select(PagamentoMock.pedido_id).order_by(PagamentoMock.id.desc()).limit(1)),
+        } - {None}
+    totais = {"lotes": 0, "pedidos": 0, "itens": 0, "pagamentos": 0}
+    ultimo_id = 0
+    while max_lotes is None or totais["lotes"] < max_lotes:
+        with bind.begin() as conn:
+            ids = conn.scalars(
+                select(Pedido.id)
+                .where(
+                    Pedido.id > ultimo_id,
+                    Pedido.id.not_in(preservados),
+                    Pedido.status.in_(STATUS_FINALIZADOS),
+                    Pedido.criado_em < corte,
+                )
+                .order_by(Pedido.id)
+                .limit(lote)
+            ).all()
+            if not ids:
+                break
+            # Cópia e exclusão pela mesma lista de ids: reavaliar o critério em cada comando poderia
+            # apagar, sob READ COMMITTED, um pedido finalizado depois da cópia sem tê-lo arquivado.
+            filtros = {
+                Pedido: Pedido.id.in_(ids),
+                PedidoItem: PedidoItem.pedido_id.in_(ids),
+                PagamentoMock: PagamentoMock.pedido_id.in_(ids),
+            }
+            copiados = {}
+            for origem, arquivo in TABELAS:
+                colunas = _colunas(origem)
+                consulta = select(*(origem.__table__.c[nome] for nome in colunas)).where(filtros[origem])
+                copiados[origem] = conn.execute(insert(arquivo).from_select(colunas, consulta)).rowcount
+            for origem, _ in reversed(TABELAS):
+                conn.execute(delete(origem).where(filtros[origem]))
+
+        ultimo_id = ids[-1]
+        totais["lotes"] += 1
+        totais["pedidos"] += copiados[Pedido]
+        totais["itens"] += copiados[PedidoItem]
+        totais["pagamentos"] += copiados[PagamentoMock]
+        if progresso:
+            progresso({**totais, "ultimo_id": ultimo_id})
+    return totais
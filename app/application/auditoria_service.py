@@ -0,0 +1,173 @@
+import gzip
+import os
+from collections.abc import Callable, Iterator
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import Engine, and_, delete, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.json_rapido import dumps
+from app.domain.models import AuditLog
+
+LINHAS_POR_BLOCO = 2000
+
+COLUNAS = (
+    AuditLog.id,
+    AuditLog.usuario_id,
+    AuditLog.acao,
+    AuditLog.entidade,
+    AuditLog.entidade_id,
+    AuditLog.detalhes,
+    AuditLog.criado_em,
+)
+
+
+def filtros_auditoria(
+    usuario_id: int | None = None,
+    acao: str | None = None,
+    entidade: str | None = None,
+    entidade_id: str | None = None,
+    criado_de: datetime | None = None,
+    criado_ate: datetime | None = None,
+) -> list:
+    condicoes = []
+    if usuario_id is not None:
+        condicoes.append(AuditLog.usuario_id == usuario_id)
+    if acao:
+        condicoes.append(AuditLog.acao == acao)
+    if entidade:
+        condicoes.append(AuditLog.entidade == entidade)
+    if entidade_id:
+        condicoes.append(AuditLog.entidade_id == entidade_id)
+    if criado_de:
+        condicoes.append(AuditLog.criado_em >= criado_de)
+    if criado_ate:
+        condicoes.append(AuditLog.criado_em <= criado_ate)
+    return condicoes
+
+
+def consulta_auditoria(
+    limit: int,
+    after_id: int | None = None,
+    usuario_id: int | None = None,
+    acao: str | None = None,
+    entidade: str | None = None,
+    entidade_id: str | None = None,
+    criado_de: datetime | None = None,
+    criado_ate: datetime | None = None,
+):
+    """Página da listagem do mais recente para o mais antigo, com uma linha a mais para o cursor.
+
+    Os filtros por usuário, ação e entidade têm índices terminados em `id` e ordenam por id. Só
+    com o período, a ordem é a do índice (criado_em, id), e o cursor continua do ponto
+    (criado_em, id) do registro `after_id`: o id de um registro gravado em lote não segue
+    necessariamente a ordem de criado_em.
+    """
+    query = select(*COLUNAS).where(
+        *filtros_auditoria(usuario_id, acao, entidade, entidade_id, criado_de, criado_ate)
+    )
+    if usuario_id is not None or acao or entidade:
+        ordem = (AuditLog.id.desc(),)
+        if after_id:
+            query = query.where(AuditLog.id < after_id)
+    else:
+        ordem = (AuditLog.criado_em.desc(), AuditLog.id.desc())
+        if after_id:
+            criado_em = select(AuditLog.criado_em).where(AuditLog.id == after_id).scalar_subquery()
+            query = query.where(tuple_(AuditLog.criado_em, AuditLog.id) < tuple_(criado_em, after_id))
+    return query.order_by(*ordem).limit(limit + 1)
+
+
+def listar_auditoria(db: Session, limit: int, after_id: int | None = None, **filtros) -> tuple[list[dict], int | None]:
+    """Registros do mais recente para o mais antigo, paginados por cursor (id)."""
+    linhas = [dict(linha) for linha in db.execute(consulta_auditoria(limit, after_id, **filtros)).mappings()]
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        return linhas, linhas[-1]["id"]
+    return linhas, None
+
+
+def exportar_auditoria(bind: Engine, filtros: list) -> Iterator[bytes]:
+    """Registros filtrados em ordem cronológica (id), em NDJSON, lidos com cursor no servidor."""
+    with bind.connect() as conn:
+        conn = conn.execution_options(yield_per=LINHAS_POR_BLOCO)
+        resultado = conn.execute(select(*COLUNAS).where(*filtros).order_by(AuditLog.id)).mappings()
+        for bloco in resultado.partitions():
+            yield b"".join(dumps(dict(linha)) + b"\n" for linha in bloco)
+
+
+def _somar_meses(mes: date, quantidade: int) -> date:
+    indice = mes.year * 12 + mes.month - 1 + quantidade
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _compactar_mes(bind: Engine, periodo, mes: date, destino: Path) -> str | None:
+    """Grava os registros do mês em NDJSON gzip; o nome leva a faixa de ids para nunca sobrescrever."""
+    destino.mkdir(parents=True, exist_ok=True)
+    temporario = destino / f".audit_logs_{mes:%Y-%m}.ndjson.gz.parcial"
+    primeiro_id = ultimo_id = None
+    with gzip.open(temporario, "wb") as arquivo, bind.connect() as conn:
+        resultado = conn.execution_options(yield_per=LINHAS_POR_BLOCO).execute(
+            select(*COLUNAS).where(periodo).order_by(AuditLog.id)
+        )
+        for bloco in resultado.mappings().partitions():
+            primeiro_id = primeiro_id or bloco[0]["id"]
+            ultimo_id = bloco[-1]["id"]
+            arquivo.write(b"".join(dumps(dict(linha)) + b"\n" for linha in bloco))
+    if primeiro_id is None:
+        temporario.unlink()
+        return None
+    final = destino / f"audit_logs_{mes:%Y-%m}_{primeiro_id}-{ultimo_id}.ndjson.gz"
+    os.replace(temporario, final)
+    return final.name
+
+
+def reter_auditoria(
+    bind: Engine,
+    meses: int,
+    lote: int,
+    destino: Path | None = None,
+    progresso: Callable[[dict], None] | None = None,
+) -> dict:
+    """Apaga de audit_logs os meses anteriores aos últimos `meses` meses completos (mais o atual).
+
+    Com `destino`, cada mês é antes compactado em um arquivo NDJSON gzip. A exclusão é feita em
+    lotes de `lote` registros, uma transação por lote; uma execução interrompida pode ser
+    repetida (um mês compactado de novo gera outro arquivo só com o que restou).
+    """
+    corte = _somar_meses(date.today().replace(day=1), -meses)
+    with bind.connect() as conn:
+        primeiro = conn.scalar(select(func.min(AuditLog.criado_em)))
+    totais: dict = {"meses": 0, "registros": 0, "arquivos": []}
+    if primeiro is None:
+        return totais
+
+    mes = primeiro.date().replace(day=1)
+    while mes < corte:
+        proximo = _somar_meses(mes, 1)
+        periodo = and_(
+            AuditLog.criado_em >= datetime.combine(mes, datetime.min.time()),
+            AuditLog.criado_em < datetime.combine(proximo, datetime.min.time()),
+        )
+        if destino is not None:
+            arquivo = _compactar_mes(bind, periodo, mes, destino)
+            if arquivo:
+                totais["arquivos"].append(arquivo)
+
+        apagados = 0
+        while True:
+            with bind.begin() as conn:
+                ids = conn.scalars(select(AuditLog.id).where(periodo).order_by(AuditLog.id).limit(lote)).all()
+                if not ids:
+                    break
+                apagados += conn.execute(
+                    delete(AuditLog).where(periodo, AuditLog.id.between(ids[0], ids[-1]))
+                ).rowcount
+        if apagados:
+            totais["meses"] += 1
+            totais["registros"] += apagados
+            if progresso:
+                progresso({"mes": f"{mes:%Y-%m}", "registros": apagados})
+        mes = proximo
+    return totais
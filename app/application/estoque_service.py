@@ -0,0 +1,96 @@
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Engine, select
+from sqlalchemy.orm import Session
+
+from app.db.upsert import upsert_somando
+from app.domain.models import Estoque, Produto, Unidade
+from app.schemas import EstoqueMovimentacaoIn, EstoqueSaldoOut
+
+LINHAS_POR_BLOCO = 500
+
+
+def _delta(mov: EstoqueMovimentacaoIn) -> int:
+    return mov.quantidade if mov.tipo == "ENTRADA" else -mov.quantidade
+
+
+def movimentar_estoque_lote(db: Session, movimentacoes: list[EstoqueMovimentacaoIn]) -> list[EstoqueSaldoOut]:
+    unidade_ids = {mov.unidade_id for mov in movimentacoes}
+    produto_ids = {mov.produto_id for mov in movimentacoes}
+
+    unidades = set(db.scalars(select(Unidade.id).where(Unidade.id.in_(unidade_ids), Unidade.ativo.is_(True))))
+    produtos = set(db.scalars(select(Produto.id).where(Produto.id.in_(produto_ids), Produto.ativo.is_(True))))
+    for mov in movimentacoes:
+        if mov.unidade_id not in unidades:
+            raise HTTPException(status_code=404, detail=f"Unidade {mov.unidade_id} não encontrada")
+        if mov.produto_id not in produtos:
+            raise HTTPException(status_code=404, detail=f"Produto {mov.produto_id} não encontrado")
+
+    saldos = {
+        (unidade_id, produto_id): quantidade
+        for unidade_id, produto_id, quantidade in db.execute(
+            select(Estoque.unidade_id, Estoque.produto_id, Estoque.quantidade).where(
+                Estoque.unidade_id.in_(unidade_ids), Estoque.produto_id.in_(produto_ids)
+            )
+        )
+    }
+
+    # Simula as linhas na ordem recebida: qualquer saída acima do saldo recusa o lote inteiro.
+    deltas: dict[tuple[int, int], int] = defaultdict(int)
+    for indice, mov in enumerate(movimentacoes):
+        chave = (mov.unidade_id, mov.produto_id)
+        deltas[chave] += _delta(mov)
+        if saldos.get(chave, 0) + deltas[chave] < 0:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Saldo insuficiente para saída na linha {indice + 1} (produto {mov.produto_id})",
+            )
+
+    # nao_negativo protege contra saídas concorrentes entre a leitura acima e a escrita.
+    gravados = upsert_somando(
+        db,
+        Estoque,
+        [
+            {"unidade_id": unidade_id, "produto_id": produto_id, "quantidade": delta}
+            for (unidade_id, produto_id), delta in deltas.items()
+        ],
+        ["unidade_id", "produto_id"],
+        ["quantidade"],
+        nao_negativo=True,
+    )
+    finais = {chave: quantidade for chave, (quantidade,) in gravados.items()}
+    if len(finais) != len(deltas):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Saldo alterado durante a movimentação, tente novamente")
+
+    # Saldo por linha a partir do saldo final gravado, descontando o que ainda viria depois da linha.
+    restante = dict(deltas)
+    resultado = []
+    for mov in movimentacoes:
+        chave = (mov.unidade_id, mov.produto_id)
+        restante[chave] -= _delta(mov)
+        saldo = finais[chave] - restante[chave]
+        resultado.append(EstoqueSaldoOut(unidade_id=mov.unidade_id, produto_id=mov.produto_id, quantidade=saldo))
+
+    db.commit()
+    return resultado
+
+
+def consultar_saldos(
+    bind: Engine, unidade_id: int, produto_ids: list[int] | None = None
+) -> Iterator[Sequence[tuple[int, int]]]:
+    """Blocos de (produto_id, quantidade) da unidade, em uma consulta pelo índice uq_unidade_produto.
+
+    Sem `produto_ids`, devolve todos os produtos com saldo na unidade. Produtos sem linha
+    de estoque não aparecem no resultado. Lê com cursor no servidor (`yield_per`), então a
+    memória fica limitada a um bloco de LINHAS_POR_BLOCO linhas; abre a própria conexão, que
+    fica presa ao gerador até o fim da resposta.
+    """
+    query = select(Estoque.produto_id, Estoque.quantidade).where(Estoque.unidade_id == unidade_id)
+    if produto_ids is not None:
+        query = query.where(Estoque.produto_id.in_(set(produto_ids)))
+    with bind.connect() as conn:
+        conn = conn.execution_options(yield_per=LINHAS_POR_BLOCO)
+        yield from conn.execute(query.order_by(Estoque.produto_id)).partitions()
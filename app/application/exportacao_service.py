@@ -0,0 +1,118 @@
+import csv
+import io
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import Engine, String, select, type_coerce
+
+from app.core.json_rapido import dumps
+from app.domain.models import (
+    PagamentoMock,
+    PagamentoMockArquivo,
+    Pedido,
+    PedidoArquivo,
+    PedidoItem,
+    PedidoItemArquivo,
+)
+
+# Uma linha por item de pedido, com os dados do pedido repetidos e o pagamento (se houver).
+COLUNAS = (
+    "pedido_id",
+    "criado_em",
+    "unidade_id",
+    "cliente_id",
+    "canal_pedido",
+    "status",
+    "valor_total",
+    "item_id",
+    "produto_id",
+    "quantidade",
+    "preco_unitario",
+    "pagamento_id",
+    "pagamento_status",
+    "pagamento_em",
+)
+FORMATOS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+LINHAS_POR_BLOCO = 2000
+_POSICOES_DATA = (COLUNAS.index("criado_em"), COLUNAS.index("pagamento_em"))
+
+# Arquivo primeiro (pedidos mais antigos), depois a tabela quente.
+FONTES = (
+    (PedidoArquivo, PedidoItemArquivo, PagamentoMockArquivo),
+    (Pedido, PedidoItem, PagamentoMock),
+)
+
+
+def consulta_exportacao(fonte: tuple, de: date | None, ate: date | None):
+    pedido, item, pagamento = fonte
+    query = (
+        select(
+            pedido.id,
+            pedido.criado_em,
+            pedido.unidade_id,
+            pedido.cliente_id,
+            # Enums lidos como texto: a saída usa o valor e não precisa converter linha a linha.
+            type_coerce(pedido.canal_pedido, String),
+            type_coerce(pedido.status, String),
+            pedido.valor_total,
+            item.id,
+            item.produto_id,
+            item.quantidade,
+            item.preco_unitario,
+            pagamento.id,
+            type_coerce(pagamento.status, String),
+            pagamento.criado_em,
+        )
+        .select_from(pedido)
+        .join(item, item.pedido_id == pedido.id)
+        .outerjoin(pagamento, pagamento.pedido_id == pedido.id)
+    )
+    if de:
+        query = query.where(pedido.criado_em >= datetime.combine(de, time.min))
+    if ate:
+        query = query.where(pedido.criado_em < datetime.combine(ate + timedelta(days=1), time.min))
+    return query.order_by(pedido.criado_em, pedido.id, item.id)
+
+
+def _csv(linhas: Sequence[Sequence]) -> bytes:
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer, lineterminator="\n")
+    for linha in linhas:
+        valores = list(linha)
+        for posicao in _POSICOES_DATA:
+            if valores[posicao] is not None:
+                valores[posicao] = valores[posicao].isoformat()
+        escritor.writerow(valores)
+    return buffer.getvalue().encode("utf-8")
+
+
+def _ndjson(linhas: Sequence[Sequence]) -> bytes:
+    return b"".join(dumps(dict(zip(COLUNAS, linha))) + b"\n" for linha in linhas)
+
+
+def exportar_pedidos(bind: Engine, formato: str, de: date | None = None, ate: date | None = None) -> Iterator[bytes]:
+    """Pedidos do período (dia de criação, inclusive), arquivados ou não, em blocos de CSV/NDJSON.
+
+    Lê com cursor no servidor (`yield_per`), então a memória fica limitada a um bloco de
+    LINHAS_POR_BLOCO linhas seja qual for o período. Abre a própria conexão, que fica presa ao
+    gerador até o fim da resposta.
+    """
+    codificar = _csv if formato == "csv" else _ndjson
+    if formato == "csv":
+        yield (",".join(COLUNAS) + "\n").encode("utf-8")
+    with bind.connect() as conn:
+        conn = conn.execution_options(yield_per=LINHAS_POR_BLOCO)
+        for fonte in FONTES:
+            for bloco in conn.execute(consulta_exportacao(fonte, de, ate)).partitions():
+                yield codificar(bloco)
+
+
+def comprimir_gzip(blocos: Iterable[bytes], nivel: int = 6) -> Iterator[bytes]:
+    """Comprime um corpo em blocos no formato gzip, sem acumulá-lo."""
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for bloco in blocos:
+        saida = compressor.compress(bloco)
+        if saida:
+            yield saida
+    yield compressor.flush()
@@ -0,0 +1,110 @@
+from collections import defaultdict
+
+from fastapi import HTTPException
+from sqlalchemy import Engine, case, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.domain.models import MovimentoFidelidade, MovimentoFidelidadeEnum, User
+
+# O extrato (fidelidade_movimentos) é a fonte da verdade; usuarios.pontos_fidelidade é um saldo
+# em cache alterado só por UPDATE relativo (pontos = pontos ± n) na mesma transação do lançamento.
+# Assim créditos e resgates simultâneos nunca sobrescrevem um ao outro, sem travar a linha antes.
+
+
+def creditar_pontos(db: Session, cliente_id: int, pontos: int, pedido_id: int | None = None) -> None:
+    """Credita pontos de um pagamento aprovado, na transação do chamador."""
+    creditar_pontos_lote(db, [(cliente_id, pontos, pedido_id)])
+
+
+def creditar_pontos_lote(db: Session, creditos: list[tuple[int, int, int | None]]) -> None:
+    """Vários créditos (cliente_id, pontos, pedido_id) com um UPDATE e um INSERT, na transação do chamador.
+
+    Clientes inexistentes são ignorados, como no crédito individual.
+    """
+    creditos = [credito for credito in creditos if credito[1] > 0]
+    if not creditos:
+        return
+    totais: dict[int, int] = defaultdict(int)
+    for cliente_id, pontos, _ in creditos:
+        totais[cliente_id] += pontos
+    existentes = set(
+        db.scalars(
+            update(User)
+            .where(User.id.in_(totais))
+            .values(pontos_fidelidade=User.pontos_fidelidade + case(totais, value=User.id))
+            .returning(User.id)
+            .execution_options(synchronize_session=False)
+        )
+    )
+    linhas = [
+        {
+            "cliente_id": cliente_id,
+            "tipo": MovimentoFidelidadeEnum.CREDITO_PAGAMENTO,
+            "pontos": pontos,
+            "pedido_id": pedido_id,
+        }
+        for cliente_id, pontos, pedido_id in creditos
+        if cliente_id in existentes
+    ]
+    if linhas:
+        db.execute(insert(MovimentoFidelidade), linhas)
+
+
+def resgatar_pontos(db: Session, cliente_id: int, pontos: int) -> int:
+    """Debita `pontos` se houver saldo e devolve o saldo restante; 404/409 caso contrário."""
+    saldo = db.scalar(
+        update(User)
+        .where(User.id == cliente_id, User.pontos_fidelidade >= pontos)
+        .values(pontos_fidelidade=User.pontos_fidelidade - pontos)
+        .returning(User.pontos_fidelidade)
+        .execution_options(synchronize_session=False)
+    )
+    if saldo is None:
+        db.rollback()
+        if db.scalar(select(User.id).where(User.id == cliente_id)) is None:
+            raise HTTPException(status_code=404, detail="Cliente não encontrado")
+        raise HTTPException(status_code=409, detail="Pontos insuficientes")
+
+    db.execute(
+        insert(MovimentoFidelidade).values(cliente_id=cliente_id, tipo=MovimentoFidelidadeEnum.RESGATE, pontos=-pontos)
+    )
+    db.commit()
+    return saldo
+
+
+def listar_extrato(db: Session, cliente_id: int, after_id: int | None, limit: int) -> tuple[list[dict], int | None]:
+    """Lançamentos do mais recente para o mais antigo, paginados por cursor (id)."""
+    query = select(
+        MovimentoFidelidade.id,
+        MovimentoFidelidade.tipo,
+        MovimentoFidelidade.pontos,
+        MovimentoFidelidade.pedido_id,
+        MovimentoFidelidade.criado_em,
+    ).where(MovimentoFidelidade.cliente_id == cliente_id)
+    if after_id:
+        query = query.where(MovimentoFidelidade.id < after_id)
+
+    query = query.order_by(MovimentoFidelidade.id.desc()).limit(limit + 1)
+    linhas = [dict(linha) for linha in db.execute(query).mappings()]
+    if len(linhas) > limit:
+        linhas = linhas[:limit]
+        return linhas, linhas[-1]["id"]
+    return linhas, None
+
+
+def reconciliar_saldos(bind: Engine) -> int:
+    """Regrava, em um único UPDATE, os saldos em cache que divergem da soma do extrato.
+
+    Devolve quantos clientes foram corrigidos. Em PostgreSQL, rode fora do pico: a soma é lida
+    no snapshot do comando e um crédito concorrente confirmado depois dele só seria visto
+    na próxima execução.
+    """
+    soma = (
+        select(func.coalesce(func.sum(MovimentoFidelidade.pontos), 0))
+        .where(MovimentoFidelidade.cliente_id == User.id)
+        .scalar_subquery()
+    )
+    with bind.begin() as conn:
+        return conn.execute(
+            update(User).where(User.pontos_fidelidade != soma).values(pontos_fidelidade=soma)
+        ).rowcount
@@ -1,10 +1,16 @@
 import json
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime
 from decimal import Decimal
 
 from fastapi import HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, case, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 
+from app.application.fidelidade_service import creditar_pontos, creditar_pontos_lote
+from app.application.vendas_service import registrar_venda, registrar_vendas
 from app.domain.models import (
     CanalPedidoEnum,
     Estoque,
@@ -17,8 +23,18 @@ from app.domain.models import (
     Unidade,
     User,
 )
-from app.infrastructure.audit import log_action
-from app.schemas import PedidoCreate
+from app.infrastructure.audit import log_action, log_actions
+from app.infrastructure.pedido_eventos import broadcaster
+from app.infrastructure.pos_commit import apos_commit
+from app.schemas import (
+    PagamentoLoteItemIn,
+    PagamentoLoteResultadoOut,
+    PedidoCreate,
+    PedidoOut,
+    PedidoStatusLoteItemIn,
+    PedidoStatusLoteOut,
+    PedidoStatusRejeitadoOut,
+)
 
 
 TRANSICOES_VALIDAS = {
@@ -26,6 +42,17 @@ TRANSICOES_VALIDAS = {
     PedidoStatusEnum.EM_PREPARO: {PedidoStatusEnum.PRONTO, PedidoStatusEnum.CANCELADO},
     PedidoStatusEnum.PRONTO: {PedidoStatusEnum.ENTREGUE, PedidoStatusEnum.CANCELADO},
 }
+# Mesmo mapa visto pelo destino: de quais status se pode chegar a cada um.
+ORIGENS_VALIDAS = {
+    destino: {origem for origem, destinos in TRANSICOES_VALIDAS.items() if destino in destinos}
+    for destino in set().union(*TRANSICOES_VALIDAS.values())
+}
+
+
+def publicar_evento_pedido(db: Session, pedido: Pedido, tipo: str) -> None:
+    """Notifica os painéis da unidade; chamar só depois do commit (que pode ser o de uma sessão externa)."""
+    unidade_id, dados = pedido.unidade_id, PedidoOut.model_validate(pedido).model_dump(mode="json")
+    apos_commit(db, lambda: broadcaster.publicar(unidade_id, tipo, dados))
 
 
 def criar_pedido(db: Session, cliente: User, pedido_in: PedidoCreate) -> Pedido:
@@ -36,44 +63,69 @@ def criar_pedido(db: Session, cliente: User, pedido_in: PedidoCreate) -> Pedido:
     if not unidade:
         raise HTTPException(status_code=404, detail="Unidade não encontrada")
 
+    produto_ids = {item.produto_id for item in pedido_in.itens}
+    precos = dict(db.execute(select(Produto.id, Produto.preco).where(Produto.id.in_(produto_ids), Produto.ativo.is_(True))).all())
+    saldos = dict(
+        db.execute(
+            select(Estoque.produto_id, Estoque.quantidade).where(
+                Estoque.unidade_id == pedido_in.unidade_id, Estoque.produto_id.in_(produto_ids)
+            )
+        ).all()
+    )
+
+    # Valida na ordem dos itens para manter as mesmas mensagens do fluxo item a item.
+    baixas: dict[int, int] = {}
+    for item in pedido_in.itens:
+        if item.produto_id not in precos:
+            raise HTTPException(status_code=404, detail=f"Produto {item.produto_id} não encontrado")
+        if item.produto_id not in saldos:
+            raise HTTPException(status_code=409, detail=f"Produto {item.produto_id} sem estoque para a unidade")
+        baixa = baixas.get(item.produto_id, 0) + item.quantidade
+        if saldos[item.produto_id] < baixa:
+            raise HTTPException(status_code=409, detail=f"Estoque insuficiente para produto {item.produto_id}")
+        baixas[item.produto_id] = baixa
+
+    # Baixa condicional em um único UPDATE: se outro pedido consumiu o saldo entre a leitura e a escrita,
+    # alguma linha deixa de casar com "quantidade >= baixa" e o pedido inteiro é desfeito.
+    baixa_por_produto = case(baixas, value=Estoque.produto_id)
+    resultado = db.execute(
+        update(Estoque)
+        .where(
+            Estoque.unidade_id == pedido_in.unidade_id,
+            Estoque.produto_id.in_(baixas),
+            Estoque.quantidade >= baixa_por_produto,
+        )
+        .values(quantidade=Estoque.quantidade - baixa_por_produto)
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount != len(baixas):
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Estoque insuficiente para um ou mais produtos")
+
+    total = sum((precos[item.produto_id] * item.quantidade for item in pedido_in.itens), Decimal("0.00"))
     pedido = Pedido(
         cliente_id=cliente.id,
         unidade_id=pedido_in.unidade_id,
         canal_pedido=CanalPedidoEnum(pedido_in.canalPedido),
         status=PedidoStatusEnum.AGUARDANDO_PAGAMENTO,
-        valor_total=Decimal("0.00"),
+        valor_total=total,
     )
     db.add(pedido)
     db.flush()
 
-    total = Decimal("0.00")
-
-    for item in pedido_in.itens:
-        produto = db.scalar(select(Produto).where(Produto.id == item.produto_id, Produto.ativo.is_(True)))
-        if not produto:
-            raise HTTPException(status_code=404, detail=f"Produto {item.produto_id} não encontrado")
-
-        estoque = db.scalar(
-            select(Estoque).where(Estoque.unidade_id == pedido_in.unidade_id, Estoque.produto_id == item.produto_id)
-        )
-        if not estoque:
-            raise HTTPException(status_code=409, detail=f"Produto {item.produto_id} sem estoque para a unidade")
-        if estoque.quantidade < item.quantidade:
-            raise HTTPException(status_code=409, detail=f"Estoque insuficiente para produto {item.produto_id}")
-
-        estoque.quantidade -= item.quantidade
-
-        db.add(
-            PedidoItem(
-                pedido_id=pedido.id,
-                produto_id=item.produto_id,
-                quantidade=item.quantidade,
-                preco_unitario=produto.preco,
-            )
-        )
-        total += produto.preco * item.quantidade
+    db.execute(
+        insert(PedidoItem),
+        [
+            {
+                "pedido_id": pedido.id,
+                "produto_id": item.produto_id,
+                "quantidade": item.quantidade,
+                "preco_unitario": precos[item.produto_id],
+            }
+            for item in pedido_in.itens
+        ],
+    )
 
-    pedido.valor_total = total
     log_action(
         db,
         usuario_id=cliente.id,
@@ -84,16 +136,11 @@ def criar_pedido(db: Session, cliente: User, pedido_in: PedidoCreate) -> Pedido:
     )
     db.commit()
     db.refresh(pedido)
+    publicar_evento_pedido(db, pedido, "pedido_criado")
     return pedido
 
 
-def processar_pagamento_mock(db: Session, pedido_id: int, aprovado: bool, observacao: str, executor_id: int) -> Pedido:
-    pedido = db.scalar(select(Pedido).where(Pedido.id == pedido_id))
-    if not pedido:
-        raise HTTPException(status_code=404, detail="Pedido não encontrado")
-    if pedido.status != PedidoStatusEnum.AGUARDANDO_PAGAMENTO:
-        raise HTTPException(status_code=409, detail="Pedido não está aguardando pagamento")
-
+def _payloads_pagamento(pedido: Pedido | Row, aprovado: bool, observacao: str) -> tuple[str, str]:
     status_pagamento = PagamentoStatusEnum.APROVADO if aprovado else PagamentoStatusEnum.RECUSADO
     payload_req = {
         "pedidoId": pedido.id,
@@ -105,21 +152,31 @@ def processar_pagamento_mock(db: Session, pedido_id: int, aprovado: bool, observ
         "mensagem": "Pagamento aprovado" if aprovado else "Pagamento recusado",
         "observacao": observacao,
     }
+    return json.dumps(payload_req, ensure_ascii=False), json.dumps(payload_resp, ensure_ascii=False)
+
+
+def processar_pagamento_mock(db: Session, pedido_id: int, aprovado: bool, observacao: str, executor_id: int) -> Pedido:
+    pedido = db.scalar(select(Pedido).where(Pedido.id == pedido_id))
+    if not pedido:
+        raise HTTPException(status_code=404, detail="Pedido não encontrado")
+    if pedido.status != PedidoStatusEnum.AGUARDANDO_PAGAMENTO:
+        raise HTTPException(status_code=409, detail="Pedido não está aguardando pagamento")
 
+    status_pagamento = PagamentoStatusEnum.APROVADO if aprovado else PagamentoStatusEnum.RECUSADO
+    payload_req, payload_resp = _payloads_pagamento(pedido, aprovado, observacao)
     db.add(
         PagamentoMock(
             pedido_id=pedido.id,
             status=status_pagamento,
-            payload_requisicao=json.dumps(payload_req, ensure_ascii=False),
-            payload_resposta=json.dumps(payload_resp, ensure_ascii=False),
+            payload_requisicao=payload_req,
+            payload_resposta=payload_resp,
         )
     )
 
     if aprovado:
         pedido.status = PedidoStatusEnum.PAGO
-        cliente = db.scalar(select(User).where(User.id == pedido.cliente_id))
-        if cliente:
-            cliente.pontos_fidelidade += int(pedido.valor_total)
+        creditar_pontos(db, pedido.cliente_id, int(pedido.valor_total), pedido.id)
+        registrar_venda(db, pedido, 1)
     else:
         pedido.status = PedidoStatusEnum.PAGAMENTO_RECUSADO
 
@@ -134,9 +191,127 @@ def processar_pagamento_mock(db: Session, pedido_id: int, aprovado: bool, observ
 
     db.commit()
     db.refresh(pedido)
+    publicar_evento_pedido(db, pedido, "pagamento_processado")
     return pedido
 
 
+def processar_pagamentos_lote(
+    db: Session, entradas: list[PagamentoLoteItemIn], modo: str, executor_id: int
+) -> list[PagamentoLoteResultadoOut]:
+    """Liquida vários pagamentos mock em uma transação, com uma consulta de pedidos e escritas em lote.
+
+    Em modo ABORTAR qualquer pedido inválido (inexistente, repetido no lote ou fora de
+    AGUARDANDO_PAGAMENTO) recusa o lote inteiro; em IGNORAR ele é pulado e reportado no resultado.
+    """
+    ids = {entrada.pedido_id for entrada in entradas}
+    pedidos = {
+        linha.id: linha
+        for linha in db.execute(
+            select(
+                Pedido.id,
+                Pedido.cliente_id,
+                Pedido.unidade_id,
+                Pedido.canal_pedido,
+                Pedido.status,
+                Pedido.valor_total,
+                Pedido.criado_em,
+            ).where(Pedido.id.in_(ids))
+        )
+    }
+
+    resultados: list[PagamentoLoteResultadoOut] = []
+    validas: dict[int, PagamentoLoteItemIn] = {}
+
+    def _recusar(indice: int, pedido_id: int, status_code: int, erro: str) -> None:
+        if modo == "ABORTAR":
+            db.rollback()
+            raise HTTPException(status_code=status_code, detail=f"{erro} (linha {indice + 1}, pedido {pedido_id})")
+        resultados.append(
+            PagamentoLoteResultadoOut(pedido_id=pedido_id, processado=False, status_code=status_code, erro=erro)
+        )
+
+    for indice, entrada in enumerate(entradas):
+        pedido = pedidos.get(entrada.pedido_id)
+        if pedido is None:
+            _recusar(indice, entrada.pedido_id, 404, "Pedido não encontrado")
+        elif entrada.pedido_id in validas:
+            _recusar(indice, entrada.pedido_id, 409, "Pedido repetido no lote")
+        elif pedido.status != PedidoStatusEnum.AGUARDANDO_PAGAMENTO:
+            _recusar(indice, entrada.pedido_id, 409, "Pedido não está aguardando pagamento")
+        else:
+            validas[entrada.pedido_id] = entrada
+            resultados.append(PagamentoLoteResultadoOut(pedido_id=entrada.pedido_id, processado=True, status_code=200))
+
+    if validas:
+        novo_status = {
+            pedido_id: PedidoStatusEnum.PAGO.name if entrada.aprovado else PedidoStatusEnum.PAGAMENTO_RECUSADO.name
+            for pedido_id, entrada in validas.items()
+        }
+        # A condição de status protege contra outro pagamento do mesmo pedido entre a leitura e a escrita.
+        atualizados = set(
+            db.scalars(
+                update(Pedido)
+                .where(Pedido.id.in_(validas), Pedido.status == PedidoStatusEnum.AGUARDANDO_PAGAMENTO)
+                .values(status=case(novo_status, value=Pedido.id))
+                .returning(Pedido.id)
+                .execution_options(synchronize_session=False)
+            )
+        )
+        for resultado in resultados:
+            if resultado.processado and resultado.pedido_id not in atualizados:
+                if modo == "ABORTAR":
+                    db.rollback()
+                    raise HTTPException(status_code=409, detail="Pedidos alterados durante o lote, tente novamente")
+                resultado.processado = False
+                resultado.status_code = 409
+                resultado.erro = "Pedido não está aguardando pagamento"
+                del validas[resultado.pedido_id]
+
+    if validas:
+        pagamentos = []
+        for pedido_id, entrada in validas.items():
+            payload_req, payload_resp = _payloads_pagamento(pedidos[pedido_id], entrada.aprovado, entrada.observacao)
+            status_pagamento = PagamentoStatusEnum.APROVADO if entrada.aprovado else PagamentoStatusEnum.RECUSADO
+            pagamentos.append(
+                {
+                    "pedido_id": pedido_id,
+                    "status": status_pagamento,
+                    "payload_requisicao": payload_req,
+                    "payload_resposta": payload_resp,
+                    "criado_em": datetime.utcnow(),
+                }
+            )
+        db.execute(insert(PagamentoMock), pagamentos)
+        log_actions(
+            db,
+            [
+                {
+                    "usuario_id": executor_id,
+                    "acao": "PROCESSAR_PAGAMENTO_MOCK",
+                    "entidade": "Pedido",
+                    "entidade_id": str(pagamento["pedido_id"]),
+                    "detalhes": f"Pagamento {pagamento['status']}",
+                }
+                for pagamento in pagamentos
+            ],
+        )
+
+        aprovados = [pedidos[pedido_id] for pedido_id, entrada in validas.items() if entrada.aprovado]
+        creditar_pontos_lote(db, [(pedido.cliente_id, int(pedido.valor_total), pedido.id) for pedido in aprovados])
+        registrar_vendas(db, aprovados, 1)
+
+    db.commit()
+
+    if validas:
+        processados = {resultado.pedido_id: resultado for resultado in resultados if resultado.processado}
+        for pedido in db.scalars(
+            select(Pedido).where(Pedido.id.in_(validas)).options(selectinload(Pedido.itens)).order_by(Pedido.id)
+        ):
+            processados[pedido.id].status = pedido.status
+            publicar_evento_pedido(db, pedido, "pagamento_processado")
+    return resultados
+
+
 def atualizar_status_pedido(db: Session, pedido_id: int, novo_status: PedidoStatusEnum, executor_id: int) -> Pedido:
     pedido = db.scalar(select(Pedido).where(Pedido.id == pedido_id))
     if not pedido:
@@ -146,7 +321,18 @@ def atualizar_status_pedido(db: Session, pedido_id: int, novo_status: PedidoStat
     if novo_status not in permitidos:
         raise HTTPException(status_code=409, detail=f"Transição inválida de {pedido.status} para {novo_status}")
 
-    pedido.status = novo_status
+    # Grava só se o status ainda for o lido: duas estações no mesmo pedido não passam as duas.
+    resultado = db.execute(
+        update(Pedido)
+        .where(Pedido.id == pedido.id, Pedido.status == pedido.status)
+        .values(status=novo_status)
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount != 1:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Pedido alterado por outra operação, tente novamente")
+    if novo_status == PedidoStatusEnum.CANCELADO:
+        registrar_venda(db, pedido, -1)
 
     log_action(
         db,
@@ -159,4 +345,180 @@ def atualizar_status_pedido(db: Session, pedido_id: int, novo_status: PedidoStat
 
     db.commit()
     db.refresh(pedido)
+    publicar_evento_pedido(db, pedido, "status_atualizado")
     return pedido
+
+
+def atualizar_status_lote(
+    db: Session, transicoes: list[PedidoStatusLoteItemIn], executor_id: int
+) -> PedidoStatusLoteOut:
+    """Aplica várias transições de status em uma transação, com um UPDATE condicional por status de destino.
+
+    Cada UPDATE só altera pedidos cujo status atual é uma origem válida para o destino
+    (TRANSICOES_VALIDAS), então a regra vale também contra estações concorrentes. Pedidos
+    inexistentes, repetidos ou em status incompatível são rejeitados sem afetar os demais.
+    """
+    rejeitados: list[PedidoStatusRejeitadoOut] = []
+    por_destino: dict[PedidoStatusEnum, list[int]] = defaultdict(list)
+    vistos: set[int] = set()
+    for transicao in transicoes:
+        if transicao.pedido_id in vistos:
+            rejeitados.append(
+                PedidoStatusRejeitadoOut(pedido_id=transicao.pedido_id, status_code=409, erro="Pedido repetido no lote")
+            )
+            continue
+        vistos.add(transicao.pedido_id)
+        por_destino[transicao.novo_status].append(transicao.pedido_id)
+
+    aplicados: set[int] = set()
+    cancelados = []
+    for novo_status, ids in por_destino.items():
+        origens = ORIGENS_VALIDAS.get(novo_status)
+        if not origens:
+            continue
+        linhas = db.execute(
+            update(Pedido)
+            .where(Pedido.id.in_(ids), Pedido.status.in_(origens))
+            .values(status=novo_status)
+            .returning(Pedido.id, Pedido.unidade_id, Pedido.canal_pedido, Pedido.valor_total, Pedido.criado_em)
+            .execution_options(synchronize_session=False)
+        ).all()
+        aplicados.update(linha.id for linha in linhas)
+        if novo_status == PedidoStatusEnum.CANCELADO:
+            cancelados = linhas
+
+    pendentes = {
+        pedido_id: novo_status
+        for novo_status, ids in por_destino.items()
+        for pedido_id in ids
+        if pedido_id not in aplicados
+    }
+    if pendentes:
+        atuais = dict(db.execute(select(Pedido.id, Pedido.status).where(Pedido.id.in_(pendentes))).all())
+        for pedido_id, novo_status in pendentes.items():
+            if pedido_id not in atuais:
+                rejeitados.append(
+                    PedidoStatusRejeitadoOut(pedido_id=pedido_id, status_code=404, erro="Pedido não encontrado")
+                )
+            else:
+                rejeitados.append(
+                    PedidoStatusRejeitadoOut(
+                        pedido_id=pedido_id,
+                        status_code=409,
+                        erro=f"Transição inválida de {atuais[pedido_id]} para {novo_status}",
+                    )
+                )
+
+    registrar_vendas(db, cancelados, -1)
+    log_actions(
+        db,
+        [
+            {
+                "usuario_id": executor_id,
+                "acao": "ATUALIZAR_STATUS_PEDIDO",
+                "entidade": "Pedido",
+                "entidade_id": str(transicao.pedido_id),
+                "detalhes": f"Novo status: {transicao.novo_status}",
+            }
+            for transicao in transicoes
+            if transicao.pedido_id in aplicados
+        ],
+    )
+    db.commit()
+
+    if aplicados:
+        for pedido in db.scalars(
+            select(Pedido).where(Pedido.id.in_(aplicados)).options(selectinload(Pedido.itens)).order_by(Pedido.id)
+        ):
+            publicar_evento_pedido(db, pedido, "status_atualizado")
+    posicao: dict[int, int] = {}
+    for indice, transicao in enumerate(transicoes):
+        posicao.setdefault(transicao.pedido_id, indice)
+    return PedidoStatusLoteOut(
+        aplicados=sorted(aplicados, key=posicao.__getitem__),
+        rejeitados=sorted(rejeitados, key=lambda rejeitado: posicao[rejeitado.pedido_id]),
+    )
+
+
+def consulta_listagem(
+    pedido,
+    limit: int,
+    canal: CanalPedidoEnum | None = None,
+    status: PedidoStatusEnum | None = None,
+    unidade_id: int | None = None,
+    criado_de: datetime | None = None,
+    criado_ate: datetime | None = None,
+    cliente_id: int | None = None,
+    after_id: int | None = None,
+):
+    """Página de GET /pedidos em `pedido` (Pedido ou PedidoArquivo): limit + 1 linhas, do id maior ao menor.
+
+    Paginação por cursor (keyset): cada página parte do último id visto em vez de usar OFFSET,
+    então o custo por página não cresce com o histórico.
+    """
+    query = select(
+        pedido.id,
+        pedido.cliente_id,
+        pedido.unidade_id,
+        pedido.canal_pedido,
+        pedido.status,
+        pedido.valor_total,
+        pedido.criado_em,
+    )
+    if canal:
+        query = query.where(pedido.canal_pedido == canal)
+    if status:
+        query = query.where(pedido.status == status)
+    if unidade_id:
+        query = query.where(pedido.unidade_id == unidade_id)
+    if criado_de:
+        query = query.where(pedido.criado_em >= criado_de)
+    if criado_ate:
+        query = query.where(pedido.criado_em <= criado_ate)
+    if cliente_id is not None:
+        query = query.where(pedido.cliente_id == cliente_id)
+    if after_id:
+        query = query.where(pedido.id < after_id)
+    return query.order_by(pedido.id.desc()).limit(limit + 1)
+
+
+# Versões assíncronas: reaproveitam as regras acima via AsyncSession.run_sync, que executa a função
+# síncrona em um greenlet sobre a conexão assíncrona (aiosqlite/asyncpg), sem ocupar thread do pool.
+# Os itens são carregados ainda dentro do greenlet porque lazy load fora dele não é permitido.
+
+
+def _com_itens(servico: Callable[..., Pedido]) -> Callable[..., Pedido]:
+    def _executar(db: Session, *args) -> Pedido:
+        pedido = servico(db, *args)
+        pedido.itens  # noqa: B018
+        return pedido
+
+    return _executar
+
+
+async def criar_pedido_async(db: AsyncSession, cliente: User, pedido_in: PedidoCreate) -> Pedido:
+    return await db.run_sync(_com_itens(criar_pedido), cliente, pedido_in)
+
+
+async def processar_pagamento_mock_async(
+    db: AsyncSession, pedido_id: int, aprovado: bool, observacao: str, executor_id: int
+) -> Pedido:
+    return await db.run_sync(_com_itens(processar_pagamento_mock), pedido_id, aprovado, observacao, executor_id)
+
+
+async def atualizar_status_pedido_async(
+    db: AsyncSession, pedido_id: int, novo_status: PedidoStatusEnum, executor_id: int
+) -> Pedido:
+    return await db.run_sync(_com_itens(atualizar_status_pedido), pedido_id, novo_status, executor_id)
+
+
+async def processar_pagamentos_lote_async(
+    db: AsyncSession, entradas: list[PagamentoLoteItemIn], modo: str, executor_id: int
+) -> list[PagamentoLoteResultadoOut]:
+    return await db.run_sync(processar_pagamentos_lote, entradas, modo, executor_id)
+
+
+async def atualizar_status_lote_async(
+    db: AsyncSession, transicoes: list[PedidoStatusLoteItemIn], executor_id: int
+) -> PedidoStatusLoteOut:
+    return await db.run_sync(atualizar_status_lote, transicoes, executor_id)
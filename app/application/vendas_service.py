@@ -0,0 +1,224 @@
+from collections import defaultdict
+from collections.abc import Sequence
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Engine, Row, delete, func, insert, select, union_all
+from sqlalchemy.orm import Session
+
+from app.db.upsert import upsert_somando
+from app.domain.models import (
+    CanalPedidoEnum,
+    Pedido,
+    PedidoArquivo,
+    PedidoItem,
+    PedidoItemArquivo,
+    PedidoStatusEnum,
+    VendaDiaria,
+    VendaDiariaProduto,
+)
+
+# Um pedido entra nos consolidados quando o pagamento é aprovado e sai quando é cancelado;
+# só estados pagos podem ser cancelados (TRANSICOES_VALIDAS), então a conta fecha.
+STATUS_VENDIDOS = (
+    PedidoStatusEnum.PAGO,
+    PedidoStatusEnum.EM_PREPARO,
+    PedidoStatusEnum.PRONTO,
+    PedidoStatusEnum.ENTREGUE,
+)
+
+AGRUPAMENTOS = {
+    "dia": VendaDiaria.dia,
+    "unidade": VendaDiaria.unidade_id,
+    "canal": VendaDiaria.canal_pedido,
+}
+ORDENS_PRODUTOS = ("quantidade", "receita")
+
+
+def _filtros_periodo(
+    modelo, de: date | None, ate: date | None, unidade_id: int | None = None, canal: CanalPedidoEnum | None = None
+) -> list:
+    filtros = []
+    if de:
+        filtros.append(modelo.dia >= de)
+    if ate:
+        filtros.append(modelo.dia <= ate)
+    if unidade_id:
+        filtros.append(modelo.unidade_id == unidade_id)
+    if canal:
+        filtros.append(modelo.canal_pedido == canal)
+    return filtros
+
+
+def registrar_venda(db: Session, pedido: Pedido, sinal: int) -> None:
+    """Soma (sinal=1) ou estorna (sinal=-1) o pedido nos consolidados do dia, na transação do chamador."""
+    registrar_vendas(db, [pedido], sinal)
+
+
+def registrar_vendas(db: Session, pedidos: Sequence[Pedido | Row], sinal: int) -> None:
+    """Como registrar_venda para vários pedidos: uma leitura de itens e um upsert por tabela.
+
+    Aceita entidades Pedido ou linhas Core com id, criado_em, unidade_id, canal_pedido e valor_total.
+    """
+    if not pedidos:
+        return
+    chaves = {pedido.id: (pedido.criado_em.date(), pedido.unidade_id, pedido.canal_pedido) for pedido in pedidos}
+    por_dia: dict[tuple, list] = defaultdict(lambda: [0, Decimal("0")])
+    for pedido in pedidos:
+        totais = por_dia[chaves[pedido.id]]
+        totais[0] += sinal
+        totais[1] += pedido.valor_total * sinal
+    upsert_somando(
+        db,
+        VendaDiaria,
+        [
+            {"dia": dia, "unidade_id": unidade_id, "canal_pedido": canal, "pedidos": qtd_pedidos, "receita": receita}
+            for (dia, unidade_id, canal), (qtd_pedidos, receita) in por_dia.items()
+        ],
+        ["dia", "unidade_id", "canal_pedido"],
+        ["pedidos", "receita"],
+    )
+
+    itens = db.execute(
+        select(
+            PedidoItem.pedido_id,
+            PedidoItem.produto_id,
+            func.sum(PedidoItem.quantidade),
+            func.sum(PedidoItem.quantidade * PedidoItem.preco_unitario),
+        )
+        .where(PedidoItem.pedido_id.in_(chaves))
+        .group_by(PedidoItem.pedido_id, PedidoItem.produto_id)
+    )
+    por_produto: dict[tuple, list] = defaultdict(lambda: [0, 0, Decimal("0")])
+    for pedido_id, produto_id, quantidade, receita in itens:
+        totais = por_produto[(*chaves[pedido_id], produto_id)]
+        totais[0] += sinal
+        totais[1] += quantidade * sinal
+        totais[2] += receita * sinal
+    if not por_produto:
+        return
+    upsert_somando(
+        db,
+        VendaDiariaProduto,
+        [
+            {
+                "dia": dia,
+                "unidade_id": unidade_id,
+                "canal_pedido": canal,
+                "produto_id": produto_id,
+                "pedidos": qtd_pedidos,
+                "quantidade": quantidade,
+                "receita": receita,
+            }
+            for (dia, unidade_id, canal, produto_id), (qtd_pedidos, quantidade, receita) in por_produto.items()
+        ],
+        ["dia", "unidade_id", "canal_pedido", "produto_id"],
+        ["pedidos", "quantidade", "receita"],
+    )
+
+
+def reconstruir_vendas(bind: Engine, de: date | None = None, ate: date | None = None) -> dict[str, int]:
+    """Recalcula os consolidados a partir dos pedidos (inclusive arquivados), no intervalo de dias informado."""
+    ramos_pedidos, ramos_itens = [], []
+    for pedido, item in ((Pedido, PedidoItem), (PedidoArquivo, PedidoItemArquivo)):
+        filtros = [pedido.status.in_(STATUS_VENDIDOS)]
+        if de:
+            filtros.append(pedido.criado_em >= datetime.combine(de, time.min))
+        if ate:
+            filtros.append(pedido.criado_em < datetime.combine(ate + timedelta(days=1), time.min))
+        colunas = (
+            func.date(pedido.criado_em).label("dia"),
+            pedido.unidade_id.label("unidade_id"),
+            pedido.canal_pedido.label("canal_pedido"),
+        )
+        ramos_pedidos.append(select(*colunas, pedido.valor_total.label("valor_total")).where(*filtros))
+        ramos_itens.append(
+            select(
+                *colunas,
+                item.pedido_id.label("pedido_id"),
+                item.produto_id.label("produto_id"),
+                item.quantidade.label("quantidade"),
+                (item.quantidade * item.preco_unitario).label("receita"),
+            )
+            .join(pedido, pedido.id == item.pedido_id)
+            .where(*filtros)
+        )
+    vendidos = union_all(*ramos_pedidos).subquery("vendidos")
+    itens = union_all(*ramos_itens).subquery("itens_vendidos")
+
+    pedidos = select(
+        vendidos.c.dia, vendidos.c.unidade_id, vendidos.c.canal_pedido, func.count(), func.sum(vendidos.c.valor_total)
+    ).group_by(vendidos.c.dia, vendidos.c.unidade_id, vendidos.c.canal_pedido)
+    produtos = select(
+        itens.c.dia,
+        itens.c.unidade_id,
+        itens.c.canal_pedido,
+        itens.c.produto_id,
+        func.count(itens.c.pedido_id.distinct()),
+        func.sum(itens.c.quantidade),
+        func.sum(itens.c.receita),
+    ).group_by(itens.c.dia, itens.c.unidade_id, itens.c.canal_pedido, itens.c.produto_id)
+
+    resumo = {}
+    with bind.begin() as conn:
+        for modelo, consulta, colunas in (
+            (VendaDiaria, pedidos, ["dia", "unidade_id", "canal_pedido", "pedidos", "receita"]),
+            (
+                VendaDiariaProduto,
+                produtos,
+                ["dia", "unidade_id", "canal_pedido", "produto_id", "pedidos", "quantidade", "receita"],
+            ),
+        ):
+            conn.execute(delete(modelo).where(*_filtros_periodo(modelo, de, ate)))
+            resultado = conn.execute(insert(modelo).from_select(colunas, consulta))
+            resumo[modelo.__tablename__] = resultado.rowcount
+    return resumo
+
+
+def consultar_receita(
+    db: Session,
+    agrupar_por: list[str],
+    de: date | None = None,
+    ate: date | None = None,
+    unidade_id: int | None = None,
+    canal: CanalPedidoEnum | None = None,
+) -> list[dict]:
+    """Pedidos e receita somados por qualquer combinação de dia, unidade e canal (só lê vendas_diarias)."""
+    colunas = [AGRUPAMENTOS[nome] for nome in agrupar_por]
+    pedidos = func.sum(VendaDiaria.pedidos)
+    query = (
+        select(*colunas, pedidos.label("pedidos"), func.sum(VendaDiaria.receita).label("receita"))
+        .where(*_filtros_periodo(VendaDiaria, de, ate, unidade_id, canal))
+        .group_by(*colunas)
+        .having(pedidos > 0)
+        .order_by(*colunas)
+    )
+    return [dict(linha) for linha in db.execute(query).mappings()]
+
+
+def consultar_produtos_mais_vendidos(
+    db: Session,
+    limite: int,
+    ordem: str = "quantidade",
+    de: date | None = None,
+    ate: date | None = None,
+    unidade_id: int | None = None,
+    canal: CanalPedidoEnum | None = None,
+) -> list[dict]:
+    """Ranking de produtos por quantidade ou receita no período (só lê vendas_diarias_produto)."""
+    quantidade = func.sum(VendaDiariaProduto.quantidade).label("quantidade")
+    receita = func.sum(VendaDiariaProduto.receita).label("receita")
+    query = (
+        select(
+            VendaDiariaProduto.produto_id,
+            func.sum(VendaDiariaProduto.pedidos).label("pedidos"),
+            quantidade,
+            receita,
+        )
+        .where(*_filtros_periodo(VendaDiariaProduto, de, ate, unidade_id, canal))
+        .group_by(VendaDiariaProduto.produto_id)
+        .having(quantidade > 0)
+        .order_by((receita if ordem == "receita" else quantidade).desc(), VendaDiariaProduto.produto_id)
+        .limit(limite)
+    )
+    return [dict(linha) for linha in db.execute(query).mappings()]
@@ -0,0 +1,52 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class TTLCache:
+    """Cache LRU limitado com expiração por entrada (epoch em segundos), seguro entre threads."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._dados: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entrada = self._dados.get(chave)
+            if entrada is None:
+                return default
+            expira_em, valor = entrada
+            if expira_em <= time.time():
+                del self._dados[chave]
+                return default
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave: Hashable, valor: Any, expira_em: float) -> None:
+        with self._lock:
+            self._dados[chave] = (expira_em, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.maxsize:
+                self._dados.popitem(last=False)
+
+    def pop(self, chave: Hashable) -> Any:
+        with self._lock:
+            entrada = self._dados.pop(chave, None)
+            return entrada[1] if entrada else None
+
+    def remover_se(self, condicao: Callable[[Any], bool]) -> int:
+        with self._lock:
+            chaves = [chave for chave, (_, valor) in self._dados.items() if condicao(valor)]
+            for chave in chaves:
+                del self._dados[chave]
+            return len(chaves)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self) -> int:
+        return len(self._dados)
@@ -1,13 +1,89 @@
+from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class EngineProfile(BaseModel):
+    """Ajustes aplicados ao engine: PRAGMAs por conexão (SQLite) e dimensionamento do pool."""
+
+    sqlite_pragmas: dict[str, str | int] = {}
+    pool_size: int | None = None
+    max_overflow: int | None = None
+    pool_timeout: float | None = None
+    pool_recycle: int | None = None
+    pool_pre_ping: bool = False
+
+
+ENGINE_PROFILES: dict[str, EngineProfile] = {
+    # Padrões do SQLAlchemy, sem PRAGMAs (comportamento original).
+    "padrao": EngineProfile(),
+    # SQLite com WAL: leitores não bloqueiam o escritor e escritores aguardam o lock em vez de falhar.
+    "sqlite_wal": EngineProfile(
+        sqlite_pragmas={
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "mmap_size": 268435456,
+            "cache_size": -65536,
+            "busy_timeout": 10000,
+        },
+        pool_size=10,
+        max_overflow=20,
+    ),
+    # PostgreSQL/servidores: pool dimensionado, reciclagem e verificação de conexões mortas.
+    "servidor": EngineProfile(pool_size=10, max_overflow=20, pool_timeout=30, pool_recycle=1800, pool_pre_ping=True),
+    "servidor_alta_carga": EngineProfile(
+        pool_size=40, max_overflow=40, pool_timeout=10, pool_recycle=1800, pool_pre_ping=True
+    ),
+}
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
     APP_NAME: str = "Projeto Back End - Lanchonete"
     SECRET_KEY: str = "troque-essa-chave-em-producao"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 120
+    PASSWORD_HASH_ITERATIONS: int = 390000
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    # Cache de identidade por processo: fora dele o perfil é lido do banco, então uma troca de perfil
+    # chega aos demais workers em até PRINCIPAL_CACHE_TTL_SECONDS (mantenha-o curto).
+    PRINCIPAL_CACHE_MAX: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    CATALOG_CACHE_TTL_SECONDS: int = 60
+    # sync: auditoria na mesma transação; db/ndjson: gravação em lote por uma thread de fundo.
+    AUDIT_MODE: str = "sync"
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_QUEUE_TIMEOUT_SECONDS: float = 0.5
+    AUDIT_NDJSON_PATH: str = "./audit.ndjson"
+    # Retenção (python -m app.db.reter_auditoria): meses completos mantidos em audit_logs.
+    AUDIT_RETENCAO_MESES: int = 12
+    PEDIDO_EVENTOS_BUFFER: int = 100
+    PEDIDO_EVENTOS_HISTORICO: int = 500
+    PEDIDO_EVENTOS_HEARTBEAT_SECONDS: float = 15.0
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_CACHE_MAX: int = 10000
+    IDEMPOTENCY_WAIT_SECONDS: float = 30.0
+    # Métricas Prometheus em /metrics; requisições com mais comandos SQL que o orçamento geram aviso no log.
+    METRICS_ENABLED: bool = True
+    METRICS_QUERY_BUDGET: int = 25
+    # Arquivamento (python -m app.db.arquivar_pedidos): pedidos finalizados há mais de N dias, em lotes.
+    ARQUIVO_IDADE_DIAS: int = 30
+    ARQUIVO_LOTE: int = 5000
     DATABASE_URL: str = "sqlite:///./app.db"
+    # Nome de um perfil de ENGINE_PROFILES.
+    DB_PROFILE: str = "padrao"
+    # Quando ativo, as rotas de escrita de pedidos/pagamentos usam AsyncSession (aiosqlite/asyncpg).
+    DB_ASYNC: bool = False
+
+    @property
+    def engine_profile(self) -> EngineProfile:
+        try:
+            return ENGINE_PROFILES[self.DB_PROFILE]
+        except KeyError as exc:
+            raise ValueError(f"DB_PROFILE desconhecido: {self.DB_PROFILE}") from exc
 
 
 settings = Settings()
@@ -17,7 +17,11 @@ def register_error_handlers(app: FastAPI) -> None:
     @app.exception_handler(HTTPException)
     async def http_exception_handler(_: Request, exc: HTTPException):
         message = exc.detail if isinstance(exc.detail, str) else "Erro de requisição"
-        return JSONResponse(status_code=exc.status_code, content=error_payload(f"HTTP_{exc.status_code}", message))
+        return JSONResponse(
+            status_code=exc.status_code,
+            content=error_payload(f"HTTP_{exc.status_code}", message),
+            headers=exc.headers,
+        )
 
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(_: Request, exc: RequestValidationError):
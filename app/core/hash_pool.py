@@ -0,0 +1,51 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.security import hash_password, verify_password
+
+# PBKDF2 roda em processos dedicados para não ocupar o threadpool das rotas nem disputar o GIL.
+# A admissão é limitada a workers + fila; acima disso a requisição recebe 503 com Retry-After.
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_admissao = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+        return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+async def _executar(funcao, *args):
+    if not _admissao.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de autenticação ocupado, tente novamente",
+            headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER_SECONDS)},
+        )
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), funcao, *args)
+    finally:
+        _admissao.release()
+
+
+async def hash_password_async(password: str) -> str:
+    return await _executar(hash_password, password, settings.PASSWORD_HASH_ITERATIONS)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await _executar(verify_password, password, password_hash)
@@ -0,0 +1,43 @@
+from collections.abc import Iterable, Iterator
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+# Serialização direta de linhas Core (dicts com Decimal, datetime e enums) sem passar pelos
+# modelos Pydantic. A saída segue o JSON do Pydantic: Decimal como string ("22.50"),
+# datetime em ISO 8601 e enums pelo valor.
+
+
+def _padrao(valor: Any) -> Any:
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError
+
+
+def dumps(valor: Any) -> bytes:
+    return orjson.dumps(valor, default=_padrao)
+
+
+def stream_array(itens: Iterable[Any], tamanho_bloco: int = 500) -> Iterator[bytes]:
+    """Array JSON em blocos de `tamanho_bloco` itens, sem montar o corpo inteiro em memória."""
+    yield b"["
+    bloco: list[bytes] = []
+    primeiro = True
+    for item in itens:
+        bloco.append(item if isinstance(item, bytes) else dumps(item))
+        if len(bloco) == tamanho_bloco:
+            yield (b"" if primeiro else b",") + b",".join(bloco)
+            primeiro = False
+            bloco = []
+    if bloco:
+        yield (b"" if primeiro else b",") + b",".join(bloco)
+    yield b"]"
+
+
+class JSONRapidoResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -13,8 +13,8 @@ class AuthError(Exception):
     pass
 
 
-def hash_password(password: str) -> str:
-    iterations = 390000
+def hash_password(password: str, iterations: int | None = None) -> str:
+    iterations = iterations or settings.PASSWORD_HASH_ITERATIONS
     salt = os.urandom(16)
     digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
     salt_b64 = base64.b64encode(salt).decode("utf-8")
@@ -35,9 +35,21 @@ def verify_password(password: str, password_hash: str) -> bool:
         return False
 
 
-def create_access_token(subject: str) -> str:
-    expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    payload = {"sub": subject, "exp": expire}
+def needs_rehash(password_hash: str) -> bool:
+    try:
+        algorithm, iterations, _, _ = password_hash.split("$")
+        return algorithm != "pbkdf2_sha256" or int(iterations) != settings.PASSWORD_HASH_ITERATIONS
+    except ValueError:
+        return True
+
+
+def create_access_token(subject: str, user_id: int | None = None, role: str | None = None) -> str:
+    now = datetime.now(timezone.utc)
+    expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    payload = {"sub": subject, "iat": now, "exp": expire}
+    # Com id e perfil no token, as rotas protegidas por perfil autorizam sem consultar o usuário no banco.
+    if user_id is not None and role is not None:
+        payload.update({"uid": user_id, "role": role})
     return jwt.encode(payload, settings.SECRET_KEY, algorithm="HS256")
 
 
@@ -0,0 +1,41 @@
+"""Arquiva pedidos finalizados antigos (ENTREGUE, CANCELADO, PAGAMENTO_RECUSADO).
+
+Move pedidos criados há mais de --idade-dias, com seus itens e pagamentos, de pedidos,
+pedido_itens e pagamentos_mock para pedidos_arquivo, pedido_itens_arquivo e
+pagamentos_mock_arquivo, em lotes de --lote pedidos (uma transação por lote). Pode ser
+interrompido e executado de novo a qualquer momento; é seguro rodar com a API no ar.
+
+Uso: python -m app.db.arquivar_pedidos [--idade-dias 30] [--lote 5000] [--max-lotes N]
+"""
+
+import argparse
+import json
+
+from app.application.arquivamento_service import arquivar_pedidos
+from app.core.config import settings
+from app.db.migrations import aplicar_migracoes
+from app.db.session import engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idade-dias", type=int, default=settings.ARQUIVO_IDADE_DIAS)
+    parser.add_argument("--lote", type=int, default=settings.ARQUIVO_LOTE, help="pedidos por transação")
+    parser.add_argument("--max-lotes", type=int, default=None, help="para depois de N lotes")
+    args = parser.parse_args()
+    if args.idade_dias < 0 or args.lote < 1:
+        parser.error("--idade-dias não pode ser negativo e --lote deve ser positivo")
+
+    aplicar_migracoes(engine)
+    resumo = arquivar_pedidos(
+        engine,
+        args.idade_dias,
+        args.lote,
+        args.max_lotes,
+        progresso=lambda parcial: print(json.dumps(parcial), flush=True),
+    )
+    print(json.dumps(resumo, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""Gerador de massa sintética para testes de escala.
+
+Preenche todas as tabelas de negócio (usuários por perfil, unidades, produtos, estoques, pedidos,
+itens, pagamentos mock, extrato de fidelidade e auditoria) de forma determinística: a mesma
+semente, escala e --data-final produzem as mesmas linhas num banco recém-criado. Usa inserts Core
+em lote (executemany) em transações por bloco de pedidos, com IDs atribuídos aqui para que itens,
+pagamentos e auditoria referenciem o pedido sem ler nada de volta. O hash de senha é calculado
+uma vez e compartilhado por todos os usuários gerados (senha SENHA_SINTETICA). Ao final, os
+consolidados diários de vendas são recalculados a partir dos pedidos gerados.
+
+Uso: DATABASE_URL=sqlite:///./escala.db python -m app.db.dados_sinteticos
+     [--unidades 500] [--produtos 5000] [--clientes 100000] [--pedidos 1000000]
+     [--produtos-por-unidade 200] [--dias 365] [--semente 42] [--lote 10000]
+"""
+
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Connection, Engine, Table, bindparam, func, select, text, update
+
+from app.application.vendas_service import reconstruir_vendas
+from app.core.security import hash_password
+from app.db.migrations import aplicar_migracoes
+from app.db.session import engine
+from app.domain.models import (
+    AuditLog,
+    CanalPedidoEnum,
+    Estoque,
+    MovimentoFidelidade,
+    MovimentoFidelidadeEnum,
+    PagamentoMock,
+    PagamentoStatusEnum,
+    Pedido,
+    PedidoItem,
+    PedidoStatusEnum,
+    Produto,
+    RoleEnum,
+    Unidade,
+    User,
+)
+
+SENHA_SINTETICA = "senha123"
+DOMINIO = "sintetico.lanchonete.com"
+CIDADES = ("Curitiba", "São Paulo", "Porto Alegre", "Florianópolis", "Belo Horizonte", "Recife", "Salvador", "Goiânia")
+CATEGORIAS = ("Burger", "Pizza", "Wrap", "Salada", "Suco", "Refrigerante", "Sobremesa", "Combo")
+EQUIPE = (RoleEnum.GERENTE, RoleEnum.ATENDENTE, RoleEnum.COZINHA)
+CANAIS = list(CanalPedidoEnum)
+# Pedidos com mais de um dia já terminaram o fluxo (ou foram abandonados); os recentes estão em qualquer etapa.
+STATUS_ANTIGOS = (
+    (PedidoStatusEnum.ENTREGUE, 85),
+    (PedidoStatusEnum.CANCELADO, 5),
+    (PedidoStatusEnum.PAGAMENTO_RECUSADO, 5),
+    (PedidoStatusEnum.AGUARDANDO_PAGAMENTO, 5),
+)
+STATUS_RECENTES = (
+    (PedidoStatusEnum.AGUARDANDO_PAGAMENTO, 20),
+    (PedidoStatusEnum.PAGO, 15),
+    (PedidoStatusEnum.EM_PREPARO, 15),
+    (PedidoStatusEnum.PRONTO, 10),
+    (PedidoStatusEnum.ENTREGUE, 30),
+    (PedidoStatusEnum.CANCELADO, 5),
+    (PedidoStatusEnum.PAGAMENTO_RECUSADO, 5),
+)
+
+
+@dataclass(frozen=True)
+class Escala:
+    unidades: int
+    produtos: int
+    clientes: int
+    pedidos: int
+    produtos_por_unidade: int
+    itens_max: int = 5
+
+
+def _proximo_id(conn: Connection, tabela: Table) -> int:
+    return (conn.scalar(select(func.max(tabela.c.id))) or 0) + 1
+
+
+def _inserir(conn: Connection, tabela: Table, linhas: list[dict]) -> None:
+    if linhas:
+        conn.execute(tabela.insert(), linhas)
+
+
+def _centavos(valor: int) -> Decimal:
+    return Decimal(valor).scaleb(-2)
+
+
+def _ajustar_sequencias(conn: Connection, tabelas: list[Table]) -> None:
+    # IDs explícitos não avançam as sequências do PostgreSQL; sem isto o próximo INSERT da API colide.
+    if conn.dialect.name != "postgresql":
+        return
+    for tabela in tabelas:
+        conn.execute(
+            text(f"SELECT setval(pg_get_serial_sequence('{tabela.name}', 'id'), (SELECT max(id) FROM {tabela.name}))")
+        )
+
+
+def _gerar_cadastros(conn: Connection, escala: Escala, rng: random.Random, senha_hash: str, agora: datetime) -> dict:
+    usuarios, unidades, produtos, estoques = (
+        User.__table__,
+        Unidade.__table__,
+        Produto.__table__,
+        Estoque.__table__,
+    )
+    primeira_unidade = _proximo_id(conn, unidades)
+    unidade_ids = list(range(primeira_unidade, primeira_unidade + escala.unidades))
+    _inserir(
+        conn,
+        unidades,
+        [{"id": uid, "nome": f"Unidade {uid}", "cidade": rng.choice(CIDADES), "ativo": True} for uid in unidade_ids],
+    )
+
+    primeiro_produto = _proximo_id(conn, produtos)
+    produto_ids = list(range(primeiro_produto, primeiro_produto + escala.produtos))
+    precos = {pid: rng.randint(500, 6000) for pid in produto_ids}
+    _inserir(
+        conn,
+        produtos,
+        [
+            {
+                "id": pid,
+                "nome": f"{rng.choice(CATEGORIAS)} {pid}",
+                "descricao": "Produto sintético",
+                "preco": _centavos(precos[pid]),
+                "ativo": True,
+            }
+            for pid in produto_ids
+        ],
+    )
+
+    cardapios = {}
+    linhas_estoque = []
+    proximo_estoque = _proximo_id(conn, estoques)
+    for uid in unidade_ids:
+        cardapios[uid] = rng.sample(produto_ids, min(escala.produtos_por_unidade, len(produto_ids)))
+        for pid in cardapios[uid]:
+            linhas_estoque.append(
+                {"id": proximo_estoque, "unidade_id": uid, "produto_id": pid, "quantidade": rng.randint(50, 500)}
+            )
+            proximo_estoque += 1
+    _inserir(conn, estoques, linhas_estoque)
+
+    proximo_usuario = _proximo_id(conn, usuarios)
+    linhas_usuarios = []
+    atendentes = {}
+    for uid in unidade_ids:
+        for role in EQUIPE:
+            if role == RoleEnum.ATENDENTE:
+                atendentes[uid] = proximo_usuario
+            linhas_usuarios.append(
+                {
+                    "id": proximo_usuario,
+                    "nome": f"{role.value.title()} {uid}",
+                    "email": f"{role.value.lower()}{proximo_usuario}@{DOMINIO}",
+                    "senha_hash": senha_hash,
+                    "role": role,
+                    "consentimento_lgpd": True,
+                    "pontos_fidelidade": 0,
+                    "criado_em": agora,
+                }
+            )
+            proximo_usuario += 1
+    cliente_ids = list(range(proximo_usuario, proximo_usuario + escala.clientes))
+    linhas_usuarios.extend(
+        {
+            "id": cid,
+            "nome": f"Cliente {cid}",
+            "email": f"cliente{cid}@{DOMINIO}",
+            "senha_hash": senha_hash,
+            "role": RoleEnum.CLIENTE,
+            "consentimento_lgpd": True,
+            "pontos_fidelidade": 0,
+            "criado_em": agora,
+        }
+        for cid in cliente_ids
+    )
+    _inserir(conn, usuarios, linhas_usuarios)
+
+    return {
+        "unidade_ids": unidade_ids,
+        "cliente_ids": cliente_ids,
+        "cardapios": cardapios,
+        "precos": precos,
+        "atendentes": atendentes,
+    }
+
+
+def _gerar_bloco(
+    cadastros: dict,
+    escala: Escala,
+    rng: random.Random,
+    primeiro_id: dict[str, int],
+    quantidade: int,
+    inicio: datetime,
+    passo: timedelta,
+    limite_recente: datetime,
+    pontos: dict[int, int],
+) -> dict[str, list[dict]]:
+    linhas = {"pedidos": [], "itens": [], "pagamentos": [], "fidelidade": [], "auditoria": []}
+    status_antigos, pesos_antigos = zip(*STATUS_ANTIGOS)
+    status_recentes, pesos_recentes = zip(*STATUS_RECENTES)
+    item_id = primeiro_id["itens"]
+    pagamento_id = primeiro_id["pagamentos"]
+
+    for deslocamento in range(quantidade):
+        pedido_id = primeiro_id["pedidos"] + deslocamento
+        criado_em = inicio + passo * deslocamento
+        unidade_id = rng.choice(cadastros["unidade_ids"])
+        cliente_id = rng.choice(cadastros["cliente_ids"])
+        canal = rng.choice(CANAIS)
+        if criado_em < limite_recente:
+            status = rng.choices(status_antigos, pesos_antigos)[0]
+        else:
+            status = rng.choices(status_recentes, pesos_recentes)[0]
+
+        total = 0
+        cardapio = cadastros["cardapios"][unidade_id]
+        for produto_id in rng.sample(cardapio, min(rng.randint(1, escala.itens_max), len(cardapio))):
+            preco = cadastros["precos"][produto_id]
+            quantidade_item = rng.randint(1, 3)
+            total += preco * quantidade_item
+            linhas["itens"].append(
+                {
+                    "id": item_id,
+                    "pedido_id": pedido_id,
+                    "produto_id": produto_id,
+                    "quantidade": quantidade_item,
+                    "preco_unitario": _centavos(preco),
+                }
+            )
+            item_id += 1
+
+        valor_total = _centavos(total)
+        linhas["pedidos"].append(
+            {
+                "id": pedido_id,
+                "cliente_id": cliente_id,
+                "unidade_id": unidade_id,
+                "canal_pedido": canal,
+                "status": status,
+                "valor_total": valor_total,
+                "criado_em": criado_em,
+            }
+        )
+        linhas["auditoria"].append(
+            {
+                "usuario_id": cliente_id,
+                "acao": "CRIAR_PEDIDO",
+                "entidade": "Pedido",
+                "entidade_id": str(pedido_id),
+                "detalhes": f"Pedido criado via canal {canal}",
+                "criado_em": criado_em,
+            }
+        )
+
+        if status == PedidoStatusEnum.AGUARDANDO_PAGAMENTO:
+            continue
+        aprovado = status != PedidoStatusEnum.PAGAMENTO_RECUSADO
+        status_pagamento = PagamentoStatusEnum.APROVADO if aprovado else PagamentoStatusEnum.RECUSADO
+        pago_em = criado_em + timedelta(seconds=rng.randint(20, 300))
+        linhas["pagamentos"].append(
+            {
+                "id": pagamento_id,
+                "pedido_id": pedido_id,
+                "status": status_pagamento,
+                "payload_requisicao": json.dumps(
+                    {"pedidoId": pedido_id, "valor": str(valor_total), "canalPedido": canal}, ensure_ascii=False
+                ),
+                "payload_resposta": json.dumps(
+                    {
+                        "status": status_pagamento,
+                        "mensagem": "Pagamento aprovado" if aprovado else "Pagamento recusado",
+                        "observacao": "",
+                    },
+                    ensure_ascii=False,
+                ),
+                "criado_em": pago_em,
+            }
+        )
+        pagamento_id += 1
+        linhas["auditoria"].append(
+            {
+                "usuario_id": cadastros["atendentes"][unidade_id],
+                "acao": "PROCESSAR_PAGAMENTO_MOCK",
+                "entidade": "Pedido",
+                "entidade_id": str(pedido_id),
+                "detalhes": f"Pagamento {status_pagamento}",
+                "criado_em": pago_em,
+            }
+        )
+        if aprovado and total // 100:
+            pontos[cliente_id] = pontos.get(cliente_id, 0) + total // 100
+            linhas["fidelidade"].append(
+                {
+                    "cliente_id": cliente_id,
+                    "tipo": MovimentoFidelidadeEnum.CREDITO_PAGAMENTO,
+                    "pontos": total // 100,
+                    "pedido_id": pedido_id,
+                    "criado_em": pago_em,
+                }
+            )
+
+    return linhas
+
+
+def _gravar_pontos(bind: Engine, pontos: dict[int, int], lote: int) -> None:
+    usuarios = User.__table__
+    comando = (
+        update(usuarios)
+        .where(usuarios.c.id == bindparam("b_id"))
+        .values(pontos_fidelidade=usuarios.c.pontos_fidelidade + bindparam("b_pontos"))
+    )
+    linhas = [{"b_id": cliente_id, "b_pontos": valor} for cliente_id, valor in sorted(pontos.items())]
+    for inicio in range(0, len(linhas), lote):
+        with bind.begin() as conn:
+            conn.execute(comando, linhas[inicio : inicio + lote])
+
+
+def gerar(
+    bind: Engine, escala: Escala, semente: int, data_final: date, dias: int, lote: int, progresso: bool = True
+) -> dict:
+    rng = random.Random(semente)
+    fim = datetime.combine(data_final, datetime.min.time())
+    inicio = fim - timedelta(days=dias)
+    agora = inicio
+    senha_hash = hash_password(SENHA_SINTETICA)
+    tabelas = {
+        "pedidos": Pedido.__table__,
+        "itens": PedidoItem.__table__,
+        "pagamentos": PagamentoMock.__table__,
+        "fidelidade": MovimentoFidelidade.__table__,
+        "auditoria": AuditLog.__table__,
+    }
+    contagem = dict.fromkeys(tabelas, 0)
+
+    with bind.begin() as conn:
+        cadastros = _gerar_cadastros(conn, escala, rng, senha_hash, agora)
+        primeiro_id = {
+            nome: _proximo_id(conn, tabela) for nome, tabela in tabelas.items() if nome not in ("fidelidade", "auditoria")
+        }
+
+    passo = (fim - inicio) / max(escala.pedidos, 1)
+    limite_recente = fim - timedelta(days=1)
+    pontos: dict[int, int] = {}
+    gerados = 0
+    cronometro = time.perf_counter()
+    while gerados < escala.pedidos:
+        quantidade = min(lote, escala.pedidos - gerados)
+        linhas = _gerar_bloco(
+            cadastros,
+            escala,
+            rng,
+            primeiro_id,
+            quantidade,
+            inicio + passo * gerados,
+            passo,
+            limite_recente,
+            pontos,
+        )
+        with bind.begin() as conn:
+            for nome, tabela in tabelas.items():
+                _inserir(conn, tabela, linhas[nome])
+        for nome in tabelas:
+            contagem[nome] += len(linhas[nome])
+        primeiro_id = {
+            "pedidos": primeiro_id["pedidos"] + quantidade,
+            "itens": primeiro_id["itens"] + len(linhas["itens"]),
+            "pagamentos": primeiro_id["pagamentos"] + len(linhas["pagamentos"]),
+        }
+        gerados += quantidade
+        if progresso:
+            print(f"{gerados}/{escala.pedidos} pedidos ({time.perf_counter() - cronometro:.1f}s)", flush=True)
+
+    _gravar_pontos(bind, pontos, lote)
+    with bind.begin() as conn:
+        _ajustar_sequencias(
+            conn, [User.__table__, Unidade.__table__, Produto.__table__, Estoque.__table__, *tabelas.values()]
+        )
+    consolidados = reconstruir_vendas(bind, inicio.date(), fim.date())
+
+    return {
+        "unidades": escala.unidades,
+        "produtos": escala.produtos,
+        "estoques": sum(len(cardapio) for cardapio in cadastros["cardapios"].values()),
+        "usuarios": escala.clientes + len(EQUIPE) * escala.unidades,
+        **contagem,
+        **consolidados,
+        "segundos": round(time.perf_counter() - cronometro, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--unidades", type=int, default=500)
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--clientes", type=int, default=100_000)
+    parser.add_argument("--pedidos", type=int, default=1_000_000)
+    parser.add_argument("--produtos-por-unidade", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=365, help="janela de criação dos pedidos")
+    parser.add_argument("--data-final", type=date.fromisoformat, default=date.today(), help="AAAA-MM-DD")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--lote", type=int, default=10_000, help="pedidos por transação")
+    args = parser.parse_args()
+    if min(args.unidades, args.produtos, args.clientes, args.produtos_por_unidade) < 1:
+        parser.error("unidades, produtos, clientes e produtos-por-unidade devem ser positivos")
+
+    # Inclui os dados iniciais (admin, unidade e produto de exemplo).
+    aplicar_migracoes(engine)
+
+    escala = Escala(args.unidades, args.produtos, args.clientes, args.pedidos, args.produtos_por_unidade)
+    resumo = gerar(engine, escala, args.semente, args.data_final, args.dias, args.lote)
+    print(json.dumps({"semente": args.semente, "data_final": args.data_final.isoformat(), **resumo}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.core.security import hash_password
 from app.domain.models import Estoque, Produto, RoleEnum, Unidade, User
 
+# Hash de "admin123" (senha padrão documentada no README), calculado uma vez: criar o admin não
+# roda 390 mil iterações de PBKDF2, o que pesaria em toda partida a frio com disco efêmero.
+# O login regrava o hash se PASSWORD_HASH_ITERATIONS for outro.
+SENHA_ADMIN_HASH = "pbkdf2_sha256$390000$UBUDZD374U9HboFpfAtU7A==$K5f415QAxopbLLQ8CI3EFyl2sB5XW4W6QV8vJL/v/Vw="
+
 
 def seed_initial_data(db: Session) -> None:
     admin = db.scalar(select(User).where(User.email == "admin@lanchonete.com"))
@@ -12,7 +16,7 @@ def seed_initial_data(db: Session) -> None:
             User(
                 nome="Administrador",
                 email="admin@lanchonete.com",
-                senha_hash=hash_password("admin123"),
+                senha_hash=SENHA_ADMIN_HASH,
                 role=RoleEnum.ADMIN,
                 consentimento_lgpd=True,
             )
@@ -0,0 +1,149 @@
+import logging
+import time
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Engine, Integer, MetaData, String, Table, func, insert, inspect, literal, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.db.base import Base
+from app.db.init_db import seed_initial_data
+from app.domain import models  # noqa: F401  (registra as tabelas em Base.metadata)
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+schema_versao = Table(
+    "schema_versao",
+    metadata,
+    Column("versao", Integer, primary_key=True),
+    Column("descricao", String(200), nullable=False),
+    Column("aplicada_em", DateTime, nullable=False, default=datetime.utcnow),
+)
+
+
+def _criar_tabelas(conn: Connection) -> None:
+    # Bancos criados antes do controle de versão já têm as tabelas; checkfirst mantém o passo idempotente.
+    Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _criar_tabelas_novas(*nomes: str) -> Callable[[Connection], None]:
+    def _passo(conn: Connection) -> None:
+        Base.metadata.create_all(bind=conn, tables=[Base.metadata.tables[nome] for nome in nomes], checkfirst=True)
+
+    return _passo
+
+
+def _criar_indices(*nomes: str) -> Callable[[Connection], None]:
+    def _passo(conn: Connection) -> None:
+        indices = {index.name: index for table in Base.metadata.sorted_tables for index in table.indexes}
+        for nome in nomes:
+            indices[nome].create(bind=conn, checkfirst=True)
+
+    return _passo
+
+
+def _criar_extrato_fidelidade(conn: Connection) -> None:
+    _criar_tabelas_novas("fidelidade_movimentos")(conn)
+    # Saldos anteriores ao extrato viram um lançamento de abertura, para a conciliação não zerá-los.
+    usuarios = models.User.__table__
+    conn.execute(
+        insert(models.MovimentoFidelidade.__table__).from_select(
+            ["cliente_id", "tipo", "pontos", "criado_em"],
+            select(
+                usuarios.c.id,
+                literal(models.MovimentoFidelidadeEnum.SALDO_INICIAL.name),
+                usuarios.c.pontos_fidelidade,
+                literal(datetime.utcnow()),
+            ).where(usuarios.c.pontos_fidelidade != 0),
+        )
+    )
+
+
+def _criar_arquivo_pedidos(conn: Connection) -> None:
+    _criar_tabelas_novas("pedidos_arquivo", "pedido_itens_arquivo", "pagamentos_mock_arquivo")(conn)
+    # Bancos migrados pela versão 5 têm chave estrangeira do extrato para pedidos, o que impediria
+    # apagar pedidos arquivados. O SQLite não a aplica (foreign_keys desligado); nos demais, remove.
+    if conn.dialect.name == "sqlite":
+        return
+    for fk in inspect(conn).get_foreign_keys("fidelidade_movimentos"):
+        if fk["referred_table"] == "pedidos" and fk["name"]:
+            conn.execute(text(f'ALTER TABLE fidelidade_movimentos DROP CONSTRAINT "{fk["name"]}"'))
+
+
+def _semear_dados_iniciais(conn: Connection) -> None:
+    # A sessão entra na transação da migração (o commit de seed_initial_data não a encerra).
+    with Session(bind=conn) as db:
+        seed_initial_data(db)
+
+
+# Lista ordenada e somente de acréscimo: nunca altere um passo já publicado, crie uma nova versão.
+MIGRACOES: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "Esquema inicial", _criar_tabelas),
+    (
+        2,
+        "Índices compostos para pedidos, itens e auditoria",
+        _criar_indices(
+            "ix_pedidos_cliente_id_id",
+            "ix_pedidos_unidade_status_id",
+            "ix_pedido_itens_pedido_id",
+            "ix_audit_logs_entidade_criado_em",
+        ),
+    ),
+    (3, "Chaves de idempotência", _criar_tabelas_novas("chaves_idempotencia")),
+    (4, "Consolidados diários de vendas", _criar_tabelas_novas("vendas_diarias", "vendas_diarias_produto")),
+    (5, "Extrato de pontos de fidelidade", _criar_extrato_fidelidade),
+    (6, "Tabelas de arquivo de pedidos finalizados", _criar_arquivo_pedidos),
+    (
+        7,
+        "Índices por data de criação para a exportação de pedidos",
+        _criar_indices("ix_pedidos_criado_em_id", "ix_pedidos_arquivo_criado_em_id"),
+    ),
+    (
+        8,
+        "Índices de consulta da auditoria",
+        _criar_indices(
+            "ix_audit_logs_entidade_id_id",
+            "ix_audit_logs_usuario_id_id",
+            "ix_audit_logs_acao_id",
+            "ix_audit_logs_criado_em_id",
+        ),
+    ),
+    (9, "Dados iniciais: admin, unidade, produto e estoque de exemplo", _semear_dados_iniciais),
+]
+
+
+def versao_atual(conn: Connection) -> int:
+    return conn.scalar(select(func.coalesce(func.max(schema_versao.c.versao), 0)))
+
+
+def _versao_registrada(engine: Engine) -> int | None:
+    try:
+        with engine.connect() as conn:
+            return versao_atual(conn)
+    except DBAPIError:
+        # schema_versao ainda não existe (banco novo).
+        return None
+
+
+def aplicar_migracoes(engine: Engine) -> int:
+    ultima = MIGRACOES[-1][0]
+    # Caminho de toda partida com o banco em dia: uma consulta, sem introspecção nem transação de escrita.
+    if _versao_registrada(engine) == ultima:
+        return ultima
+
+    with engine.begin() as conn:
+        schema_versao.create(bind=conn, checkfirst=True)
+        atual = versao_atual(conn)
+        for versao, descricao, passo in MIGRACOES:
+            if versao <= atual:
+                continue
+            inicio = time.perf_counter()
+            passo(conn)
+            logger.info("Migração %d aplicada (%s) em %.0f ms", versao, descricao, (time.perf_counter() - inicio) * 1000)
+            conn.execute(insert(schema_versao).values(versao=versao, descricao=descricao, aplicada_em=datetime.utcnow()))
+            atual = versao
+    return atual
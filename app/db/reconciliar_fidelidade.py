@@ -0,0 +1,25 @@
+"""Recalcula os saldos de pontos (usuarios.pontos_fidelidade) a partir do extrato.
+
+O extrato em fidelidade_movimentos é a fonte da verdade; o saldo por cliente é um cache
+mantido por UPDATEs relativos. Este comando corrige, em lote, os clientes cujo saldo diverge
+da soma dos lançamentos (ex.: ajustes manuais no banco ou cargas feitas fora da API).
+
+Uso: python -m app.db.reconciliar_fidelidade
+"""
+
+import argparse
+import json
+
+from app.application.fidelidade_service import reconciliar_saldos
+from app.db.migrations import aplicar_migracoes
+from app.db.session import engine
+
+
+def main() -> None:
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    aplicar_migracoes(engine)
+    print(json.dumps({"clientes_corrigidos": reconciliar_saldos(engine)}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
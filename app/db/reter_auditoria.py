@@ -0,0 +1,37 @@
+"""Retenção da auditoria: apaga de audit_logs, mês a mês, o que for anterior aos últimos N meses.
+
+Mantém o mês atual e os --meses meses completos anteriores. Com --destino, cada mês removido é
+antes compactado em DIR/audit_logs_AAAA-MM_<primeiro id>-<último id>.ndjson.gz. A exclusão é feita
+em lotes de --lote registros (uma transação por lote) e pode ser repetida se for interrompida.
+
+Uso: python -m app.db.reter_auditoria [--meses 12] [--destino ./auditoria_arquivo] [--lote 5000]
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from app.application.auditoria_service import reter_auditoria
+from app.core.config import settings
+from app.db.migrations import aplicar_migracoes
+from app.db.session import engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--meses", type=int, default=settings.AUDIT_RETENCAO_MESES)
+    parser.add_argument("--destino", type=Path, default=None, help="compacta cada mês em NDJSON gzip antes de apagar")
+    parser.add_argument("--lote", type=int, default=5000, help="registros por transação")
+    args = parser.parse_args()
+    if args.meses < 0 or args.lote < 1:
+        parser.error("--meses não pode ser negativo e --lote deve ser positivo")
+
+    aplicar_migracoes(engine)
+    resumo = reter_auditoria(
+        engine, args.meses, args.lote, args.destino, progresso=lambda parcial: print(json.dumps(parcial), flush=True)
+    )
+    print(json.dumps(resumo, indent=2))
+
+
+if __name__ == "__main__":
+    main()
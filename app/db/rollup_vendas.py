@@ -0,0 +1,32 @@
+"""Reconstrói os consolidados diários de vendas (vendas_diarias e vendas_diarias_produto).
+
+Os consolidados são mantidos na própria transação do pagamento aprovado e do cancelamento;
+este comando serve para preenchê-los em bancos antigos, depois de cargas feitas fora da API
+ou para corrigir divergências. Sem --de/--ate recalcula todo o histórico.
+
+Uso: python -m app.db.rollup_vendas [--de AAAA-MM-DD] [--ate AAAA-MM-DD]
+"""
+
+import argparse
+import json
+from datetime import date
+
+from app.application.vendas_service import reconstruir_vendas
+from app.db.migrations import aplicar_migracoes
+from app.db.session import engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--de", type=date.fromisoformat, default=None, help="primeiro dia (AAAA-MM-DD)")
+    parser.add_argument("--ate", type=date.fromisoformat, default=None, help="último dia (AAAA-MM-DD)")
+    args = parser.parse_args()
+    if args.de and args.ate and args.de > args.ate:
+        parser.error("--de deve ser anterior ou igual a --ate")
+
+    aplicar_migracoes(engine)
+    print(json.dumps(reconstruir_vendas(engine, args.de, args.ate), indent=2))
+
+
+if __name__ == "__main__":
+    main()
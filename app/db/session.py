@@ -1,14 +1,47 @@
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import settings
+from app.core.config import EngineProfile, settings
 
 is_sqlite = settings.DATABASE_URL.startswith("sqlite")
 
+
+def engine_options(profile: EngineProfile) -> dict:
+    options = {
+        key: value
+        for key, value in {
+            "pool_size": profile.pool_size,
+            "max_overflow": profile.max_overflow,
+            "pool_timeout": profile.pool_timeout,
+            "pool_recycle": profile.pool_recycle,
+        }.items()
+        if value is not None
+    }
+    if profile.pool_pre_ping:
+        options["pool_pre_ping"] = True
+    return options
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: dict[str, str | int]) -> None:
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if is_sqlite else {},
+    **engine_options(settings.engine_profile),
 )
+if is_sqlite:
+    apply_sqlite_pragmas(engine, settings.engine_profile.sqlite_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -19,3 +52,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+
+def async_database_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"Banco sem driver assíncrono configurado: {dialect}")
+    return f"{ASYNC_DRIVERS[dialect]}{sep}{rest}"
+
+
+async_engine = (
+    create_async_engine(async_database_url(settings.DATABASE_URL), **engine_options(settings.engine_profile))
+    if settings.DB_ASYNC
+    else None
+)
+if async_engine is not None and is_sqlite:
+    apply_sqlite_pragmas(async_engine.sync_engine, settings.engine_profile.sqlite_pragmas)
+
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False) if async_engine is not None else None
+)
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,86 @@
+from collections.abc import Sequence
+
+from sqlalchemy import and_, bindparam, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+UPSERT_POR_DIALETO = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def upsert_somando(
+    db: Session,
+    modelo,
+    linhas: list[dict],
+    chaves: Sequence[str],
+    somados: Sequence[str],
+    nao_negativo: bool = False,
+) -> dict[tuple, tuple]:
+    """Soma as colunas `somados` de cada linha à linha de `modelo` com a mesma chave, ou a insere.
+
+    Roda na transação do chamador e devolve {chave: valores finais de `somados`}. Com
+    `nao_negativo`, uma linha cujo resultado ficaria negativo não é gravada e fica fora do
+    retorno. Em SQLite e PostgreSQL é um único INSERT ... ON CONFLICT DO UPDATE; nos demais
+    bancos, uma leitura com FOR UPDATE seguida de INSERT e UPDATE em lote.
+    """
+    tabela = modelo.__table__
+    upsert = UPSERT_POR_DIALETO.get(db.get_bind().dialect.name)
+    if upsert is None:
+        return _upsert_portavel(db, tabela, linhas, chaves, somados, nao_negativo)
+
+    stmt = upsert(tabela).values(linhas)
+    somas = {nome: tabela.c[nome] + stmt.excluded[nome] for nome in somados}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(chaves),
+        set_=somas,
+        where=and_(*(soma >= 0 for soma in somas.values())) if nao_negativo else None,
+    ).returning(*(tabela.c[nome] for nome in (*chaves, *somados)))
+    return {tuple(linha[: len(chaves)]): tuple(linha[len(chaves) :]) for linha in db.execute(stmt)}
+
+
+def _upsert_portavel(db: Session, tabela, linhas, chaves, somados, nao_negativo) -> dict[tuple, tuple]:
+    colunas_chave = [tabela.c[nome] for nome in chaves]
+    # IN por coluna e a chave completa conferida aqui: IN de tuplas não existe em todos os bancos.
+    consulta = (
+        select(*colunas_chave, *(tabela.c[nome] for nome in somados))
+        .where(*(coluna.in_({linha[coluna.name] for linha in linhas}) for coluna in colunas_chave))
+        .with_for_update()
+    )
+    atualizar = (
+        update(tabela)
+        .where(*(coluna == bindparam(f"chave_{coluna.name}") for coluna in colunas_chave))
+        .values({nome: bindparam(f"novo_{nome}") for nome in somados})
+    )
+    for tentativa in range(2):
+        try:
+            with db.begin_nested():
+                existentes = {tuple(linha[: len(chaves)]): tuple(linha[len(chaves) :]) for linha in db.execute(consulta)}
+                finais, novas, alteradas = {}, [], []
+                for linha in linhas:
+                    chave = tuple(linha[nome] for nome in chaves)
+                    atuais = existentes.get(chave)
+                    valores = tuple(
+                        linha[nome] + (atuais[indice] if atuais else 0) for indice, nome in enumerate(somados)
+                    )
+                    if nao_negativo and any(valor < 0 for valor in valores):
+                        continue
+                    finais[chave] = valores
+                    if atuais:
+                        alteradas.append(
+                            {
+                                **{f"chave_{nome}": valor for nome, valor in zip(chaves, chave)},
+                                **{f"novo_{nome}": valor for nome, valor in zip(somados, valores)},
+                            }
+                        )
+                    else:
+                        novas.append({**linha, **dict(zip(somados, valores))})
+                if novas:
+                    db.execute(insert(tabela), novas)
+                if alteradas:
+                    db.execute(atualizar, alteradas)
+            return finais
+        except IntegrityError:
+            # Outra transação inseriu a mesma chave entre a leitura e o INSERT: lê de novo, já bloqueando.
+            if tentativa:
+                raise
+    return {}
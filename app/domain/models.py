@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
 
-from sqlalchemy import Boolean, DateTime, Enum as SqlEnum, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Date, DateTime, Enum as SqlEnum, ForeignKey, Index, Integer, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -39,6 +39,12 @@ class PagamentoStatusEnum(str, Enum):
     RECUSADO = "RECUSADO"
 
 
+class MovimentoFidelidadeEnum(str, Enum):
+    SALDO_INICIAL = "SALDO_INICIAL"
+    CREDITO_PAGAMENTO = "CREDITO_PAGAMENTO"
+    RESGATE = "RESGATE"
+
+
 class User(Base):
     __tablename__ = "usuarios"
 
@@ -83,6 +89,11 @@ class Estoque(Base):
 
 class Pedido(Base):
     __tablename__ = "pedidos"
+    __table_args__ = (
+        Index("ix_pedidos_cliente_id_id", "cliente_id", "id"),
+        Index("ix_pedidos_unidade_status_id", "unidade_id", "status", "id"),
+        Index("ix_pedidos_criado_em_id", "criado_em", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     cliente_id: Mapped[int] = mapped_column(ForeignKey("usuarios.id"), nullable=False)
@@ -97,6 +108,7 @@ class Pedido(Base):
 
 class PedidoItem(Base):
     __tablename__ = "pedido_itens"
+    __table_args__ = (Index("ix_pedido_itens_pedido_id", "pedido_id"),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     pedido_id: Mapped[int] = mapped_column(ForeignKey("pedidos.id"), nullable=False)
@@ -105,6 +117,21 @@ class PedidoItem(Base):
     preco_unitario: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
 
 
+class MovimentoFidelidade(Base):
+    """Lançamento do extrato de pontos (somente inserção); a soma por cliente é o saldo."""
+
+    __tablename__ = "fidelidade_movimentos"
+    __table_args__ = (Index("ix_fidelidade_movimentos_cliente_id_id", "cliente_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cliente_id: Mapped[int] = mapped_column(ForeignKey("usuarios.id"), nullable=False)
+    tipo: Mapped[MovimentoFidelidadeEnum] = mapped_column(SqlEnum(MovimentoFidelidadeEnum), nullable=False)
+    pontos: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Sem chave estrangeira: o pedido pode ter sido movido para pedidos_arquivo.
+    pedido_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
 class PagamentoMock(Base):
     __tablename__ = "pagamentos_mock"
 
@@ -118,6 +145,14 @@ class PagamentoMock(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_entidade_criado_em", "entidade", "entidade_id", "criado_em"),
+        # Consultas de GET /auditoria: um índice por filtro, terminado em id para a paginação por cursor.
+        Index("ix_audit_logs_entidade_id_id", "entidade", "entidade_id", "id"),
+        Index("ix_audit_logs_usuario_id_id", "usuario_id", "id"),
+        Index("ix_audit_logs_acao_id", "acao", "id"),
+        Index("ix_audit_logs_criado_em_id", "criado_em", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     usuario_id: Mapped[int | None] = mapped_column(ForeignKey("usuarios.id"), nullable=True)
@@ -126,3 +161,84 @@ class AuditLog(Base):
     entidade_id: Mapped[str] = mapped_column(String(60), nullable=False)
     detalhes: Mapped[str] = mapped_column(Text, nullable=False)
     criado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ChaveIdempotencia(Base):
+    __tablename__ = "chaves_idempotencia"
+
+    chave: Mapped[str] = mapped_column(String(255), primary_key=True)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    corpo: Mapped[str] = mapped_column(Text, nullable=False)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    expira_em: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+
+class VendaDiaria(Base):
+    """Totais de pedidos pagos e não cancelados por dia de criação, unidade e canal."""
+
+    __tablename__ = "vendas_diarias"
+
+    dia: Mapped[date] = mapped_column(Date, primary_key=True)
+    unidade_id: Mapped[int] = mapped_column(ForeignKey("unidades.id"), primary_key=True)
+    canal_pedido: Mapped[CanalPedidoEnum] = mapped_column(SqlEnum(CanalPedidoEnum), primary_key=True)
+    pedidos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    receita: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+
+
+class VendaDiariaProduto(Base):
+    """Mesmo recorte de VendaDiaria aberto por produto (pedidos que contêm o produto)."""
+
+    __tablename__ = "vendas_diarias_produto"
+    __table_args__ = (Index("ix_vendas_diarias_produto_unidade_dia", "unidade_id", "dia"),)
+
+    dia: Mapped[date] = mapped_column(Date, primary_key=True)
+    unidade_id: Mapped[int] = mapped_column(ForeignKey("unidades.id"), primary_key=True)
+    canal_pedido: Mapped[CanalPedidoEnum] = mapped_column(SqlEnum(CanalPedidoEnum), primary_key=True)
+    produto_id: Mapped[int] = mapped_column(ForeignKey("produtos.id"), primary_key=True)
+    pedidos: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    receita: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0)
+
+
+# Pedidos finalizados antigos, movidos de pedidos/pedido_itens/pagamentos_mock pelo arquivamento
+# (app/application/arquivamento_service.py). Mesmas colunas e ids das tabelas de origem.
+
+
+class PedidoArquivo(Base):
+    __tablename__ = "pedidos_arquivo"
+    __table_args__ = (
+        Index("ix_pedidos_arquivo_cliente_id_id", "cliente_id", "id"),
+        Index("ix_pedidos_arquivo_unidade_id_id", "unidade_id", "id"),
+        Index("ix_pedidos_arquivo_criado_em_id", "criado_em", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    cliente_id: Mapped[int] = mapped_column(ForeignKey("usuarios.id"), nullable=False)
+    unidade_id: Mapped[int] = mapped_column(ForeignKey("unidades.id"), nullable=False)
+    canal_pedido: Mapped[CanalPedidoEnum] = mapped_column(SqlEnum(CanalPedidoEnum), nullable=False)
+    status: Mapped[PedidoStatusEnum] = mapped_column(SqlEnum(PedidoStatusEnum), nullable=False)
+    valor_total: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class PedidoItemArquivo(Base):
+    __tablename__ = "pedido_itens_arquivo"
+    __table_args__ = (Index("ix_pedido_itens_arquivo_pedido_id", "pedido_id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    pedido_id: Mapped[int] = mapped_column(ForeignKey("pedidos_arquivo.id"), nullable=False)
+    produto_id: Mapped[int] = mapped_column(ForeignKey("produtos.id"), nullable=False)
+    quantidade: Mapped[int] = mapped_column(Integer, nullable=False)
+    preco_unitario: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+
+
+class PagamentoMockArquivo(Base):
+    __tablename__ = "pagamentos_mock_arquivo"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    pedido_id: Mapped[int] = mapped_column(ForeignKey("pedidos_arquivo.id"), unique=True, nullable=False)
+    status: Mapped[PagamentoStatusEnum] = mapped_column(SqlEnum(PagamentoStatusEnum), nullable=False)
+    payload_requisicao: Mapped[str] = mapped_column(Text, nullable=False)
+    payload_resposta: Mapped[str] = mapped_column(Text, nullable=False)
+    criado_em: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -1,15 +1,204 @@
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import event, insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.domain.models import AuditLog
+from app.infrastructure.pos_commit import apos_commit
+
+logger = logging.getLogger(__name__)
+
+MODOS = ("sync", "db", "ndjson")
+TENTATIVAS = 3
+ESPERA_TENTATIVA_SECONDS = 0.2
+
+
+class AuditWriter:
+    """Grava registros de auditoria em lote a partir de uma thread de fundo.
+
+    Modo "db" insere em transação própria; modo "ndjson" acrescenta linhas a um arquivo.
+    Os registros entram na fila após o commit da transação de negócio. Com a fila cheia, o
+    produtor espera até `timeout_fila`; se ainda não houver espaço, acrescenta o excedente ao
+    arquivo NDJSON ele mesmo, numa única tentativa e sem espera (nenhum registro é descartado).
+    Um lote que falha na thread de fundo é tentado de novo; no modo "db", depois vai para o
+    arquivo NDJSON, e se nada funcionar fica retido em memória para a próxima gravação (o
+    excedente que o produtor não conseguiu gravar também). O desligamento levanta erro se ainda
+    restar registro sem gravar.
+    """
+
+    def __init__(self, modo: str, intervalo: float, lote: int, tamanho_fila: int, timeout_fila: float, caminho: str):
+        if modo not in MODOS:
+            raise ValueError(f"AUDIT_MODE inválido: {modo}")
+        self.modo = modo
+        self.intervalo = intervalo
+        self.lote = lote
+        self.timeout_fila = timeout_fila
+        self.caminho = Path(caminho)
+        self._fila: queue.Queue[dict] = queue.Queue(maxsize=tamanho_fila)
+        self._parar = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._bind = None
+        self._retidos: list[dict] = []
+        self._lock = threading.Lock()
+
+    @property
+    def ativo(self) -> bool:
+        return self._thread is not None
+
+    def iniciar(self, bind) -> None:
+        if self.modo == "sync" or self.ativo:
+            return
+        self._bind = bind
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._executar, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def parar(self) -> None:
+        if not self.ativo:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
+        lote = self._retomar() + self._drenar(None)
+        if not self._gravar(lote):
+            logger.error("Registros de auditoria não gravados no desligamento: %s", lote)
+            raise RuntimeError(f"{len(lote)} registro(s) de auditoria não gravados no desligamento")
+
+    def enfileirar(self, registros: list[dict]) -> list[dict]:
+        """Enfileira os registros e devolve os que não couberam na fila."""
+        for indice, registro in enumerate(registros):
+            try:
+                self._fila.put(registro, timeout=self.timeout_fila)
+            except queue.Full:
+                logger.warning("Fila de auditoria cheia; gravando %d registro(s) no chamador", len(registros) - indice)
+                return registros[indice:]
+        return []
+
+    def gravar_excedente(self, registros: list[dict]) -> None:
+        # Roda na thread da requisição, após o commit de negócio: nada de novas tentativas com espera
+        # (viraria latência) nem de erro para o cliente. As novas tentativas ficam com a thread de fundo.
+        try:
+            self._anexar(registros)
+        except Exception:
+            logger.exception("Falha ao gravar %d registro(s) de auditoria excedentes", len(registros))
+            self._reter(registros)
+
+    def _reter(self, lote: list[dict]) -> None:
+        with self._lock:
+            self._retidos.extend(lote)
+        logger.error("%d registro(s) de auditoria retidos em memória até a próxima gravação", len(lote))
+
+    def _retomar(self) -> list[dict]:
+        with self._lock:
+            lote, self._retidos = self._retidos, []
+        return lote
+
+    def _drenar(self, limite: int | None) -> list[dict]:
+        lote = []
+        while limite is None or len(lote) < limite:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            try:
+                novos = [self._fila.get(timeout=self.intervalo)]
+            except queue.Empty:
+                novos = []
+            lote = self._retomar() + (novos + self._drenar(self.lote - 1) if novos else [])
+            if lote and not self._gravar(lote):
+                self._reter(lote)
+
+    def _inserir(self, lote: list[dict]) -> None:
+        with self._bind.begin() as conn:
+            conn.execute(insert(AuditLog), lote)
+
+    def _anexar(self, lote: list[dict]) -> None:
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        with self.caminho.open("a", encoding="utf-8") as arquivo:
+            arquivo.writelines(json.dumps(registro, default=str, ensure_ascii=False) + "\n" for registro in lote)
+
+    def _gravar(self, lote: list[dict]) -> bool:
+        """Grava o lote com novas tentativas (e, no modo "db", o arquivo NDJSON como reserva)."""
+        if not lote:
+            return True
+        destinos = [("banco", self._inserir)] if self.modo == "db" else []
+        destinos.append((str(self.caminho), self._anexar))
+        for nome, gravar in destinos:
+            for tentativa in range(1, TENTATIVAS + 1):
+                try:
+                    gravar(lote)
+                    return True
+                except Exception:
+                    logger.exception(
+                        "Falha ao gravar %d registro(s) de auditoria em %s (tentativa %d de %d)",
+                        len(lote),
+                        nome,
+                        tentativa,
+                        TENTATIVAS,
+                    )
+                    if tentativa < TENTATIVAS:
+                        time.sleep(ESPERA_TENTATIVA_SECONDS * 2 ** (tentativa - 1))
+        return False
+
+
+audit_writer = AuditWriter(
+    modo=settings.AUDIT_MODE,
+    intervalo=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    lote=settings.AUDIT_BATCH_SIZE,
+    tamanho_fila=settings.AUDIT_QUEUE_SIZE,
+    timeout_fila=settings.AUDIT_QUEUE_TIMEOUT_SECONDS,
+    caminho=settings.AUDIT_NDJSON_PATH,
+)
+
+_PENDENTES = "auditoria_pendente"
 
 
 def log_action(db: Session, usuario_id: int | None, acao: str, entidade: str, entidade_id: str, detalhes: str) -> None:
-    db.add(
-        AuditLog(
-            usuario_id=usuario_id,
-            acao=acao,
-            entidade=entidade,
-            entidade_id=entidade_id,
-            detalhes=detalhes,
-        )
-    )
+    registro = {
+        "usuario_id": usuario_id,
+        "acao": acao,
+        "entidade": entidade,
+        "entidade_id": entidade_id,
+        "detalhes": detalhes,
+        "criado_em": datetime.utcnow(),
+    }
+    if not audit_writer.ativo:
+        db.add(AuditLog(**registro))
+        return
+    # Só vai para a fila depois do commit: se a transação de negócio for desfeita, o registro some junto.
+    db.info.setdefault(_PENDENTES, []).append(registro)
+
+
+def log_actions(db: Session, registros: list[dict]) -> None:
+    """Vários registros (campos de log_action) de uma vez; no modo sync, um único INSERT em lote."""
+    if not registros:
+        return
+    agora = datetime.utcnow()
+    registros = [{**registro, "criado_em": agora} for registro in registros]
+    if not audit_writer.ativo:
+        db.execute(insert(AuditLog), registros)
+        return
+    db.info.setdefault(_PENDENTES, []).extend(registros)
+
+
+@event.listens_for(Session, "after_commit")
+def _enfileirar_pendentes(db: Session) -> None:
+    pendentes = db.info.pop(_PENDENTES, None)
+    if pendentes:
+        apos_commit(db, lambda: audit_writer.gravar_excedente(audit_writer.enfileirar(pendentes)))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_pendentes(db: Session, _previous_transaction) -> None:
+    db.info.pop(_PENDENTES, None)
@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.json_rapido import dumps, stream_array
+from app.domain.models import Produto, Unidade
+from app.schemas import ProdutoOut, UnidadeOut
+
+
+@dataclass(frozen=True)
+class CatalogoSnapshot:
+    versao: int
+    criado_em: float
+    produtos: tuple[bytes, ...]
+    unidades: tuple[bytes, ...]
+    digest: str
+
+    def pagina_produtos(self, offset: int, limit: int) -> bytes:
+        return b"[" + b",".join(self.produtos[offset : offset + limit]) + b"]"
+
+    def stream_produtos(self, offset: int, limit: int) -> Iterator[bytes]:
+        return stream_array(self.produtos[offset : offset + limit])
+
+    def lista_unidades(self) -> bytes:
+        return b"[" + b",".join(self.unidades) + b"]"
+
+
+# O cardápio muda poucas vezes ao dia: mantemos uma cópia já serializada em memória e só a
+# reconstruímos quando a versão é incrementada (escritas no catálogo) ou o TTL expira,
+# o que cobre escritas feitas por outros processos/instâncias.
+_versao = 0
+_snapshot: CatalogoSnapshot | None = None
+_lock = threading.Lock()
+
+
+def invalidar_catalogo() -> None:
+    global _versao
+    with _lock:
+        _versao += 1
+
+
+def _colunas(schema: type[BaseModel], modelo) -> list:
+    return [getattr(modelo, campo) for campo in schema.model_fields]
+
+
+def _construir(db: Session, versao: int) -> CatalogoSnapshot:
+    # Só as colunas de ProdutoOut/UnidadeOut, na mesma ordem, serializadas direto das linhas Core.
+    produtos = tuple(
+        dumps(dict(linha))
+        for linha in db.execute(
+            select(*_colunas(ProdutoOut, Produto)).where(Produto.ativo.is_(True)).order_by(Produto.id)
+        ).mappings()
+    )
+    unidades = tuple(
+        dumps(dict(linha))
+        for linha in db.execute(
+            select(*_colunas(UnidadeOut, Unidade)).where(Unidade.ativo.is_(True)).order_by(Unidade.id)
+        ).mappings()
+    )
+    hasher = hashlib.sha256()
+    for parte in (*produtos, b"|", *unidades):
+        hasher.update(parte)
+    return CatalogoSnapshot(versao, time.monotonic(), produtos, unidades, hasher.hexdigest()[:20])
+
+
+def _valido(snapshot: CatalogoSnapshot | None) -> bool:
+    return (
+        snapshot is not None
+        and snapshot.versao == _versao
+        and time.monotonic() - snapshot.criado_em < settings.CATALOG_CACHE_TTL_SECONDS
+    )
+
+
+def obter_snapshot(db: Session) -> CatalogoSnapshot:
+    global _snapshot
+    snapshot = _snapshot
+    if _valido(snapshot):
+        return snapshot
+
+    with _lock:
+        if not _valido(_snapshot):
+            _snapshot = _construir(db, _versao)
+        return _snapshot
+
+
+def etag_confere(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = {candidato.strip().removeprefix("W/") for candidato in if_none_match.split(",")}
+    return "*" in candidatos or etag in candidatos
@@ -0,0 +1,221 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.domain.models import ChaveIdempotencia
+from app.infrastructure.pos_commit import SESSAO_EXTERNA
+
+logger = logging.getLogger(__name__)
+
+INTERVALO_LIMPEZA_SECONDS = 600
+INTERVALO_ESPERA_SECONDS = 0.05
+# status_code da reserva de uma chave enquanto a primeira execução não termina.
+EM_ANDAMENTO = 0
+ERRO_EM_ANDAMENTO = "Requisição com esta Idempotency-Key ainda em processamento"
+
+
+@dataclass(frozen=True)
+class RespostaGuardada:
+    request_hash: str
+    status_code: int
+    corpo: str
+
+    def response(self, repetida: bool) -> Response:
+        headers = {"Idempotent-Replayed": "true"} if repetida else None
+        return Response(content=self.corpo, status_code=self.status_code, media_type="application/json", headers=headers)
+
+
+def hash_requisicao(metodo: str, caminho: str, corpo: str) -> str:
+    return hashlib.sha256(f"{metodo} {caminho}\n{corpo}".encode("utf-8")).hexdigest()
+
+
+class Idempotencia:
+    """Respostas de sucesso por Idempotency-Key: tabela chaves_idempotencia com um LRU à frente.
+
+    A primeira execução commita antes uma reserva da chave (status_code EM_ANDAMENTO): a chave
+    primária serve de trava entre processos. A operação recebe uma sessão aninhada (seu commit
+    libera só um savepoint), então a resposta é gravada na mesma transação da escrita de negócio.
+    Uma repetição devolve a resposta original sem reexecutar a operação; duplicatas simultâneas
+    consultam a linha até a primeira terminar, por até `espera` segundos (depois, 409).
+    Erros não são guardados: a reserva é apagada e a mesma chave pode ser tentada de novo. A
+    reserva de um processo que caiu no meio vale `espera` segundos e depois pode ser retomada.
+    """
+
+    def __init__(self, ttl: int, tamanho_cache: int, espera: float):
+        self.ttl = ttl
+        self.espera = espera
+        self._cache = TTLCache(maxsize=tamanho_cache)
+        self._ultima_limpeza = 0.0
+
+    def _reservar(self, db: Session, chave: str, request_hash: str) -> RespostaGuardada | datetime | None:
+        """Resposta já gravada, marca da reserva feita agora ou None se outra execução está em andamento."""
+        guardada = self._cache.get(chave)
+        if guardada is None:
+            agora = datetime.utcnow()
+            registro = db.execute(
+                select(
+                    ChaveIdempotencia.request_hash,
+                    ChaveIdempotencia.status_code,
+                    ChaveIdempotencia.corpo,
+                    ChaveIdempotencia.expira_em,
+                ).where(ChaveIdempotencia.chave == chave, ChaveIdempotencia.expira_em > agora)
+            ).first()
+            if registro is None:
+                return self._inserir_reserva(db, chave, request_hash, agora)
+            if registro.request_hash != request_hash:
+                raise HTTPException(status_code=422, detail="Idempotency-Key já usada com outra requisição")
+            if registro.status_code == EM_ANDAMENTO:
+                # Devolve a conexão ao pool enquanto espera: a primeira execução pode precisar dela.
+                db.rollback()
+                return None
+            guardada = RespostaGuardada(registro.request_hash, registro.status_code, registro.corpo)
+            self._cache.set(chave, guardada, time.time() + (registro.expira_em - agora).total_seconds())
+        if guardada.request_hash != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key já usada com outra requisição")
+        return guardada
+
+    def _inserir_reserva(self, db: Session, chave: str, request_hash: str, agora: datetime) -> datetime | None:
+        # Uma linha vencida com a mesma chave (resposta antiga ou reserva abandonada) dá lugar à nova.
+        expiradas = ChaveIdempotencia.expira_em <= agora
+        if time.monotonic() - self._ultima_limpeza > INTERVALO_LIMPEZA_SECONDS:
+            self._ultima_limpeza = time.monotonic()
+            db.execute(delete(ChaveIdempotencia).where(expiradas))
+        else:
+            db.execute(delete(ChaveIdempotencia).where(ChaveIdempotencia.chave == chave, expiradas))
+        try:
+            db.execute(
+                insert(ChaveIdempotencia).values(
+                    chave=chave,
+                    request_hash=request_hash,
+                    status_code=EM_ANDAMENTO,
+                    corpo="",
+                    criado_em=agora,
+                    expira_em=agora + timedelta(seconds=self.espera),
+                )
+            )
+            db.commit()
+        except IntegrityError:
+            # Outro processo reservou a mesma chave primeiro: aguarda a execução dele.
+            db.rollback()
+            return None
+        return agora
+
+    def _da_reserva(self, chave: str, reserva: datetime):
+        return and_(
+            ChaveIdempotencia.chave == chave,
+            ChaveIdempotencia.criado_em == reserva,
+            ChaveIdempotencia.status_code == EM_ANDAMENTO,
+        )
+
+    def _assumir(self, db: Session, chave: str, reserva: datetime) -> None:
+        """Abre a transação da operação travando a linha da reserva (e renovando o prazo dela)."""
+        renovada = db.execute(
+            update(ChaveIdempotencia)
+            .where(self._da_reserva(chave, reserva))
+            .values(expira_em=datetime.utcnow() + timedelta(seconds=self.espera))
+        ).rowcount
+        if renovada != 1:
+            # A reserva venceu antes de a operação começar e outra execução a retomou.
+            raise HTTPException(status_code=409, detail=ERRO_EM_ANDAMENTO)
+
+    def _concluir(self, db: Session, chave: str, reserva: datetime, resposta: RespostaGuardada) -> None:
+        db.execute(
+            update(ChaveIdempotencia)
+            .where(self._da_reserva(chave, reserva))
+            .values(
+                status_code=resposta.status_code,
+                corpo=resposta.corpo,
+                expira_em=datetime.utcnow() + timedelta(seconds=self.ttl),
+            )
+        )
+
+    def _desistir(self, db: Session, chave: str, reserva: datetime) -> None:
+        """Desfaz a operação e apaga a reserva para que a chave possa ser tentada de novo."""
+        try:
+            db.rollback()
+            db.execute(delete(ChaveIdempotencia).where(self._da_reserva(chave, reserva)))
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.exception("Falha ao apagar a reserva da Idempotency-Key %s; ela vence sozinha", chave)
+
+    def _sessao_aninhada(self, db: Session, bind) -> dict:
+        # Eventos e fila de auditoria da operação esperam o commit de `db` (app.infrastructure.pos_commit).
+        return {
+            "bind": bind,
+            "join_transaction_mode": "create_savepoint",
+            "autoflush": db.autoflush,
+            "expire_on_commit": db.expire_on_commit,
+            "info": {SESSAO_EXTERNA: db},
+        }
+
+    def executar(
+        self, db: Session, chave: str, request_hash: str, status_code: int, operacao: Callable[[Session], str]
+    ) -> Response:
+        limite = time.monotonic() + self.espera
+        while (reserva := self._reservar(db, chave, request_hash)) is None:
+            if time.monotonic() >= limite:
+                raise HTTPException(status_code=409, detail=ERRO_EM_ANDAMENTO)
+            time.sleep(INTERVALO_ESPERA_SECONDS)
+        if isinstance(reserva, RespostaGuardada):
+            return reserva.response(repetida=True)
+
+        try:
+            self._assumir(db, chave, reserva)
+            with Session(**self._sessao_aninhada(db, db.connection())) as sessao:
+                resposta = RespostaGuardada(request_hash, status_code, operacao(sessao))
+            self._concluir(db, chave, reserva, resposta)
+            db.commit()
+        except BaseException:
+            self._desistir(db, chave, reserva)
+            raise
+        self._cache.set(chave, resposta, time.time() + self.ttl)
+        return resposta.response(repetida=False)
+
+    async def executar_async(
+        self,
+        db: AsyncSession,
+        chave: str,
+        request_hash: str,
+        status_code: int,
+        operacao: Callable[[AsyncSession], Awaitable[str]],
+    ) -> Response:
+        limite = time.monotonic() + self.espera
+        while (reserva := await db.run_sync(self._reservar, chave, request_hash)) is None:
+            if time.monotonic() >= limite:
+                raise HTTPException(status_code=409, detail=ERRO_EM_ANDAMENTO)
+            await asyncio.sleep(INTERVALO_ESPERA_SECONDS)
+        if isinstance(reserva, RespostaGuardada):
+            return reserva.response(repetida=True)
+
+        try:
+            await db.run_sync(self._assumir, chave, reserva)
+            opcoes = self._sessao_aninhada(db.sync_session, await db.connection())
+            async with AsyncSession(**opcoes) as sessao:
+                resposta = RespostaGuardada(request_hash, status_code, await operacao(sessao))
+            await db.run_sync(self._concluir, chave, reserva, resposta)
+            await db.commit()
+        except BaseException:
+            await db.run_sync(self._desistir, chave, reserva)
+            raise
+        self._cache.set(chave, resposta, time.time() + self.ttl)
+        return resposta.response(repetida=False)
+
+
+idempotencia = Idempotencia(
+    ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+    tamanho_cache=settings.IDEMPOTENCY_CACHE_MAX,
+    espera=settings.IDEMPOTENCY_WAIT_SECONDS,
+)
@@ -0,0 +1,222 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import Engine, event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 10, 20, 50, 100)
+BUCKETS_ESPERA_POOL = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+ROTA_DESCONHECIDA = "desconhecida"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _rotulos(nomes: tuple[str, ...], valores: tuple[str, ...]) -> str:
+    if not nomes:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(nomes, valores)) + "}"
+
+
+class Contador:
+    tipo = "counter"
+
+    def __init__(self, nome: str, ajuda: str, rotulos: tuple[str, ...] = ()):
+        self.nome, self.ajuda, self.rotulos = nome, ajuda, rotulos
+        self._valores: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *valores: str, quantidade: float = 1) -> None:
+        with self._lock:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def amostras(self) -> list[str]:
+        with self._lock:
+            itens = sorted(self._valores.items())
+        return [f"{self.nome}{_rotulos(self.rotulos, valores)} {valor}" for valores, valor in itens]
+
+
+class Medidor(Contador):
+    tipo = "gauge"
+
+    def dec(self, *valores: str) -> None:
+        self.inc(*valores, quantidade=-1)
+
+
+class Histograma:
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, buckets: tuple[float, ...], rotulos: tuple[str, ...] = ()):
+        self.nome, self.ajuda, self.buckets, self.rotulos = nome, ajuda, buckets, rotulos
+        # Por combinação de rótulos: contagem por bucket (não cumulativa), soma e total.
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float, *valores: str) -> None:
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    def amostras(self) -> list[str]:
+        with self._lock:
+            itens = sorted((valores, [list(serie[0]), serie[1], serie[2]]) for valores, serie in self._series.items())
+        linhas = []
+        nomes_bucket = (*self.rotulos, "le")
+        for valores, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, contagem in zip((*self.buckets, "+Inf"), contagens):
+                acumulado += contagem
+                linhas.append(f"{self.nome}_bucket{_rotulos(nomes_bucket, (*valores, str(limite)))} {acumulado}")
+            linhas.append(f"{self.nome}_sum{_rotulos(self.rotulos, valores)} {soma}")
+            linhas.append(f"{self.nome}_count{_rotulos(self.rotulos, valores)} {total}")
+        return linhas
+
+
+class Registro:
+    def __init__(self) -> None:
+        self._metricas: list[Contador | Histograma] = []
+
+    def registrar(self, metrica):
+        self._metricas.append(metrica)
+        return metrica
+
+    def exposicao(self) -> str:
+        """Formato texto do Prometheus (versão 0.0.4)."""
+        linhas = []
+        for metrica in self._metricas:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(metrica.amostras())
+        return "\n".join(linhas) + "\n"
+
+
+registro = Registro()
+requisicoes = registro.registrar(
+    Contador("http_requests_total", "Requisições HTTP concluídas", ("method", "route", "status"))
+)
+latencia = registro.registrar(
+    Histograma("http_request_duration_seconds", "Latência das requisições HTTP", BUCKETS_LATENCIA, ("method", "route"))
+)
+em_andamento = registro.registrar(Medidor("http_requests_in_flight", "Requisições HTTP em andamento"))
+consultas_por_requisicao = registro.registrar(
+    Histograma("db_statements_per_request", "Comandos SQL por requisição", BUCKETS_CONSULTAS, ("method", "route"))
+)
+tempo_db_por_requisicao = registro.registrar(
+    Histograma("db_time_per_request_seconds", "Tempo em SQL por requisição", BUCKETS_LATENCIA, ("method", "route"))
+)
+consultas_total = registro.registrar(Contador("db_statements_total", "Comandos SQL executados", ("engine",)))
+espera_pool = registro.registrar(
+    Histograma("db_pool_checkout_wait_seconds", "Espera por uma conexão do pool", BUCKETS_ESPERA_POOL, ("engine",))
+)
+
+
+@dataclass
+class ConsumoBanco:
+    """Acumulado da requisição corrente; as threads do threadpool herdam a referência via contextvars."""
+
+    comandos: int = 0
+    segundos: float = 0.0
+    espera_pool: float = 0.0
+
+
+_consumo: ContextVar[ConsumoBanco | None] = ContextVar("consumo_banco", default=None)
+
+
+def instrumentar_engine(engine: Engine, nome: str) -> None:
+    """Conta comandos e tempo de SQL pelos eventos do engine e mede a espera no checkout do pool."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metricas_inicio", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        duracao = time.perf_counter() - conn.info["metricas_inicio"].pop()
+        consultas_total.inc(nome)
+        consumo = _consumo.get()
+        if consumo is not None:
+            consumo.comandos += 1
+            consumo.segundos += duracao
+
+    # O pool não emite evento antes do checkout; o tempo de pool.connect() inclui a espera por vaga
+    # (e o pre-ping, quando ativo). engine.dispose() troca o pool: instrumente de novo depois dele.
+    pool = engine.pool
+    conectar = pool.connect
+
+    def _conectar_medindo():
+        inicio = time.perf_counter()
+        try:
+            return conectar()
+        finally:
+            espera = time.perf_counter() - inicio
+            espera_pool.observar(espera, nome)
+            consumo = _consumo.get()
+            if consumo is not None:
+                consumo.espera_pool += espera
+
+    pool.connect = _conectar_medindo
+
+
+class MetricasMiddleware:
+    """Middleware ASGI: latência, requisições em andamento e consumo de banco por rota.
+
+    A rota é o template do path (ex.: /pedidos/{pedido_id}) para manter a cardinalidade baixa.
+    Requisições acima de METRICS_QUERY_BUDGET comandos SQL geram um aviso no log.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def _send(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+
+        consumo = ConsumoBanco()
+        token = _consumo.set(consumo)
+        em_andamento.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            duracao = time.perf_counter() - inicio
+            em_andamento.dec()
+            _consumo.reset(token)
+            rota = getattr(scope.get("route"), "path", ROTA_DESCONHECIDA)
+            metodo = scope["method"]
+            requisicoes.inc(metodo, rota, str(status))
+            latencia.observar(duracao, metodo, rota)
+            consultas_por_requisicao.observar(consumo.comandos, metodo, rota)
+            tempo_db_por_requisicao.observar(consumo.segundos, metodo, rota)
+            if consumo.comandos > settings.METRICS_QUERY_BUDGET:
+                logger.warning(
+                    "%s %s executou %d comandos SQL (orçamento %d; %.1f ms em SQL, %.1f ms aguardando o pool)",
+                    metodo,
+                    rota,
+                    consumo.comandos,
+                    settings.METRICS_QUERY_BUDGET,
+                    consumo.segundos * 1000,
+                    consumo.espera_pool * 1000,
+                )
@@ -0,0 +1,93 @@
+import asyncio
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Evento:
+    id: int
+    tipo: str
+    dados: dict
+
+    def sse(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.tipo}\ndata: {json.dumps(self.dados, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+@dataclass(eq=False)
+class Assinante:
+    loop: asyncio.AbstractEventLoop
+    fila: asyncio.Queue
+    encerrado: bool = field(default=False)
+
+
+class PedidoBroadcaster:
+    """Distribui eventos de pedido por unidade para os assinantes deste processo.
+
+    Cada assinante tem um buffer limitado; quem não consome a tempo é desconectado e retoma
+    pelo Last-Event-ID a partir do histórico recente mantido por unidade.
+    """
+
+    def __init__(self, buffer: int, historico: int):
+        self.buffer = buffer
+        self.historico = historico
+        # Ids partem do relógio para continuarem crescentes após um restart do processo.
+        self._primeiro_id = time.time_ns() // 1000
+        self._ids = itertools.count(self._primeiro_id)
+        self._historico: dict[int, deque[Evento]] = defaultdict(lambda: deque(maxlen=historico))
+        self._descartado_ate: dict[int, int] = {}
+        self._assinantes: dict[int, set[Assinante]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publicar(self, unidade_id: int, tipo: str, dados: dict) -> Evento:
+        with self._lock:
+            evento = Evento(next(self._ids), tipo, dados)
+            historico = self._historico[unidade_id]
+            if len(historico) == self.historico:
+                self._descartado_ate[unidade_id] = historico[0].id
+            historico.append(evento)
+            assinantes = list(self._assinantes[unidade_id])
+        for assinante in assinantes:
+            assinante.loop.call_soon_threadsafe(self._entregar, assinante, evento)
+        return evento
+
+    def _entregar(self, assinante: Assinante, evento: Evento) -> None:
+        if assinante.encerrado:
+            return
+        try:
+            assinante.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            assinante.encerrado = True
+            while not assinante.fila.empty():
+                assinante.fila.get_nowait()
+            assinante.fila.put_nowait(None)
+
+    def assinar(self, unidade_id: int, ultimo_id: int | None) -> tuple[Assinante, list[Evento] | None]:
+        """Registra um assinante e devolve os eventos perdidos desde `ultimo_id`.
+
+        Devolve None no lugar da lista quando não é possível garantir a continuidade: o
+        evento já saiu do histórico ou é anterior a este processo. O cliente deve então
+        recarregar o estado completo via GET /pedidos.
+        """
+        assinante = Assinante(asyncio.get_running_loop(), asyncio.Queue(maxsize=self.buffer))
+        with self._lock:
+            self._assinantes[unidade_id].add(assinante)
+            historico = list(self._historico[unidade_id])
+            descartado_ate = self._descartado_ate.get(unidade_id, 0)
+        if ultimo_id is None:
+            return assinante, []
+        if ultimo_id < self._primeiro_id or ultimo_id < descartado_ate:
+            return assinante, None
+        return assinante, [evento for evento in historico if evento.id > ultimo_id]
+
+    def cancelar(self, unidade_id: int, assinante: Assinante) -> None:
+        with self._lock:
+            self._assinantes[unidade_id].discard(assinante)
+
+
+broadcaster = PedidoBroadcaster(buffer=settings.PEDIDO_EVENTOS_BUFFER, historico=settings.PEDIDO_EVENTOS_HISTORICO)
@@ -0,0 +1,39 @@
+import logging
+from collections.abc import Callable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Em db.info de uma sessão que roda aninhada (savepoint) na conexão de outra: a sessão dona da
+# transação. O commit da aninhada só libera o savepoint, mas dispara after_commit do mesmo jeito.
+SESSAO_EXTERNA = "sessao_externa"
+_ADIADOS = "efeitos_apos_commit"
+
+
+def apos_commit(db: Session, efeito: Callable[[], None]) -> None:
+    """Executa `efeito` (evento, fila de auditoria) já, ou após o commit da sessão externa.
+
+    Chamar depois do commit de `db`. Se `db` roda aninhada em outra sessão, o efeito espera o
+    commit real dela e é descartado se ela for desfeita.
+    """
+    externa = db.info.get(SESSAO_EXTERNA)
+    if externa is None:
+        efeito()
+        return
+    externa.info.setdefault(_ADIADOS, []).append(efeito)
+
+
+@event.listens_for(Session, "after_commit")
+def _executar_adiados(db: Session) -> None:
+    for efeito in db.info.pop(_ADIADOS, ()):
+        try:
+            efeito()
+        except Exception:
+            logger.exception("Falha em efeito posterior ao commit")
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_adiados(db: Session, _previous_transaction) -> None:
+    db.info.pop(_ADIADOS, None)
@@ -1,11 +1,17 @@
+import logging
+import time
+
 from fastapi import FastAPI
 
-from app.api.routes import auth, catalogo, fidelidade, pedidos
+from app import INICIO_IMPORTACAO
+from app.api.routes import auditoria, auth, catalogo, fidelidade, pedidos, relatorios
+from app.core import hash_pool
 from app.core.config import settings
 from app.core.errors import register_error_handlers
-from app.db.base import Base
-from app.db.init_db import seed_initial_data
-from app.db.session import SessionLocal, engine
+from app.db.migrations import aplicar_migracoes
+from app.db.session import async_engine, engine
+from app.infrastructure.audit import audit_writer
+from app.infrastructure.metricas import MetricasMiddleware, instrumentar_engine
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -15,20 +21,58 @@ app = FastAPI(
 
 app.include_router(auth.router)
 app.include_router(catalogo.router)
+if settings.DB_ASYNC:
+    # Importado só quando usado (assim como as métricas abaixo), para não pesar na partida a frio.
+    from app.api.routes import pedidos_async
+
+    # Registrado antes de pedidos.router para ter precedência; o contrato documentado é o mesmo das rotas síncronas.
+    app.include_router(pedidos_async.router, include_in_schema=False)
 app.include_router(pedidos.router)
 app.include_router(fidelidade.router)
+app.include_router(relatorios.router)
+app.include_router(auditoria.router)
 
 register_error_handlers(app)
 
+if settings.METRICS_ENABLED:
+    from app.api.routes import metricas
+
+    instrumentar_engine(engine, "sync")
+    if async_engine is not None:
+        instrumentar_engine(async_engine.sync_engine, "async")
+    app.add_middleware(MetricasMiddleware)
+    app.include_router(metricas.router)
+
+
+# Mesmo logger das mensagens de inicialização do uvicorn, para o relatório sair sem configuração extra.
+logger = logging.getLogger("uvicorn.error")
+importacao_ms = (time.perf_counter() - INICIO_IMPORTACAO) * 1000
+
 
 @app.on_event("startup")
 def startup_event() -> None:
-    Base.metadata.create_all(bind=engine)
-    db = SessionLocal()
+    inicio = time.perf_counter()
+    # Com o banco já na última versão é uma única consulta; os dados iniciais são o passo 9.
+    versao = aplicar_migracoes(engine)
+    banco_ms = (time.perf_counter() - inicio) * 1000
+    audit_writer.iniciar(engine)
+    logger.info(
+        "Inicialização: importação %.0f ms, banco (migrações e dados iniciais, esquema v%d) %.0f ms, total %.0f ms",
+        importacao_ms,
+        versao,
+        banco_ms,
+        (time.perf_counter() - INICIO_IMPORTACAO) * 1000,
+    )
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    hash_pool.shutdown()
     try:
-        seed_initial_data(db)
+        audit_writer.parar()
     finally:
-        db.close()
+        if async_engine is not None:
+            await async_engine.dispose()
 
 
 @app.get("/")
@@ -1,9 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, EmailStr, Field
 
-from app.domain.models import CanalPedidoEnum, PedidoStatusEnum, RoleEnum
+from app.domain.models import CanalPedidoEnum, MovimentoFidelidadeEnum, PedidoStatusEnum, RoleEnum
 
 
 class TokenOut(BaseModel):
@@ -70,12 +70,21 @@ class EstoqueMovimentacaoIn(BaseModel):
     quantidade: int = Field(gt=0)
 
 
+class EstoqueMovimentacaoLoteIn(BaseModel):
+    movimentacoes: list[EstoqueMovimentacaoIn] = Field(min_length=1, max_length=1000)
+
+
 class EstoqueSaldoOut(BaseModel):
     unidade_id: int
     produto_id: int
     quantidade: int
 
 
+class EstoqueSaldosConsultaIn(BaseModel):
+    unidade_id: int
+    produto_ids: list[int] | None = Field(default=None, min_length=1, max_length=10000)
+
+
 class PedidoItemIn(BaseModel):
     produto_id: int
     quantidade: int = Field(gt=0)
@@ -108,14 +117,100 @@ class PedidoOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class PedidoPaginaOut(BaseModel):
+    pedidos: list[PedidoOut]
+    proximo_cursor: int | None = None
+
+
 class PagamentoProcessarIn(BaseModel):
     aprovado: bool
     observacao: str = ""
 
 
+class PagamentoLoteItemIn(PagamentoProcessarIn):
+    pedido_id: int
+
+
+class PagamentoLoteIn(BaseModel):
+    pagamentos: list[PagamentoLoteItemIn] = Field(min_length=1, max_length=1000)
+    modo: str = Field(default="ABORTAR", pattern="^(ABORTAR|IGNORAR)$")
+
+
+class PagamentoLoteResultadoOut(BaseModel):
+    pedido_id: int
+    processado: bool
+    status_code: int
+    status: PedidoStatusEnum | None = None
+    erro: str | None = None
+
+
 class PedidoStatusUpdateIn(BaseModel):
     novo_status: PedidoStatusEnum
 
 
+class PedidoStatusLoteItemIn(PedidoStatusUpdateIn):
+    pedido_id: int
+
+
+class PedidoStatusLoteIn(BaseModel):
+    transicoes: list[PedidoStatusLoteItemIn] = Field(min_length=1, max_length=500)
+
+
+class PedidoStatusRejeitadoOut(BaseModel):
+    pedido_id: int
+    status_code: int
+    erro: str
+
+
+class PedidoStatusLoteOut(BaseModel):
+    aplicados: list[int]
+    rejeitados: list[PedidoStatusRejeitadoOut]
+
+
 class FidelidadeResgateIn(BaseModel):
     pontos: int = Field(gt=0)
+
+
+class MovimentoFidelidadeOut(BaseModel):
+    id: int
+    tipo: MovimentoFidelidadeEnum
+    pontos: int
+    pedido_id: int | None
+    criado_em: datetime
+
+
+class ExtratoFidelidadeOut(BaseModel):
+    clienteId: int
+    pontos: int
+    movimentos: list[MovimentoFidelidadeOut]
+    proximo_cursor: int | None = None
+
+
+class AuditLogOut(BaseModel):
+    id: int
+    usuario_id: int | None
+    acao: str
+    entidade: str
+    entidade_id: str
+    detalhes: str
+    criado_em: datetime
+
+
+class AuditoriaPaginaOut(BaseModel):
+    registros: list[AuditLogOut]
+    proximo_cursor: int | None = None
+
+
+class ReceitaLinhaOut(BaseModel):
+    dia: date | None = None
+    unidade_id: int | None = None
+    canal_pedido: CanalPedidoEnum | None = None
+    pedidos: int
+    receita: Decimal
+
+
+class ProdutoVendidoOut(BaseModel):
+    produto_id: int
+    pedidos: int
+    quantidade: int
+    receita: Decimal
@@ -0,0 +1,129 @@
+"""Latência de GET /pedidos na tabela quente antes e depois do arquivamento de pedidos finalizados.
+
+Gera a massa sintética (app.db.dados_sinteticos) em um SQLite temporário, mede as consultas de
+listagem mais usadas (painéis da cozinha/retirada, filtros por status, canal e data), arquiva
+os pedidos finalizados há mais de --idade-dias e mede de novo, inclusive com historico=true.
+Chama a função da rota diretamente (consulta + serialização), sem HTTP.
+
+Uso: python -m benchmarks.arquivamento [--pedidos 10000000] [--idade-dias 30] [--repeticoes 30]
+     [--database-url sqlite:///./escala.db --sem-gerar]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.api.deps import Principal
+from app.api.routes.pedidos import listar
+from app.application.arquivamento_service import arquivar_pedidos
+from app.db.dados_sinteticos import Escala, gerar
+from app.db.migrations import aplicar_migracoes
+from app.domain.models import CanalPedidoEnum, Pedido, PedidoArquivo, PedidoStatusEnum, RoleEnum
+from benchmarks.comum import percentil
+
+ADMIN = Principal(id=1, email="admin@lanchonete.com", role=RoleEnum.ADMIN)
+
+
+def _cenarios(unidade_id: int, ultimo: datetime) -> dict[str, dict]:
+    return {
+        "sem filtro": {},
+        "cozinha: unidade + EM_PREPARO": {"unidadeId": unidade_id, "status": PedidoStatusEnum.EM_PREPARO},
+        "retirada: unidade + PRONTO": {"unidadeId": unidade_id, "status": PedidoStatusEnum.PRONTO},
+        "status PAGO (todas as unidades)": {"status": PedidoStatusEnum.PAGO},
+        "TOTEM aguardando pagamento": {
+            "canalPedido": CanalPedidoEnum.TOTEM,
+            "status": PedidoStatusEnum.AGUARDANDO_PAGAMENTO,
+        },
+        "unidade, últimas 24h": {"unidadeId": unidade_id, "criadoDe": ultimo - timedelta(days=1)},
+        "unidade, ENTREGUE (histórico)": {"unidadeId": unidade_id, "status": PedidoStatusEnum.ENTREGUE},
+    }
+
+
+def _medir(fabrica, cenarios: dict[str, dict], repeticoes: int, historico: bool = False) -> dict:
+    resultado = {}
+    with fabrica() as db:
+        for nome, filtros in cenarios.items():
+            argumentos = {
+                "canalPedido": None,
+                "status": None,
+                "unidadeId": None,
+                "criadoDe": None,
+                "criadoAte": None,
+                "after_id": None,
+                "limit": 50,
+                "historico": historico,
+                **filtros,
+            }
+            amostras = []
+            for indice in range(repeticoes + 3):
+                inicio = time.perf_counter()
+                resposta = listar(db=db, current_user=ADMIN, **argumentos)
+                if indice >= 3:
+                    amostras.append((time.perf_counter() - inicio) * 1000)
+            resultado[nome] = {
+                "p50_ms": round(percentil(amostras, 50), 2),
+                "p95_ms": round(percentil(amostras, 95), 2),
+                "linhas": len(json.loads(resposta.body)["pedidos"]),
+            }
+    return resultado
+
+
+def _contagens(fabrica) -> dict[str, int]:
+    with fabrica() as db:
+        return {
+            "pedidos": db.scalar(select(func.count()).select_from(Pedido)),
+            "pedidos_arquivo": db.scalar(select(func.count()).select_from(PedidoArquivo)),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=10_000_000)
+    parser.add_argument("--unidades", type=int, default=500)
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--clientes", type=int, default=100_000)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--idade-dias", type=int, default=30)
+    parser.add_argument("--lote", type=int, default=20_000)
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--database-url", default=None, help="padrão: SQLite temporário")
+    parser.add_argument("--sem-gerar", action="store_true", help="usa a massa já existente em --database-url")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        url = args.database_url or f"sqlite:///{Path(pasta) / 'arquivo.db'}"
+        engine = create_engine(url)
+        aplicar_migracoes(engine)
+        fabrica = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        relatorio: dict = {}
+        if not args.sem_gerar:
+            escala = Escala(args.unidades, args.produtos, args.clientes, args.pedidos, 200)
+            inicio = time.perf_counter()
+            gerar(engine, escala, 42, date.today(), args.dias, 20_000, progresso=False)
+            relatorio["geracao_s"] = round(time.perf_counter() - inicio, 1)
+
+        with fabrica() as db:
+            unidade_id, ultimo = db.execute(
+                select(Pedido.unidade_id, Pedido.criado_em).order_by(Pedido.id.desc()).limit(1)
+            ).one()
+        cenarios = _cenarios(unidade_id, ultimo)
+
+        relatorio["antes"] = {**_contagens(fabrica), "latencias": _medir(fabrica, cenarios, args.repeticoes)}
+        inicio = time.perf_counter()
+        relatorio["arquivamento"] = arquivar_pedidos(engine, args.idade_dias, args.lote)
+        relatorio["arquivamento"]["segundos"] = round(time.perf_counter() - inicio, 1)
+        relatorio["depois"] = {**_contagens(fabrica), "latencias": _medir(fabrica, cenarios, args.repeticoes)}
+        relatorio["depois_com_historico"] = _medir(fabrica, cenarios, args.repeticoes, historico=True)
+        engine.dispose()
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Teste de carga de POST /pedidos com DB_ASYNC desligado e ligado.
+
+Sobe a API com uvicorn para cada modo e mede req/s e latência com N clientes concorrentes
+criando pedidos. Por padrão usa um SQLite temporário; --database-url aponta para um banco
+vazio (ex.: PostgreSQL), que recebe o seed na inicialização.
+Uso: python -m benchmarks.carga_pedidos [--clientes 200] [--segundos 15] [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.comum import percentil, servidor_uvicorn
+
+MODOS = {"sync": "false", "async": "true"}
+
+
+async def _disparar(base_url: str, clientes: int, segundos: float) -> dict:
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=60) as client:
+        login = await client.post("/auth/login", data={"username": "admin@lanchonete.com", "password": "admin123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        await client.post(
+            "/estoque/movimentacoes",
+            json={"unidade_id": 1, "produto_id": 1, "tipo": "ENTRADA", "quantidade": 10_000_000},
+            headers=headers,
+        )
+        corpo = {"unidade_id": 1, "canalPedido": "TOTEM", "itens": [{"produto_id": 1, "quantidade": 1}]}
+
+        latencias: list[float] = []
+        erros = 0
+        fim = time.perf_counter() + segundos
+
+        async def _cliente() -> None:
+            nonlocal erros
+            while time.perf_counter() < fim:
+                inicio = time.perf_counter()
+                try:
+                    resposta = await client.post("/pedidos", json=corpo, headers=headers)
+                except httpx.TransportError:
+                    erros += 1
+                    continue
+                if resposta.status_code == 201:
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                else:
+                    erros += 1
+
+        inicio_total = time.perf_counter()
+        await asyncio.gather(*(_cliente() for _ in range(clientes)))
+        duracao = time.perf_counter() - inicio_total
+
+    return {
+        "req_s": round(len(latencias) / duracao, 1),
+        "erros": erros,
+        "p50_ms": round(percentil(latencias, 50), 2),
+        "p99_ms": round(percentil(latencias, 99), 2),
+    }
+
+
+def medir_modo(db_async: str, clientes: int, segundos: float, database_url: str | None) -> dict:
+    with servidor_uvicorn({"DB_ASYNC": db_async}, database_url) as base_url:
+        return asyncio.run(_disparar(base_url, clientes, segundos))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clientes", type=int, default=200)
+    parser.add_argument("--segundos", type=float, default=15)
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    relatorio = {
+        modo: medir_modo(valor, args.clientes, args.segundos, args.database_url) for modo, valor in MODOS.items()
+    }
+    print(json.dumps({"clientes": args.clientes, **relatorio}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Utilitários compartilhados pelos scripts de benchmark."""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+
+def percentil(amostras: list[float], p: float) -> float:
+    if not amostras:
+        return 0.0
+    ordenadas = sorted(amostras)
+    return ordenadas[min(len(ordenadas) - 1, round(p / 100 * (len(ordenadas) - 1)))]
+
+
+def porta_livre() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def aguardar_api(base_url: str, tentativas: int = 100) -> None:
+    import httpx
+
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        for _ in range(tentativas):
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError("API não respondeu a tempo")
+
+
+@contextmanager
+def servidor_uvicorn(env: dict[str, str] | None = None, database_url: str | None = None) -> Iterator[str]:
+    """Sobe app.main:app com uvicorn (SQLite temporário por padrão) e devolve a URL base."""
+    porta = porta_livre()
+    with tempfile.TemporaryDirectory() as pasta:
+        url = database_url or f"sqlite:///{Path(pasta) / 'bench.db'}"
+        processo = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "warning"],
+            env={**os.environ, "DATABASE_URL": url, **(env or {})},
+        )
+        try:
+            base_url = f"http://127.0.0.1:{porta}"
+            asyncio.run(aguardar_api(base_url))
+            yield base_url
+        finally:
+            processo.terminate()
+            processo.wait()
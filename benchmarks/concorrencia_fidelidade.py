@@ -0,0 +1,165 @@
+"""Teste de estresse do extrato de fidelidade: créditos e resgates simultâneos sem perda de atualização.
+
+Várias threads creditam e resgatam pontos de poucos clientes ao mesmo tempo (cada operação em
+sua própria sessão/transação). Ao final confere, por cliente, que o saldo em cache é igual ao
+saldo inicial + créditos - resgates aceitos, igual à soma do extrato e nunca negativo, e que a
+conciliação não tem nada a corrigir. Sai com código 1 em qualquer divergência.
+
+Com --legado, os resgates usam o fluxo anterior (lê o saldo, subtrai em Python e grava), o que
+mostra as atualizações perdidas que o teste detecta.
+
+Uso: python -m benchmarks.concorrencia_fidelidade [--threads 32] [--operacoes 200] [--clientes 4]
+     [--database-url postgresql://...] [--legado]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.application.fidelidade_service import creditar_pontos, reconciliar_saldos, resgatar_pontos
+from app.core.config import ENGINE_PROFILES
+from app.db.migrations import aplicar_migracoes
+from app.db.session import apply_sqlite_pragmas
+from app.domain.models import MovimentoFidelidade, RoleEnum, User
+
+SALDO_INICIAL = 1000
+
+
+def _resgatar_legado(db, cliente_id: int, pontos: int) -> int:
+    cliente = db.scalar(select(User).where(User.id == cliente_id))
+    if cliente.pontos_fidelidade < pontos:
+        raise HTTPException(status_code=409, detail="Pontos insuficientes")
+    cliente.pontos_fidelidade -= pontos
+    db.add(MovimentoFidelidade(cliente_id=cliente_id, tipo="RESGATE", pontos=-pontos))
+    db.commit()
+    return cliente.pontos_fidelidade
+
+
+def executar(database_url: str, threads: int, operacoes: int, clientes: int, semente: int, legado: bool) -> dict:
+    sqlite = database_url.startswith("sqlite")
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False} if sqlite else {},
+        pool_size=threads,
+        max_overflow=0,
+    )
+    if sqlite:
+        apply_sqlite_pragmas(engine, ENGINE_PROFILES["sqlite_wal"].sqlite_pragmas)
+    aplicar_migracoes(engine)
+    fabrica = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with fabrica() as db:
+        ids = []
+        for indice in range(clientes):
+            cliente = User(
+                nome=f"Cliente estresse {indice}",
+                email=f"estresse{indice}-{time.time_ns()}@fidelidade.local",
+                senha_hash="-",
+                role=RoleEnum.CLIENTE,
+                consentimento_lgpd=True,
+            )
+            db.add(cliente)
+            db.flush()
+            ids.append(cliente.id)
+        for cliente_id in ids:
+            creditar_pontos(db, cliente_id, SALDO_INICIAL)
+        db.commit()
+
+    resgatar = _resgatar_legado if legado else resgatar_pontos
+    esperado = {cliente_id: SALDO_INICIAL for cliente_id in ids}
+    contagem = defaultdict(int)
+    trava = threading.Lock()
+    largada = threading.Barrier(threads)
+
+    def _trabalhador(numero: int) -> None:
+        rng = random.Random(semente + numero)
+        largada.wait()
+        for _ in range(operacoes):
+            cliente_id = rng.choice(ids)
+            pontos = rng.randint(1, 50)
+            with fabrica() as db:
+                try:
+                    if rng.random() < 0.5:
+                        creditar_pontos(db, cliente_id, pontos)
+                        db.commit()
+                        tipo, delta = "creditos", pontos
+                    else:
+                        resgatar(db, cliente_id, pontos)
+                        tipo, delta = "resgates", -pontos
+                except HTTPException:
+                    tipo, delta = "recusados", 0
+            with trava:
+                esperado[cliente_id] += delta
+                contagem[tipo] += 1
+
+    cronometro = time.perf_counter()
+    trabalhadores = [threading.Thread(target=_trabalhador, args=(numero,)) for numero in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    segundos = time.perf_counter() - cronometro
+
+    divergencias = []
+    with fabrica() as db:
+        saldos = dict(db.execute(select(User.id, User.pontos_fidelidade).where(User.id.in_(ids))).all())
+        extrato = dict(
+            db.execute(
+                select(MovimentoFidelidade.cliente_id, func.sum(MovimentoFidelidade.pontos))
+                .where(MovimentoFidelidade.cliente_id.in_(ids))
+                .group_by(MovimentoFidelidade.cliente_id)
+            ).all()
+        )
+    for cliente_id in ids:
+        if not saldos[cliente_id] == extrato[cliente_id] == esperado[cliente_id] or saldos[cliente_id] < 0:
+            divergencias.append(
+                {
+                    "cliente_id": cliente_id,
+                    "saldo": saldos[cliente_id],
+                    "extrato": extrato[cliente_id],
+                    "esperado": esperado[cliente_id],
+                }
+            )
+    corrigidos = reconciliar_saldos(engine)
+    engine.dispose()
+
+    return {
+        "fluxo": "legado" if legado else "extrato",
+        "threads": threads,
+        "operacoes": threads * operacoes,
+        **contagem,
+        "ops_por_segundo": round(threads * operacoes / segundos, 1),
+        "divergencias": divergencias,
+        "corrigidos_na_conciliacao": corrigidos,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--operacoes", type=int, default=200, help="operações por thread")
+    parser.add_argument("--clientes", type=int, default=4, help="poucos clientes concentram a disputa")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--database-url", default=None, help="padrão: SQLite temporário")
+    parser.add_argument("--legado", action="store_true", help="resgate com leitura e gravação em Python")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        url = args.database_url or f"sqlite:///{Path(pasta) / 'fidelidade.db'}"
+        resultado = executar(url, args.threads, args.operacoes, args.clientes, args.semente, args.legado)
+    print(json.dumps(resultado, indent=2))
+    return 1 if resultado["divergencias"] or resultado["corrigidos_na_conciliacao"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
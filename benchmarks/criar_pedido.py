@@ -0,0 +1,125 @@
+"""Compara o fluxo antigo de criação de pedido (item a item) com o fluxo em lote.
+
+Uso: python -m benchmarks.criar_pedido [--repeticoes 200]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.application.pedido_service import criar_pedido
+from app.db.base import Base
+from app.domain.models import CanalPedidoEnum, Estoque, Pedido, PedidoItem, PedidoStatusEnum, Produto, RoleEnum, Unidade, User
+from app.infrastructure.audit import log_action
+from app.schemas import PedidoCreate, PedidoItemIn
+from benchmarks.comum import percentil
+
+TAMANHOS = (1, 10, 50)
+
+
+def criar_pedido_legado(db: Session, cliente: User, pedido_in: PedidoCreate) -> Pedido:
+    """Reprodução do fluxo anterior: dois SELECTs e um INSERT por item."""
+    db.scalar(select(Unidade).where(Unidade.id == pedido_in.unidade_id, Unidade.ativo.is_(True)))
+    pedido = Pedido(
+        cliente_id=cliente.id,
+        unidade_id=pedido_in.unidade_id,
+        canal_pedido=CanalPedidoEnum(pedido_in.canalPedido),
+        status=PedidoStatusEnum.AGUARDANDO_PAGAMENTO,
+        valor_total=Decimal("0.00"),
+    )
+    db.add(pedido)
+    db.flush()
+
+    total = Decimal("0.00")
+    for item in pedido_in.itens:
+        produto = db.scalar(select(Produto).where(Produto.id == item.produto_id, Produto.ativo.is_(True)))
+        estoque = db.scalar(
+            select(Estoque).where(Estoque.unidade_id == pedido_in.unidade_id, Estoque.produto_id == item.produto_id)
+        )
+        estoque.quantidade -= item.quantidade
+        db.add(PedidoItem(pedido_id=pedido.id, produto_id=item.produto_id, quantidade=item.quantidade, preco_unitario=produto.preco))
+        total += produto.preco * item.quantidade
+
+    pedido.valor_total = total
+    log_action(db, cliente.id, "CRIAR_PEDIDO", "Pedido", str(pedido.id), "benchmark")
+    db.commit()
+    db.refresh(pedido)
+    return pedido
+
+
+def _preparar_banco(caminho: Path, produtos: int):
+    engine = create_engine(f"sqlite:///{caminho}")
+    Base.metadata.create_all(bind=engine)
+    fabrica = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with fabrica() as db:
+        cliente = User(nome="Bench", email="bench@lanchonete.com", senha_hash="x", role=RoleEnum.CLIENTE)
+        unidade = Unidade(nome="Bench", cidade="Curitiba", ativo=True)
+        db.add_all([cliente, unidade])
+        db.flush()
+        for indice in range(produtos):
+            produto = Produto(nome=f"Produto {indice}", descricao="bench", preco=Decimal("10.00"), ativo=True)
+            db.add(produto)
+            db.flush()
+            db.add(Estoque(unidade_id=unidade.id, produto_id=produto.id, quantidade=10_000_000))
+        db.commit()
+    return engine, fabrica
+
+
+def medir(funcao, itens: int, repeticoes: int) -> dict:
+    with tempfile.TemporaryDirectory() as pasta:
+        engine, fabrica = _preparar_banco(Path(pasta) / "bench.db", itens)
+        comandos = 0
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _contar(*_):
+            nonlocal comandos
+            comandos += 1
+
+        with fabrica() as db:
+            cliente = db.scalar(select(User))
+            unidade_id = db.scalar(select(Unidade.id))
+            produto_ids = list(db.scalars(select(Produto.id)))
+        pedido_in = PedidoCreate(
+            unidade_id=unidade_id,
+            canalPedido=CanalPedidoEnum.TOTEM,
+            itens=[PedidoItemIn(produto_id=produto_id, quantidade=1) for produto_id in produto_ids],
+        )
+
+        latencias = []
+        comandos = 0
+        for _ in range(repeticoes):
+            with fabrica() as db:
+                inicio = time.perf_counter()
+                funcao(db, cliente, pedido_in)
+                latencias.append((time.perf_counter() - inicio) * 1000)
+        engine.dispose()
+
+    return {
+        "comandos_por_pedido": round(comandos / repeticoes, 1),
+        "p50_ms": round(percentil(latencias, 50), 3),
+        "p99_ms": round(percentil(latencias, 99), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    relatorio = {}
+    for itens in TAMANHOS:
+        relatorio[f"{itens}_itens"] = {
+            "legado": medir(criar_pedido_legado, itens, args.repeticoes),
+            "lote": medir(criar_pedido, itens, args.repeticoes),
+        }
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
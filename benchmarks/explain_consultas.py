@@ -0,0 +1,97 @@
+"""Confere, via EXPLAIN QUERY PLAN (SQLite), que as consultas quentes usam os índices compostos.
+
+Sai com código 1 se alguma consulta cair em varredura da tabela (SCAN, ou busca só pela
+chave primária) em vez de usar o índice esperado, ou se precisar ordenar o resultado à parte
+(USE TEMP B-TREE) em vez de ler na ordem do índice.
+Uso: python -m benchmarks.explain_consultas
+"""
+
+import sys
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import create_engine, select, text
+
+from app.application.auditoria_service import consulta_auditoria
+from app.application.exportacao_service import FONTES, consulta_exportacao
+from app.application.pedido_service import consulta_listagem
+from app.db.migrations import aplicar_migracoes
+from app.domain.models import AuditLog, MovimentoFidelidade, Pedido, PedidoItem, PedidoStatusEnum
+
+
+CONSULTAS = {
+    "pedidos do cliente (GET /pedidos como CLIENTE)": (
+        consulta_listagem(Pedido, 50, cliente_id=1, after_id=1000),
+        "ix_pedidos_cliente_id_id",
+    ),
+    "pedidos da unidade por status (GET /pedidos?unidadeId&status)": (
+        consulta_listagem(Pedido, 50, status=PedidoStatusEnum.EM_PREPARO, unidade_id=1, after_id=1000),
+        "ix_pedidos_unidade_status_id",
+    ),
+    "itens da página de pedidos": (
+        select(PedidoItem.produto_id).where(PedidoItem.pedido_id.in_([1, 2, 3])),
+        "ix_pedido_itens_pedido_id",
+    ),
+    "auditoria de uma entidade": (
+        select(AuditLog.id).where(AuditLog.entidade == "Pedido", AuditLog.entidade_id == "1").order_by(AuditLog.criado_em),
+        "ix_audit_logs_entidade_criado_em",
+    ),
+    "auditoria por entidade (GET /auditoria?entidade&entidadeId)": (
+        consulta_auditoria(50, after_id=1000, entidade="Pedido", entidade_id="1"),
+        "ix_audit_logs_entidade_id_id",
+    ),
+    "auditoria por usuário (GET /auditoria?usuarioId)": (
+        consulta_auditoria(50, after_id=1000, usuario_id=1),
+        "ix_audit_logs_usuario_id_id",
+    ),
+    "auditoria por ação (GET /auditoria?acao)": (
+        consulta_auditoria(50, after_id=1000, acao="CRIAR_PEDIDO"),
+        "ix_audit_logs_acao_id",
+    ),
+    "auditoria por período (GET /auditoria?criadoDe&criadoAte)": (
+        consulta_auditoria(50, after_id=1000, criado_de=datetime(2026, 1, 1), criado_ate=datetime(2026, 1, 2)),
+        "ix_audit_logs_criado_em_id",
+    ),
+    "extrato de fidelidade (GET /fidelidade/extrato)": (
+        select(MovimentoFidelidade.id)
+        .where(MovimentoFidelidade.cliente_id == 1, MovimentoFidelidade.id < 1000)
+        .order_by(MovimentoFidelidade.id.desc())
+        .limit(51),
+        "ix_fidelidade_movimentos_cliente_id_id",
+    ),
+    "exportação de pedidos por período (GET /relatorios/pedidos/export)": (
+        consulta_exportacao(FONTES[1], date(2026, 1, 1), date(2026, 1, 31)),
+        "ix_pedidos_criado_em_id",
+    ),
+    "exportação de pedidos arquivados por período": (
+        consulta_exportacao(FONTES[0], date(2026, 1, 1), date(2026, 1, 31)),
+        "ix_pedidos_arquivo_criado_em_id",
+    ),
+}
+
+
+def plano_de_execucao(conn, consulta) -> list[str]:
+    sql = str(consulta.compile(conn, compile_kwargs={"literal_binds": True}))
+    return [linha[-1] for linha in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+
+
+def main() -> int:
+    falhas = 0
+    with tempfile.TemporaryDirectory() as pasta:
+        engine = create_engine(f"sqlite:///{Path(pasta) / 'explain.db'}")
+        aplicar_migracoes(engine)
+        with engine.connect() as conn:
+            for nome, (consulta, indice) in CONSULTAS.items():
+                plano = plano_de_execucao(conn, consulta)
+                usa_indice = any(indice in passo for passo in plano)
+                ordena = any("USE TEMP B-TREE" in passo for passo in plano)
+                ok = usa_indice and not ordena
+                print(f"{'ok' if ok else 'FALHA':5} {nome}: {'; '.join(plano)}")
+                falhas += not ok
+        engine.dispose()
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Vazão e pico de RSS da exportação de pedidos (GET /relatorios/pedidos/export) em CSV, NDJSON e gzip.
+
+Gera um SQLite temporário com app.db.dados_sinteticos e consome o corpo da exportação de cada
+variante num processo novo, para que o pico de RSS (acima do processo já aquecido) seja só dela.
+Com --lista, mede também o caminho que monta todas as linhas em memória antes de codificar (como
+a listagem de pedidos faz), para comparação; evite-o com milhões de linhas em máquinas pequenas.
+Uso: python -m benchmarks.exportacao [--pedidos 1700000] [--lista]   (~3 itens por pedido: ~5M linhas)
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+
+def _pico_rss_mb() -> float:
+    # ru_maxrss sobrevive ao exec do processo filho (herda o pico do pai, que gerou a massa);
+    # VmHWM é do espaço de endereçamento atual. Fora do Linux, fica o ru_maxrss.
+    try:
+        with open("/proc/self/status") as status:
+            for linha in status:
+                if linha.startswith("VmHWM:"):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _blocos(engine, variante: str):
+    from app.application.exportacao_service import FONTES, _csv, comprimir_gzip, consulta_exportacao, exportar_pedidos
+
+    if variante == "lista":
+        with engine.connect() as conn:
+            linhas = [linha for fonte in FONTES for linha in conn.execute(consulta_exportacao(fonte, None, None)).all()]
+        return iter([_csv(linhas)])
+    formato, _, compressao = variante.partition("+")
+    blocos = exportar_pedidos(engine, formato)
+    return comprimir_gzip(blocos) if compressao else blocos
+
+
+def _medir(variante: str, database_url: str, fila) -> None:
+    from sqlalchemy import create_engine
+
+    engine = create_engine(database_url)
+    # Aquece imports, conexão e o cache de compilação do SQLAlchemy.
+    next(iter(_blocos(engine, "csv")), None)
+    rss_base = _pico_rss_mb()
+
+    inicio = time.perf_counter()
+    total = linhas = 0
+    for bloco in _blocos(engine, variante):
+        total += len(bloco)
+        linhas += bloco.count(b"\n") if "gzip" not in variante else 0
+    linhas -= variante == "csv"  # cabeçalho
+    segundos = time.perf_counter() - inicio
+    fila.put(
+        {
+            "segundos": round(segundos, 1),
+            "linhas": linhas or None,
+            "mb": round(total / 2**20, 1),
+            "mb_por_segundo": round(total / 2**20 / segundos, 1),
+            "pico_rss_mb": round(_pico_rss_mb() - rss_base, 1),
+            "pico_rss_total_mb": round(_pico_rss_mb(), 1),
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pedidos", type=int, default=1_700_000)
+    parser.add_argument("--lista", action="store_true", help="inclui a variante que materializa as linhas")
+    args = parser.parse_args()
+
+    contexto = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as pasta:
+        database_url = f"sqlite:///{Path(pasta) / 'exportacao.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        from app.db.dados_sinteticos import Escala, gerar
+        from app.db.migrations import aplicar_migracoes
+        from app.db.session import engine
+
+        aplicar_migracoes(engine)
+        escala = Escala(unidades=50, produtos=500, clientes=10_000, pedidos=args.pedidos, produtos_por_unidade=100)
+        gerar(engine, escala, semente=7, data_final=date(2025, 1, 1), dias=90, lote=20_000, progresso=False)
+        engine.dispose()
+
+        relatorio = {}
+        for variante in ("csv", "ndjson", "csv+gzip", "ndjson+gzip", *(("lista",) if args.lista else ())):
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_medir, args=(variante, database_url, fila))
+            processo.start()
+            relatorio[variante] = fila.get()
+            processo.join()
+
+    print(json.dumps({"pedidos": args.pedidos, **relatorio}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Confere que uma requisição com Idempotency-Key que falha depois da operação não deixa efeitos.
+
+Simula a queda entre a operação (pedido ou pagamento) e a gravação da resposta fazendo
+Idempotencia._concluir falhar, com AUDIT_MODE=db, nos modos síncrono e DB_ASYNC. Nenhum pedido,
+pagamento, evento de painel (SSE) ou registro de auditoria pode sobrar; em seguida, a mesma
+chave precisa funcionar e emitir exatamente um evento e um registro. Sai com código 1 se algo
+vazar. Uso: python -m benchmarks.idempotencia_falhas
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PEDIDO = {"unidade_id": 1, "canalPedido": "BALCAO", "itens": [{"produto_id": 1, "quantidade": 1}]}
+
+
+def _cenario(modo_async: bool, pasta: str, fila) -> None:
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{Path(pasta) / 'idempotencia.db'}",
+        DB_ASYNC=str(modo_async).lower(),
+        AUDIT_MODE="db",
+        AUDIT_FLUSH_INTERVAL_SECONDS="0.05",
+        PASSWORD_HASH_ITERATIONS="1000",
+    )
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, select
+
+    from app.db.session import engine
+    from app.domain.models import AuditLog, PagamentoMock, Pedido
+    from app.infrastructure.idempotencia import Idempotencia
+    from app.infrastructure.pedido_eventos import broadcaster
+    from app.main import app
+
+    eventos = []
+    publicar = broadcaster.publicar
+    broadcaster.publicar = lambda unidade_id, tipo, dados: eventos.append(tipo) or publicar(unidade_id, tipo, dados)
+
+    def contagens() -> dict:
+        time.sleep(0.3)  # a thread de auditoria grava em lotes
+        with engine.connect() as conn:
+            return {
+                "pedidos": conn.scalar(select(func.count()).select_from(Pedido)),
+                "pagamentos": conn.scalar(select(func.count()).select_from(PagamentoMock)),
+                "auditoria": conn.scalar(select(func.count()).select_from(AuditLog)),
+                "eventos": len(eventos),
+            }
+
+    def concluir_com_falha(*_):
+        raise RuntimeError("queda entre a operação e a gravação da resposta")
+
+    resultado = {}
+    with TestClient(app, raise_server_exceptions=False) as cliente:
+        token = cliente.post(
+            "/auth/login", data={"username": "admin@lanchonete.com", "password": "admin123"}
+        ).json()["access_token"]
+        autorizacao = {"Authorization": f"Bearer {token}"}
+        pedido_id = cliente.post("/pedidos", json=PEDIDO, headers=autorizacao).json()["id"]
+        requisicoes = {
+            "POST /pedidos": ("/pedidos", PEDIDO),
+            "POST /pagamentos/mock/{id}": (f"/pagamentos/mock/{pedido_id}", {"aprovado": True}),
+        }
+
+        for nome, (caminho, corpo) in requisicoes.items():
+            cabecalhos = {**autorizacao, "Idempotency-Key": nome}
+            antes = contagens()
+            concluir = Idempotencia._concluir
+            Idempotencia._concluir = concluir_com_falha
+            try:
+                status_falha = cliente.post(caminho, json=corpo, headers=cabecalhos).status_code
+            finally:
+                Idempotencia._concluir = concluir
+            depois_da_falha = contagens()
+            status_repeticao = cliente.post(caminho, json=corpo, headers=cabecalhos).status_code
+            depois = contagens()
+            resultado[nome] = {
+                "ok": status_falha == 500
+                and depois_da_falha == antes
+                and status_repeticao in (200, 201)
+                and depois["eventos"] - antes["eventos"] == 1
+                and depois["auditoria"] - antes["auditoria"] == 1,
+                "status": [status_falha, status_repeticao],
+                "antes": antes,
+                "depois_da_falha": depois_da_falha,
+                "depois_da_repeticao": depois,
+            }
+    fila.put(resultado)
+
+
+def main() -> int:
+    contexto = multiprocessing.get_context("spawn")
+    relatorio = {}
+    for modo_async in (False, True):
+        with tempfile.TemporaryDirectory() as pasta:
+            fila = contexto.Queue()
+            processo = contexto.Process(target=_cenario, args=(modo_async, pasta, fila))
+            processo.start()
+            relatorio["DB_ASYNC" if modo_async else "sync"] = fila.get()
+            processo.join()
+
+    print(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    return 0 if all(cenario["ok"] for modo in relatorio.values() for cenario in modo.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""Tempo até a primeira resposta (partida a frio) de app.main:app sob uvicorn.
+
+Sobe o servidor N vezes com um banco novo (disco efêmero: esquema, dados iniciais e admin a cada
+partida) e N vezes com um banco já na última versão, medindo do início do processo até o primeiro
+200 em GET /; também mostra o relatório de inicialização logado pelo app. Sai com código 1 se o
+pior tempo de algum cenário passar de --limite segundos (teste de regressão da partida a frio).
+Uso: python -m benchmarks.partida_fria [--repeticoes 5] [--limite 3.0]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from benchmarks.comum import percentil, porta_livre
+
+
+def _partida(database_url: str, tempo_maximo: float) -> tuple[float, str]:
+    porta = porta_livre()
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(porta), "--log-level", "info"],
+        env={**os.environ, "DATABASE_URL": database_url},
+        stderr=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        text=True,
+    )
+    try:
+        while time.perf_counter() - inicio < tempo_maximo:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{porta}/", timeout=1) as resposta:
+                    if resposta.status == 200:
+                        decorrido = time.perf_counter() - inicio
+                        break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        else:
+            raise RuntimeError("API não respondeu a tempo")
+    finally:
+        processo.terminate()
+        _, saida = processo.communicate()
+    linhas = [linha.split("Inicialização: ", 1)[1] for linha in saida.splitlines() if "Inicialização: " in linha]
+    return decorrido, linhas[0] if linhas else ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite", type=float, default=3.0, help="segundos; pior partida aceitável")
+    args = parser.parse_args()
+
+    resultado = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        existente = f"sqlite:///{Path(pasta) / 'existente.db'}"
+        _partida(existente, 30)
+        cenarios = {
+            "banco_novo": lambda indice: f"sqlite:///{Path(pasta) / f'novo{indice}.db'}",
+            "banco_existente": lambda _: existente,
+        }
+        for nome, database_url in cenarios.items():
+            tempos, relatorios = [], []
+            for indice in range(args.repeticoes):
+                segundos, relatorio = _partida(database_url(indice), args.limite * 5)
+                tempos.append(segundos * 1000)
+                relatorios.append(relatorio)
+            resultado[nome] = {
+                "p50_ms": round(percentil(tempos, 50), 1),
+                "max_ms": round(max(tempos), 1),
+                "relatorio": relatorios[len(relatorios) // 2],
+            }
+
+    print(json.dumps({"limite_ms": args.limite * 1000, **resultado}, indent=2, ensure_ascii=False))
+    return 1 if any(medida["max_ms"] > args.limite * 1000 for medida in resultado.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
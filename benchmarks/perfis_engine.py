@@ -0,0 +1,88 @@
+"""Tráfego misto de leitura/escrita sob cada perfil de engine (DB_PROFILE).
+
+Cada cliente alterna GET /pedidos e POST /pedidos (proporção configurável) contra a API
+sob uvicorn; reporta req/s, erros (inclui "database is locked") e latência por operação.
+Uso: python -m benchmarks.perfis_engine [--perfis padrao,sqlite_wal] [--clientes 50]
+     [--segundos 10] [--escritas 0.2] [--database-url URL]
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import httpx
+
+from benchmarks.comum import percentil, servidor_uvicorn
+
+PEDIDO = {"unidade_id": 1, "canalPedido": "APP", "itens": [{"produto_id": 1, "quantidade": 1}]}
+
+
+async def _trafego(base_url: str, clientes: int, segundos: float, escritas: float) -> dict:
+    limites = httpx.Limits(max_connections=clientes, max_keepalive_connections=clientes)
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=60) as client:
+        login = await client.post("/auth/login", data={"username": "admin@lanchonete.com", "password": "admin123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        await client.post(
+            "/estoque/movimentacoes",
+            json={"unidade_id": 1, "produto_id": 1, "tipo": "ENTRADA", "quantidade": 10_000_000},
+            headers=headers,
+        )
+
+        latencias: dict[str, list[float]] = {"leitura": [], "escrita": []}
+        erros = 0
+        sorteio = random.Random(42)
+        fim = time.perf_counter() + segundos
+
+        async def _cliente() -> None:
+            nonlocal erros
+            while time.perf_counter() < fim:
+                tipo = "escrita" if sorteio.random() < escritas else "leitura"
+                inicio = time.perf_counter()
+                try:
+                    if tipo == "escrita":
+                        resposta = await client.post("/pedidos", json=PEDIDO, headers=headers)
+                    else:
+                        resposta = await client.get("/pedidos", params={"limit": 20}, headers=headers)
+                except httpx.TransportError:
+                    erros += 1
+                    continue
+                if resposta.status_code in (200, 201):
+                    latencias[tipo].append((time.perf_counter() - inicio) * 1000)
+                else:
+                    erros += 1
+
+        inicio_total = time.perf_counter()
+        await asyncio.gather(*(_cliente() for _ in range(clientes)))
+        duracao = time.perf_counter() - inicio_total
+
+    total = sum(len(amostras) for amostras in latencias.values())
+    return {
+        "req_s": round(total / duracao, 1),
+        "erros": erros,
+        **{
+            tipo: {"p50_ms": round(percentil(amostras, 50), 2), "p99_ms": round(percentil(amostras, 99), 2)}
+            for tipo, amostras in latencias.items()
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--perfis", default="padrao,sqlite_wal")
+    parser.add_argument("--clientes", type=int, default=50)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--escritas", type=float, default=0.2, help="fração de requisições de escrita")
+    parser.add_argument("--database-url")
+    args = parser.parse_args()
+
+    relatorio = {}
+    for perfil in args.perfis.split(","):
+        with servidor_uvicorn({"DB_PROFILE": perfil}, args.database_url) as base_url:
+            relatorio[perfil] = asyncio.run(_trafego(base_url, args.clientes, args.segundos, args.escritas))
+    print(json.dumps(relatorio, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Tempo de CPU e pico de RSS da serialização de listas: caminho Pydantic vs. colunas Core + orjson.
+
+Gera um SQLite temporário com app.db.dados_sinteticos e serializa N pedidos (com itens) e N produtos
+por cada variante, cada uma num processo novo para que o pico de RSS seja só dela:
+- pedidos_orm: entidades ORM + PedidoOut.model_validate (from_attributes), o caminho original;
+- pedidos_colunas_pydantic: colunas Core validadas por PedidoPaginaOut (response_model do FastAPI);
+- pedidos_orjson: a rota GET /pedidos atual (colunas Core + JSONRapidoResponse);
+- produtos_orm / produtos_orjson: montagem do snapshot do cardápio antes e depois.
+Todas as variantes de um mesmo recurso precisam produzir o mesmo JSON; o script falha se divergirem.
+Uso: python -m benchmarks.serializacao [--linhas 10000] [--repeticoes 3]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+
+def _pedidos_orm(db, linhas: int) -> bytes:
+    from sqlalchemy import select
+    from sqlalchemy.orm import selectinload
+
+    from app.domain.models import Pedido
+    from app.schemas import PedidoOut, PedidoPaginaOut
+
+    pedidos = db.scalars(select(Pedido).options(selectinload(Pedido.itens)).order_by(Pedido.id.desc()).limit(linhas))
+    pagina = PedidoPaginaOut(pedidos=[PedidoOut.model_validate(pedido) for pedido in pedidos], proximo_cursor=None)
+    return pagina.model_dump_json().encode("utf-8")
+
+
+def _pedidos_colunas_pydantic(db, linhas: int) -> bytes:
+    from collections import defaultdict
+
+    from sqlalchemy import select
+
+    from app.domain.models import Pedido, PedidoItem
+    from app.schemas import PedidoPaginaOut
+
+    registros = db.execute(
+        select(
+            Pedido.id,
+            Pedido.cliente_id,
+            Pedido.unidade_id,
+            Pedido.canal_pedido,
+            Pedido.status,
+            Pedido.valor_total,
+            Pedido.criado_em,
+        )
+        .order_by(Pedido.id.desc())
+        .limit(linhas)
+    ).mappings().all()
+    itens = defaultdict(list)
+    for item in db.execute(
+        select(PedidoItem.pedido_id, PedidoItem.produto_id, PedidoItem.quantidade, PedidoItem.preco_unitario)
+        .where(PedidoItem.pedido_id.in_([registro["id"] for registro in registros]))
+        .order_by(PedidoItem.id)
+    ).mappings():
+        itens[item["pedido_id"]].append(dict(item))
+    conteudo = {"pedidos": [{**r, "itens": itens[r["id"]]} for r in registros], "proximo_cursor": None}
+    # O que o FastAPI faz com o response_model: valida, converte para tipos JSON e serializa.
+    return json.dumps(
+        PedidoPaginaOut.model_validate(conteudo).model_dump(mode="json"), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _pedidos_orjson(db, linhas: int) -> bytes:
+    from app.api.deps import Principal
+    from app.api.routes.pedidos import listar
+    from app.domain.models import RoleEnum
+
+    # Chamada direta: o teto de 200 por página é validação do Query, não da função. Com exatamente
+    # `linhas` pedidos no banco, proximo_cursor sai nulo como nas outras variantes.
+    resposta = listar(
+        canalPedido=None,
+        status=None,
+        unidadeId=None,
+        criadoDe=None,
+        criadoAte=None,
+        after_id=None,
+        limit=linhas,
+        db=db,
+        current_user=Principal(id=1, email="admin@lanchonete.com", role=RoleEnum.ADMIN),
+    )
+    return resposta.body
+
+
+def _produtos_orm(db, linhas: int) -> bytes:
+    from sqlalchemy import select
+
+    from app.domain.models import Produto
+    from app.schemas import ProdutoOut
+
+    produtos = db.scalars(select(Produto).where(Produto.ativo.is_(True)).order_by(Produto.id).limit(linhas))
+    return b"[" + b",".join(ProdutoOut.model_validate(p).model_dump_json().encode("utf-8") for p in produtos) + b"]"
+
+
+def _produtos_orjson(db, linhas: int) -> bytes:
+    from app.infrastructure.catalogo_cache import _construir
+
+    return _construir(db, 0).pagina_produtos(0, linhas)
+
+
+VARIANTES = {
+    "pedidos_orm": _pedidos_orm,
+    "pedidos_colunas_pydantic": _pedidos_colunas_pydantic,
+    "pedidos_orjson": _pedidos_orjson,
+    "produtos_orm": _produtos_orm,
+    "produtos_orjson": _produtos_orjson,
+}
+
+
+def _pico_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _medir(variante: str, database_url: str, linhas: int, repeticoes: int, fila) -> None:
+    os.environ["DATABASE_URL"] = database_url
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    engine = create_engine(database_url)
+    funcao = VARIANTES[variante]
+    with Session(engine) as db:
+        # Aquece imports, o cache de compilação do SQLAlchemy e os validadores do Pydantic.
+        funcao(db, 10)
+        db.expunge_all()
+    rss_base = _pico_rss_mb()
+
+    tempos = []
+    for _ in range(repeticoes):
+        with Session(engine) as db:
+            inicio = time.process_time()
+            corpo = funcao(db, linhas)
+            tempos.append(time.process_time() - inicio)
+    fila.put(
+        {
+            "cpu_ms": round(min(tempos) * 1000, 1),
+            "pico_rss_mb": round(_pico_rss_mb() - rss_base, 1),
+            "bytes": len(corpo),
+            "sha256": hashlib.sha256(json.dumps(json.loads(corpo), sort_keys=True).encode()).hexdigest()[:16],
+        }
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=10_000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    contexto = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as pasta:
+        database_url = f"sqlite:///{Path(pasta) / 'serializacao.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        from app.db.dados_sinteticos import Escala, gerar
+        from app.db.migrations import aplicar_migracoes
+        from app.db.session import engine
+
+        aplicar_migracoes(engine)
+        escala = Escala(
+            unidades=20, produtos=args.linhas, clientes=1000, pedidos=args.linhas, produtos_por_unidade=200
+        )
+        gerar(engine, escala, semente=7, data_final=date(2025, 1, 1), dias=30, lote=5000, progresso=False)
+        engine.dispose()
+
+        relatorio = {}
+        for variante in VARIANTES:
+            fila = contexto.Queue()
+            processo = contexto.Process(
+                target=_medir, args=(variante, database_url, args.linhas, args.repeticoes, fila)
+            )
+            processo.start()
+            relatorio[variante] = fila.get()
+            processo.join()
+
+    for recurso in ("pedidos", "produtos"):
+        digests = {medida["sha256"] for nome, medida in relatorio.items() if nome.startswith(recurso)}
+        if len(digests) != 1:
+            raise SystemExit(f"Variantes de {recurso} produziram JSON diferente: {relatorio}")
+    print(json.dumps({"linhas": args.linhas, **relatorio}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
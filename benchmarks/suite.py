@@ -0,0 +1,326 @@
+"""Suíte de carga multicanal: login, cardápio, pedido com N itens, pagamento e cozinha.
+
+Sobe a API em processo (transporte ASGI, sem rede) ou com uvicorn sobre um SQLite temporário,
+prepara usuários por perfil, produtos e estoque, e dispara N clientes que sorteiam cenários
+pelo --mix (semente fixa: a mesma sequência de cenários em toda execução). O relatório JSON traz
+por rota a contagem, erros, req/s e latência p50/p95/p99.
+
+Com --baseline, compara com um relatório salvo (--saida) e termina com código 1 se o p95 de
+alguma rota piorar além de --tolerancia ou se a vazão cair na mesma proporção.
+
+Uso: python -m benchmarks.suite [--transporte asgi|uvicorn] [--clientes 20] [--segundos 10]
+     [--itens 3] [--mix login=1,cardapio=4,pedido=3,pagamento=1,cozinha=1]
+     [--saida atual.json] [--baseline base.json] [--tolerancia 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import httpx
+
+from benchmarks.comum import percentil, servidor_uvicorn
+
+ADMIN = {"username": "admin@lanchonete.com", "password": "admin123"}
+SENHA = "bench123"
+PERFIS = ("CLIENTE", "ATENDENTE", "COZINHA")
+CANAIS = ("APP", "TOTEM", "BALCAO", "PICKUP", "WEB")
+ESTADOS_COZINHA = ("EM_PREPARO", "PRONTO", "ENTREGUE")
+MIX_PADRAO = "login=1,cardapio=4,pedido=3,pagamento=1,cozinha=1"
+PRODUTOS = 20
+
+
+class Medidor:
+    def __init__(self) -> None:
+        self.latencias: dict[str, list[float]] = defaultdict(list)
+        self.erros: dict[str, int] = defaultdict(int)
+
+    async def chamar(
+        self, client: httpx.AsyncClient, rota: str, metodo: str, url: str, esperado: int = 200, **kwargs
+    ) -> httpx.Response | None:
+        """Executa a requisição e registra a latência em `rota` (o template, não a URL concreta)."""
+        inicio = time.perf_counter()
+        try:
+            resposta = await client.request(metodo, url, **kwargs)
+        except httpx.TransportError:
+            self.erros[rota] += 1
+            return None
+        if resposta.status_code != esperado:
+            self.erros[rota] += 1
+            return None
+        self.latencias[rota].append((time.perf_counter() - inicio) * 1000)
+        return resposta
+
+    def relatorio(self, duracao: float) -> dict:
+        rotas = sorted(set(self.latencias) | set(self.erros))
+        return {
+            rota: {
+                "n": len(self.latencias[rota]),
+                "erros": self.erros[rota],
+                "req_s": round(len(self.latencias[rota]) / duracao, 1),
+                "p50_ms": round(percentil(self.latencias[rota], 50), 2),
+                "p95_ms": round(percentil(self.latencias[rota], 95), 2),
+                "p99_ms": round(percentil(self.latencias[rota], 99), 2),
+            }
+            for rota in rotas
+        }
+
+
+class Contexto:
+    """Tokens por perfil e catálogo preparados antes da medição."""
+
+    def __init__(self, headers: dict[str, dict], produto_ids: list[int], unidade_id: int, itens: int):
+        self.headers = headers
+        self.produto_ids = produto_ids
+        self.unidade_id = unidade_id
+        self.itens = itens
+
+
+async def _login(client: httpx.AsyncClient, credenciais: dict) -> dict:
+    resposta = await client.post("/auth/login", data=credenciais)
+    resposta.raise_for_status()
+    return {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+
+
+async def preparar(client: httpx.AsyncClient, itens: int) -> Contexto:
+    admin = await _login(client, ADMIN)
+    headers = {"ADMIN": admin}
+    for perfil in PERFIS:
+        email = f"bench-{perfil.lower()}@lanchonete.com"
+        await client.post(
+            "/auth/register-interno",
+            json={"nome": f"Bench {perfil}", "email": email, "senha": SENHA, "consentimento_lgpd": True, "role": perfil},
+            headers=admin,
+        )
+        headers[perfil] = await _login(client, {"username": email, "password": SENHA})
+
+    unidade_id = (await client.get("/unidades")).json()[0]["id"]
+    produto_ids = []
+    for i in range(PRODUTOS):
+        resposta = await client.post(
+            "/produtos", json={"nome": f"Bench {i}", "descricao": "benchmark", "preco": "10.00"}, headers=admin
+        )
+        produto_ids.append(resposta.json()["id"])
+    resposta = await client.post(
+        "/estoque/movimentacoes/lote",
+        json={
+            "movimentacoes": [
+                {"unidade_id": unidade_id, "produto_id": produto_id, "tipo": "ENTRADA", "quantidade": 10_000_000}
+                for produto_id in produto_ids
+            ]
+        },
+        headers=admin,
+    )
+    resposta.raise_for_status()
+    return Contexto(headers, produto_ids, unidade_id, min(itens, PRODUTOS))
+
+
+async def cenario_login(client: httpx.AsyncClient, ctx: Contexto, medidor: Medidor, rng: random.Random) -> None:
+    credenciais = {"username": "bench-cliente@lanchonete.com", "password": SENHA}
+    await medidor.chamar(client, "POST /auth/login", "POST", "/auth/login", data=credenciais)
+
+
+async def cenario_cardapio(client: httpx.AsyncClient, ctx: Contexto, medidor: Medidor, rng: random.Random) -> None:
+    await medidor.chamar(client, "GET /unidades", "GET", "/unidades")
+    await medidor.chamar(client, "GET /produtos", "GET", "/produtos", params={"page": rng.randint(1, 2), "limit": 10})
+    await medidor.chamar(
+        client,
+        "GET /estoque/saldos",
+        "GET",
+        "/estoque/saldos",
+        params={"unidadeId": ctx.unidade_id},
+        headers=ctx.headers["CLIENTE"],
+    )
+
+
+async def cenario_pedido(
+    client: httpx.AsyncClient, ctx: Contexto, medidor: Medidor, rng: random.Random
+) -> int | None:
+    corpo = {
+        "unidade_id": ctx.unidade_id,
+        "canalPedido": rng.choice(CANAIS),
+        "itens": [
+            {"produto_id": produto_id, "quantidade": rng.randint(1, 3)}
+            for produto_id in rng.sample(ctx.produto_ids, ctx.itens)
+        ],
+    }
+    resposta = await medidor.chamar(
+        client, "POST /pedidos", "POST", "/pedidos", esperado=201, json=corpo, headers=ctx.headers["CLIENTE"]
+    )
+    return resposta.json()["id"] if resposta else None
+
+
+async def cenario_pagamento(
+    client: httpx.AsyncClient, ctx: Contexto, medidor: Medidor, rng: random.Random
+) -> int | None:
+    pedido_id = await cenario_pedido(client, ctx, medidor, rng)
+    if pedido_id is None:
+        return None
+    resposta = await medidor.chamar(
+        client,
+        "POST /pagamentos/mock/{pedido_id}",
+        "POST",
+        f"/pagamentos/mock/{pedido_id}",
+        json={"aprovado": True},
+        headers=ctx.headers["ATENDENTE"],
+    )
+    return pedido_id if resposta else None
+
+
+async def cenario_cozinha(client: httpx.AsyncClient, ctx: Contexto, medidor: Medidor, rng: random.Random) -> None:
+    pedido_id = await cenario_pagamento(client, ctx, medidor, rng)
+    if pedido_id is None:
+        return
+    for status in ESTADOS_COZINHA:
+        resposta = await medidor.chamar(
+            client,
+            "PATCH /pedidos/{pedido_id}/status",
+            "PATCH",
+            f"/pedidos/{pedido_id}/status",
+            json={"novo_status": status},
+            headers=ctx.headers["COZINHA"],
+        )
+        if resposta is None:
+            return
+
+
+CENARIOS = {
+    "login": cenario_login,
+    "cardapio": cenario_cardapio,
+    "pedido": cenario_pedido,
+    "pagamento": cenario_pagamento,
+    "cozinha": cenario_cozinha,
+}
+
+
+def ler_mix(texto: str) -> dict[str, int]:
+    mix = {}
+    for parte in texto.split(","):
+        nome, _, peso = parte.partition("=")
+        if nome not in CENARIOS:
+            raise SystemExit(f"Cenário desconhecido: {nome} (disponíveis: {', '.join(CENARIOS)})")
+        mix[nome] = int(peso or 1)
+    return mix
+
+
+async def disparar(
+    client: httpx.AsyncClient, clientes: int, segundos: float, itens: int, mix: dict[str, int], semente: int
+) -> dict:
+    ctx = await preparar(client, itens)
+    medidor = Medidor()
+    nomes, pesos = list(mix), list(mix.values())
+    fim = time.perf_counter() + segundos
+
+    async def _cliente(indice: int) -> None:
+        rng = random.Random(semente + indice)
+        while time.perf_counter() < fim:
+            await CENARIOS[rng.choices(nomes, pesos)[0]](client, ctx, medidor, rng)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(i) for i in range(clientes)))
+    return medidor.relatorio(time.perf_counter() - inicio)
+
+
+@asynccontextmanager
+async def cliente_asgi() -> AsyncIterator[httpx.AsyncClient]:
+    """app.main:app em processo sobre um SQLite temporário; os eventos de startup/shutdown rodam aqui."""
+    with tempfile.TemporaryDirectory() as pasta:
+        # As configurações são lidas na importação: o banco precisa estar no ambiente antes.
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(pasta) / 'bench.db'}"
+        from app.main import app
+
+        await app.router.startup()
+        try:
+            transporte = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transporte, base_url="http://bench", timeout=60) as client:
+                yield client
+        finally:
+            await app.router.shutdown()
+
+
+async def _executar_uvicorn(base_url: str, args: argparse.Namespace, mix: dict[str, int]) -> dict:
+    limites = httpx.Limits(max_connections=args.clientes, max_keepalive_connections=args.clientes)
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=60) as client:
+        return await disparar(client, args.clientes, args.segundos, args.itens, mix, args.semente)
+
+
+async def _executar_asgi(args: argparse.Namespace, mix: dict[str, int]) -> dict:
+    async with cliente_asgi() as client:
+        return await disparar(client, args.clientes, args.segundos, args.itens, mix, args.semente)
+
+
+def comparar(atual: dict, base: dict, tolerancia: float) -> list[str]:
+    """Regressões de p95 e req/s por rota presente nos dois relatórios."""
+    regressoes = []
+    for rota, medida in atual["rotas"].items():
+        anterior = base["rotas"].get(rota)
+        if not anterior or not anterior["n"]:
+            continue
+        if medida["p95_ms"] > anterior["p95_ms"] * (1 + tolerancia):
+            regressoes.append(f"{rota}: p95 {anterior['p95_ms']} -> {medida['p95_ms']} ms")
+        if medida["req_s"] < anterior["req_s"] * (1 - tolerancia):
+            regressoes.append(f"{rota}: req/s {anterior['req_s']} -> {medida['req_s']}")
+        if medida["erros"] > anterior["erros"]:
+            regressoes.append(f"{rota}: erros {anterior['erros']} -> {medida['erros']}")
+    return regressoes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transporte", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--clientes", type=int, default=20)
+    parser.add_argument("--segundos", type=float, default=10)
+    parser.add_argument("--itens", type=int, default=3, help="itens por pedido")
+    parser.add_argument("--mix", default=MIX_PADRAO, help="pesos dos cenários, ex.: pedido=3,cozinha=1")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--db-async", action="store_true", help="DB_ASYNC=true na API")
+    parser.add_argument("--saida", type=Path, help="grava o relatório JSON neste arquivo")
+    parser.add_argument("--baseline", type=Path, help="relatório anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    args = parser.parse_args()
+
+    mix = ler_mix(args.mix)
+    if args.transporte == "asgi":
+        os.environ["DB_ASYNC"] = str(args.db_async).lower()
+        rotas = asyncio.run(_executar_asgi(args, mix))
+    else:
+        with servidor_uvicorn({"DB_ASYNC": str(args.db_async).lower()}) as base_url:
+            rotas = asyncio.run(_executar_uvicorn(base_url, args, mix))
+
+    relatorio = {
+        "config": {
+            "transporte": args.transporte,
+            "clientes": args.clientes,
+            "segundos": args.segundos,
+            "itens": args.itens,
+            "mix": mix,
+            "semente": args.semente,
+            "db_async": args.db_async,
+        },
+        "rotas": rotas,
+    }
+    print(json.dumps(relatorio, indent=2))
+    if args.saida:
+        args.saida.write_text(json.dumps(relatorio, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        regressoes = comparar(relatorio, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerancia)
+        if regressoes:
+            print("Regressões em relação a", args.baseline, file=sys.stderr)
+            for linha in regressoes:
+                print(" ", linha, file=sys.stderr)
+            sys.exit(1)
+        print(f"Sem regressões acima de {args.tolerancia:.0%} em relação a {args.baseline}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Vazão de login e latência de POST /pedidos durante uma tempestade de logins.
+
+Mede a latência das rotas de pedido sozinhas e, depois, com N clientes fazendo login em
+paralelo (PBKDF2 no pool de processos). Logins recusados com 503 contam como "recusados".
+Uso: python -m benchmarks.tempestade_login [--logins 100] [--segundos 10]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import httpx
+
+from benchmarks.comum import percentil, servidor_uvicorn
+
+CREDENCIAIS = {"username": "admin@lanchonete.com", "password": "admin123"}
+PEDIDO = {"unidade_id": 1, "canalPedido": "TOTEM", "itens": [{"produto_id": 1, "quantidade": 1}]}
+
+
+async def _sondar_pedidos(client: httpx.AsyncClient, headers: dict, fim: float) -> list[float]:
+    latencias = []
+    while time.perf_counter() < fim:
+        inicio = time.perf_counter()
+        resposta = await client.post("/pedidos", json=PEDIDO, headers=headers)
+        if resposta.status_code == 201:
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        await asyncio.sleep(0.02)
+    return latencias
+
+
+async def _tempestade(client: httpx.AsyncClient, logins: int, fim: float) -> dict:
+    contagem = {"aceitos": 0, "recusados": 0, "erros": 0}
+
+    async def _cliente() -> None:
+        while time.perf_counter() < fim:
+            resposta = await client.post("/auth/login", data=CREDENCIAIS)
+            if resposta.status_code == 200:
+                contagem["aceitos"] += 1
+            elif resposta.status_code == 503:
+                contagem["recusados"] += 1
+                await asyncio.sleep(float(resposta.headers.get("Retry-After", "1")))
+            else:
+                contagem["erros"] += 1
+
+    await asyncio.gather(*(_cliente() for _ in range(logins)))
+    return contagem
+
+
+async def _executar(base_url: str, logins: int, segundos: float) -> dict:
+    limites = httpx.Limits(max_connections=logins + 10)
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=60) as client:
+        headers = {"Authorization": f"Bearer {(await client.post('/auth/login', data=CREDENCIAIS)).json()['access_token']}"}
+        await client.post(
+            "/estoque/movimentacoes",
+            json={"unidade_id": 1, "produto_id": 1, "tipo": "ENTRADA", "quantidade": 10_000_000},
+            headers=headers,
+        )
+
+        sozinho = await _sondar_pedidos(client, headers, time.perf_counter() + segundos)
+
+        fim = time.perf_counter() + segundos
+        sob_carga, logins_resultado = await asyncio.gather(
+            _sondar_pedidos(client, headers, fim), _tempestade(client, logins, fim)
+        )
+
+    def _resumo(latencias: list[float]) -> dict:
+        return {"p50_ms": round(percentil(latencias, 50), 2), "p99_ms": round(percentil(latencias, 99), 2)}
+
+    return {
+        "login": {**logins_resultado, "logins_s": round(logins_resultado["aceitos"] / segundos, 1)},
+        "pedidos_sem_tempestade": _resumo(sozinho),
+        "pedidos_com_tempestade": _resumo(sob_carga),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--segundos", type=float, default=10)
+    args = parser.parse_args()
+
+    with servidor_uvicorn() as base_url:
+        relatorio = asyncio.run(_executar(base_url, args.logins, args.segundos))
+    print(json.dumps(relatorio, indent=2))
+
+
+if __name__ == "__main__":
+    main()